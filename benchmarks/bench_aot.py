@@ -0,0 +1,92 @@
+"""
+Benchmark of the ahead-of-time composition (`mixture.aot`): import time of a generated package containing many classes
+decorated with `@apply_mixins`, each with a different combination of mixins sharing a parent, with and without the
+precomposed module.
+
+Each measurement is done in a fresh python process, and only counts the import of the package (including the loading
+of the precomposed module), not the interpreter startup nor the import of `mixture`.
+
+Usage (from the project root): PYTHONPATH=. python benchmarks/bench_aot.py
+"""
+from __future__ import print_function
+
+import compileall
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from itertools import combinations
+
+
+MEASURE_SRC = """
+import sys
+import time
+import mixture
+from mixture.aot import load_precomposed
+start = time.perf_counter()
+if len(sys.argv) > 1:
+    load_precomposed(sys.argv[1])
+import benchpkg.classes
+print(time.perf_counter() - start)
+"""
+
+
+def write_package(root, nb_classes, nb_mixins, nb_members, nb_pool=20):
+    """
+    Writes package `benchpkg` in `root`, with `nb_pool` mixins (each inheriting from a common parent) of `nb_members`
+    methods, and `nb_classes` classes decorated with `nb_mixins` of them. Each class uses a different combination of
+    mixins, so that no composition plan can be reused from a previous class.
+    """
+    pkg = os.path.join(root, 'benchpkg')
+    os.mkdir(pkg)
+    with open(os.path.join(pkg, '__init__.py'), 'w') as f:
+        f.write('')
+
+    lines = ['class ParentMixin(object):']
+    lines += ['    def p%s(self):\n        return %s' % (i, i) for i in range(nb_members)]
+    for j in range(nb_pool):
+        lines.append('\n\nclass Mixin%s(ParentMixin):' % j)
+        lines += ['    def m%s_%s(self):\n        return %s' % (j, i, i) for i in range(nb_members)]
+    with open(os.path.join(pkg, 'mixins.py'), 'w') as f:
+        f.write('\n'.join(lines) + '\n')
+
+    lines = ['from mixture import apply_mixins',
+             'from benchpkg.mixins import %s' % ', '.join('Mixin%s' % j for j in range(nb_pool))]
+    for k, mixins in zip(range(nb_classes), combinations(range(nb_pool), nb_mixins)):
+        lines.append('\n\n@apply_mixins(%s)' % ', '.join('Mixin%s' % j for j in mixins))
+        lines.append('class Class%s(object):\n    def own(self):\n        pass' % k)
+    with open(os.path.join(pkg, 'classes.py'), 'w') as f:
+        f.write('\n'.join(lines) + '\n')
+
+
+def run(root, args, repeat):
+    """Returns the best import time of the package in `root`, measured in `repeat` fresh processes"""
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([root, os.getcwd()]))
+    times = []
+    for _ in range(repeat):
+        out = subprocess.check_output([sys.executable, '-c', MEASURE_SRC] + args, env=env)
+        times.append(float(out.decode().strip().splitlines()[-1]))
+    return min(times)
+
+
+if __name__ == '__main__':
+    print("%8s %8s %8s %16s %16s %8s" % ('classes', 'mixins', 'members', 'dynamic (ms)', 'precomposed (ms)',
+                                         'speedup'))
+    for nb_classes, nb_mixins, nb_members in ((100, 3, 10), (100, 10, 50), (500, 5, 100)):
+        root = tempfile.mkdtemp()
+        try:
+            write_package(root, nb_classes, nb_mixins, nb_members)
+            env = dict(os.environ, PYTHONPATH=os.pathsep.join([root, os.getcwd()]))
+            subprocess.check_call([sys.executable, '-m', 'mixture.aot', 'benchpkg',
+                                   '-o', os.path.join(root, 'benchpkg', '_precomposed.py')], env=env)
+
+            # compile to bytecode in advance, as in an installed package
+            compileall.compile_dir(root, quiet=1)
+
+            dynamic = run(root, [], repeat=7)
+            precomposed = run(root, ['benchpkg._precomposed'], repeat=7)
+            print("%8s %8s %8s %16.2f %16.2f %7.2fx" % (nb_classes, nb_mixins, nb_members, dynamic * 1000,
+                                                       precomposed * 1000, dynamic / precomposed))
+        finally:
+            shutil.rmtree(root)
@@ -0,0 +1,85 @@
+"""
+Benchmark of `@apply_mixins(..., async_methods=...)` under concurrent load: an `asyncio` service handles requests that
+call a blocking mixin method (simulated I/O of 10ms), either directly from the coroutine (blocking the event loop) or
+through its `a<name>` adapter running in a thread pool executor.
+
+For an increasing number of concurrent requests it measures the total time, the median and 99th percentile latency
+of the requests, and the maximum lag of the event loop (measured by a ticker coroutine that should wake up every 1ms).
+
+Usage (from the project root): PYTHONPATH=. python benchmarks/bench_async.py
+"""
+from __future__ import print_function
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from mixture import apply_mixins
+
+
+IO_TIME = 0.01
+
+
+class DatabaseMixin(object):
+    def query(self, sql):
+        time.sleep(IO_TIME)
+        return len(sql)
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+async def ticker(lags, stop):
+    """Records how late the event loop wakes this coroutine up"""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(0.001)
+        lags.append(time.perf_counter() - start - 0.001)
+
+
+async def serve(db, nb_requests, use_adapter):
+    latencies, lags = [], []
+
+    async def request():
+        start = time.perf_counter()
+        if use_adapter:
+            await db.aquery('select 1')
+        else:
+            db.query('select 1')
+        latencies.append(time.perf_counter() - start)
+
+    stop = asyncio.Event()
+    tick = asyncio.ensure_future(ticker(lags, stop))
+    await asyncio.sleep(0.005)
+    start = time.perf_counter()
+    await asyncio.gather(*[request() for _ in range(nb_requests)])
+    total = time.perf_counter() - start
+    stop.set()
+    await tick
+    return total, percentile(latencies, 0.5), percentile(latencies, 0.99), max(lags)
+
+
+if __name__ == '__main__':
+    executor = ThreadPoolExecutor(max_workers=64)
+
+    @apply_mixins(DatabaseMixin, async_methods=['query'], executor=executor)
+    class Database(object):
+        pass
+
+    db = Database()
+    print("%10s %10s %12s %12s %12s %16s" % ('requests', 'mode', 'total (ms)', 'p50 (ms)', 'p99 (ms)',
+                                              'max loop lag (ms)'))
+    for nb_requests in (1, 16, 64, 256):
+        for use_adapter in (False, True):
+            loop = asyncio.new_event_loop()
+            try:
+                # warm up the executor threads
+                loop.run_until_complete(serve(db, 64, True))
+                results = loop.run_until_complete(serve(db, nb_requests, use_adapter))
+            finally:
+                loop.close()
+            print("%10s %10s %12.1f %12.1f %12.1f %16.1f" % ((nb_requests, 'aquery' if use_adapter else 'query')
+                                                             + tuple(r * 1000 for r in results)))
+    executor.shutdown()
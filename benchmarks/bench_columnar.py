@@ -0,0 +1,102 @@
+"""
+Benchmark of `@apply_mixins(..., columnar=True)`, for a mixin declaring `float` fields:
+
+ - memory: bytes per instance, once all fields have been set to distinct values, compared with the default composition
+   (values in the instance `__dict__`) and with `slots=True`,
+ - throughput: time to update a field of all instances, calling a method on each instance or calling a `@batched`
+   function processing the whole store at once (with a python loop over the `array` column, and with `numpy` when it
+   is installed).
+
+Usage (from the project root): PYTHONPATH=. python benchmarks/bench_columnar.py
+"""
+from __future__ import print_function
+
+import gc
+import timeit
+import tracemalloc
+
+from pyfields import field
+
+from mixture import apply_mixins, batched
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+def make_mixin(nb_fields):
+    """Creates a mixin class with `nb_fields` float fields, a method and its batched variant"""
+    members = {'f%s' % i: field(type_hint=float, default=0., name='f%s' % i) for i in range(nb_fields)}
+
+    def shift(self, d):
+        self.f0 += d
+
+    def shift_all(store, d):
+        f0 = store['f0']
+        for i in range(len(f0)):
+            f0[i] += d
+
+    def shift_all_numpy(store, d):
+        f0 = store.numpy('f0')
+        f0 += d
+
+    members.update(shift=shift, shift_all=batched(shift_all), shift_all_numpy=batched(shift_all_numpy))
+    return type('FloatsMixin%s' % nb_fields, (object,), members)
+
+
+def make_classes(mixin):
+    """Returns the classes composed with `mixin`, with the default, slots and columnar modes"""
+    classes = []
+    for options in (dict(), dict(slots=True), dict(columnar=True)):
+        class Point(object):
+            __slots__ = () if options else ('__dict__', )
+        classes.append(apply_mixins(mixin, **options)(Point))
+    return classes
+
+
+def create(cls, nb_fields, nb_instances):
+    objs = [cls() for _ in range(nb_instances)]
+    for j, o in enumerate(objs):
+        for i in range(nb_fields):
+            setattr(o, 'f%s' % i, j + i + 0.5)
+    return objs
+
+
+def bytes_per_instance(cls, nb_fields, nb_instances=100000):
+    """Returns the memory allocated per instance, including the columns"""
+    gc.collect()
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+    objs = create(cls, nb_fields, nb_instances)
+    end = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del objs
+    return (end - start) / float(nb_instances)
+
+
+def bench(stmt, number=10):
+    return min(timeit.repeat(stmt, number=number, repeat=3)) / number * 1000
+
+
+if __name__ == '__main__':
+    print("%8s %16s %16s %16s" % ('fields', 'dict (B/inst)', 'slots (B/inst)', 'columnar (B/inst)'))
+    for nb_fields in (1, 5, 20):
+        classes = make_classes(make_mixin(nb_fields))
+        print("%8s %16.1f %16.1f %16.1f" % ((nb_fields, ) + tuple(bytes_per_instance(c, nb_fields) for c in classes)))
+
+    print()
+    print("%10s %12s %16s %18s %18s" % ('instances', 'mode', 'methods (ms)', 'batched (ms)', 'batched numpy (ms)'))
+    for nb_instances in (1000, 100000):
+        for mode, cls in zip(('dict', 'slots', 'columnar'), make_classes(make_mixin(5))):
+            objs = create(cls, 5, nb_instances)
+
+            def call_methods():
+                for o in objs:
+                    o.shift(1.)
+
+            batched_time = bench(lambda: cls.shift_all(1.)) if mode == 'columnar' else float('nan')
+            numpy_time = bench(lambda: cls.shift_all_numpy(1.)) if mode == 'columnar' and numpy else float('nan')
+            print("%10s %12s %16.3f %18.3f %18.3f" % (nb_instances, mode, bench(call_methods), batched_time,
+                                                      numpy_time))
+            del objs
@@ -0,0 +1,103 @@
+"""
+Soak benchmark of dynamic compositions: millions of cycles creating a class composed with `@apply_mixins` (or `mix`),
+using an instance of it, and discarding both. Classes are reference cycles, so they are freed by the garbage collector.
+
+Scenarios:
+
+ - `static`: module-level mixins (with `pyfields` fields, an ABC and instrumentation) applied to a new class per cycle
+ - `dynamic`: the mixins are created in each cycle too
+ - `mix`: `mix` is called with a new base class per cycle (so the cache is always missed)
+
+For each scenario it reports, at regular checkpoints, the resident memory of the process, the number of live classes
+and the number of cached composition plans: all should stay flat.
+
+Usage (from the project root): PYTHONPATH=. python benchmarks/bench_gc.py [--cycles 1000000]
+"""
+from __future__ import print_function
+
+import argparse
+import gc
+import os
+import time
+from abc import ABCMeta
+
+from pyfields import field
+
+from mixture import apply_mixins, mix, enable_instrumentation, get_plan_cache_info
+
+
+class FieldsMixin(object):
+    x = field(default=1)
+    items = field(default_factory=lambda obj: [])
+
+    def foo(self):
+        self.items.append(self.x)
+        return len(self.items)
+
+
+AbcMixin = ABCMeta('AbcMixin', (object,), {'bar': lambda self: 'bar'})
+
+
+def static_cycle(i):
+    @apply_mixins(FieldsMixin, AbcMixin, instrument=True)
+    class Foo(object):
+        pass
+
+    o = Foo()
+    return o.foo() + isinstance(o, AbcMixin)
+
+
+def dynamic_cycle(i):
+    Mixin = type('Mixin', (object,), {'y': field(default=i), 'get_y': lambda self: self.y})
+    Abc = ABCMeta('Abc', (object,), {'bar': lambda self: 'bar'})
+
+    @apply_mixins(Mixin, Abc, FieldsMixin, instrument=True)
+    class Foo(object):
+        pass
+
+    o = Foo()
+    return o.get_y() + o.foo() + isinstance(o, Abc)
+
+
+def mix_cycle(i):
+    Base = type('Base', (object,), {})
+    o = mix(Base, FieldsMixin, AbcMixin)()
+    return o.foo() + isinstance(o, AbcMixin)
+
+
+def get_rss():
+    """Returns the resident memory of the process in MB (linux only), or `None`"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1e6
+    except (IOError, OSError):
+        return None
+
+
+def count_classes():
+    gc.collect()
+    return sum(1 for o in gc.get_objects() if isinstance(o, type))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--cycles', type=int, default=1000000, help="number of cycles per scenario")
+    parser.add_argument('--checkpoints', type=int, default=5, help="number of checkpoints per scenario")
+    args = parser.parse_args()
+
+    enable_instrumentation()
+    step = max(1, args.cycles // args.checkpoints)
+    print("%10s %10s %12s %10s %10s %14s" % ('scenario', 'cycles', 'us/cycle', 'rss (MB)', 'classes',
+                                             'cached plans'))
+    for name, cycle in (('static', static_cycle), ('dynamic', dynamic_cycle), ('mix', mix_cycle)):
+        done = 0
+        print("%10s %10s %12s %10s %10s %14s" % (name, 0, '', '%.1f' % (get_rss() or 0), count_classes(),
+                                                 get_plan_cache_info().currsize))
+        while done < args.cycles:
+            start = time.time()
+            for i in range(done, done + step):
+                cycle(i)
+            duration = time.time() - start
+            done += step
+            print("%10s %10s %12.1f %10s %10s %14s" % (name, done, duration / step * 1e6, '%.1f' % (get_rss() or 0),
+                                                       count_classes(), get_plan_cache_info().currsize))
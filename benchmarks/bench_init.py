@@ -0,0 +1,44 @@
+"""
+Benchmark of `@apply_mixins(..., init=True)`: construction time, first access latency (construction followed by a
+first read of all fields) and steady-state access, for a class composed with a mixin declaring `pyfields` fields,
+with the default lazy fields and with the generated eager `__init__`.
+
+Usage (from the project root): PYTHONPATH=. python benchmarks/bench_init.py
+"""
+from __future__ import print_function
+
+import timeit
+
+from pyfields import field
+
+from mixture import apply_mixins
+
+
+def make_mixin(nb_fields):
+    """Creates a mixin class with `nb_fields` pyfields fields, half with a default and half with a default factory"""
+    members = dict()
+    for i in range(nb_fields):
+        if i % 2:
+            members['f%s' % i] = field(default=i, name='f%s' % i)
+        else:
+            members['f%s' % i] = field(default_factory=lambda obj: [], name='f%s' % i)
+    return type('FieldsMixin%s' % nb_fields, (object,), members)
+
+
+def bench(stmt, number=20000):
+    return min(timeit.repeat(stmt, number=number, repeat=5)) / number * 1e6
+
+
+if __name__ == '__main__':
+    print("%8s %6s %12s %20s %14s" % ('fields', 'init', 'new (us)', 'new + 1st read (us)', 'read (ns)'))
+    for nb_fields in (2, 10, 30):
+        mixin = make_mixin(nb_fields)
+        read_all = eval("lambda o: (%s)" % ', '.join('o.f%s' % i for i in range(nb_fields)))
+        for init in (False, True):
+            cls = apply_mixins(mixin, init=init)(type('Foo', (object,), {}))
+            o = cls()
+            read_all(o)
+            t_new = bench(cls)
+            t_first = bench(lambda: read_all(cls()))
+            t_read = bench(lambda: read_all(o)) * 1000 / nb_fields
+            print("%8s %6s %12.2f %20.2f %14.1f" % (nb_fields, init, t_new, t_first, t_read))
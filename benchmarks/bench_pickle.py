@@ -0,0 +1,62 @@
+"""
+Benchmark of the pickling of instances of classes composed at runtime with `mix`: pickled size and dump/load times of
+a list of instances, compared with instances of an equivalent class declared statically (pickled by reference), and
+round-trip time through a `concurrent.futures` process pool.
+
+Usage (from the project root): PYTHONPATH=. python benchmarks/bench_pickle.py
+"""
+from __future__ import print_function
+
+import pickle
+import timeit
+from concurrent.futures import ProcessPoolExecutor
+
+from mixture import mix, apply_mixins
+
+
+class BarkerMixin(object):
+    def bark(self):
+        return "barking"
+
+
+class TweeterMixin(object):
+    def tweet(self):
+        return "tweeting"
+
+
+class Animal(object):
+    def __init__(self, i):
+        self.i = i
+        self.name = 'animal%s' % i
+
+
+@apply_mixins(BarkerMixin, TweeterMixin)
+class StaticAnimal(Animal):
+    pass
+
+
+def identity(objs):
+    return objs
+
+
+def bench(stmt, number=10):
+    return min(timeit.repeat(stmt, number=number, repeat=3)) / number * 1000
+
+
+if __name__ == '__main__':
+    DynamicAnimal = mix(Animal, BarkerMixin, TweeterMixin)
+
+    print("%8s %10s %12s %12s %12s %14s" % ('objects', 'class', 'size (B)', 'dumps (ms)', 'loads (ms)',
+                                            'pool (ms)'))
+    with ProcessPoolExecutor(max_workers=1) as pool:
+        pool.submit(identity, []).result()
+        for nb_objects in (1, 1000, 100000):
+            for cls in (StaticAnimal, DynamicAnimal):
+                objs = [cls(i) for i in range(nb_objects)]
+                dumped = pickle.dumps(objs, protocol=pickle.HIGHEST_PROTOCOL)
+                number = max(1, 10000 // nb_objects)
+                print("%8s %10s %12s %12.3f %12.3f %14.3f" % (
+                    nb_objects, 'static' if cls is StaticAnimal else 'mix', len(dumped),
+                    bench(lambda: pickle.dumps(objs, protocol=pickle.HIGHEST_PROTOCOL), number),
+                    bench(lambda: pickle.loads(dumped), number),
+                    bench(lambda: pool.submit(identity, objs).result(), number)))
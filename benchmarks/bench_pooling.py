@@ -0,0 +1,119 @@
+"""
+Benchmark of `PoolingMixin`: a request-like loop creating short-lived objects composed with `@apply_mixins` (a mixin
+with `pyfields` fields, one of them holding a list), either with plain construction or with `acquire`/`release`.
+
+The handler stores a reference to the request in one of its fields (as callbacks or parent links typically do), so
+that each request is part of a reference cycle: with plain construction, requests can only be freed by the garbage
+collector. With pooling, resetting the fields on release breaks the cycle.
+
+For each mode it measures the time per request, the number of garbage collections triggered per 1000 requests and the
+share of the time spent in them, and (in a separate run) the number of instances allocated per 1000 requests.
+
+Usage (from the project root): PYTHONPATH=. python benchmarks/bench_pooling.py
+"""
+from __future__ import print_function
+
+import gc
+import time
+
+from pyfields import field
+
+from mixture import apply_mixins, PoolingMixin
+
+
+class PayloadMixin(object):
+    status = field(default=200)
+    retries = field(default=0)
+    callbacks = field(default_factory=lambda obj: [])
+
+    def on_done(self, callback):
+        self.callbacks.append(callback)
+
+
+def make_class(slots):
+    @apply_mixins(PayloadMixin, PoolingMixin, slots=slots)
+    class Request(object):
+        if slots:
+            __slots__ = ('path', 'user')
+
+        def __init__(self, path, user):
+            self.path = path
+            self.user = user
+
+    return Request
+
+
+def handle(req):
+    req.on_done(req.on_done)  # reference cycle through a bound method
+    req.status = 404 if req.path == '/missing' else req.status
+    return req.status
+
+
+def plain_loop(cls, n):
+    for i in range(n):
+        req = cls('/index', i)
+        handle(req)
+
+
+def pooled_loop(cls, n, concurrency=16):
+    # a few requests in flight at the same time
+    in_flight = []
+    for i in range(n):
+        req = cls.acquire('/index', i)
+        handle(req)
+        in_flight.append(req)
+        if len(in_flight) == concurrency:
+            for r in in_flight:
+                r.release()
+            del in_flight[:]
+
+
+def run(loop, cls, n=200000):
+    """Returns the time per request, and the number of gc runs per 1000 requests and the fraction of the time spent in
+    them"""
+    gc_runs = [0, 0.]
+
+    def count(phase, info):
+        if phase == 'start':
+            gc_runs[0] += 1
+            gc_runs[1] -= time.perf_counter()
+        else:
+            gc_runs[1] += time.perf_counter()
+
+    gc.collect()
+    gc.callbacks.append(count)
+    try:
+        start = time.perf_counter()
+        loop(cls, n)
+        duration = time.perf_counter() - start
+    finally:
+        gc.callbacks.remove(count)
+    return duration / n * 1e6, gc_runs[0] * 1000. / n, gc_runs[1] / duration
+
+
+def allocations(loop, cls, n=10000):
+    """Returns the number of instances allocated per 1000 requests"""
+    created = [0]
+
+    def counting_new(c, *args, **kwargs):
+        created[0] += 1
+        return object.__new__(c)
+
+    cls.__new__ = staticmethod(counting_new)
+    try:
+        loop(cls, n)
+    finally:
+        del cls.__new__
+    return created[0] * 1000. / n
+
+
+if __name__ == '__main__':
+    print("%8s %8s %14s %18s %18s %12s" % ('slots', 'mode', 'time (us/req)', 'allocs / 1000 req',
+                                           'gc runs / 1000 req', 'gc time (%)'))
+    for slots in (False, True):
+        for mode, loop in (('plain', plain_loop), ('pooled', pooled_loop)):
+            cls = make_class(slots)
+            loop(cls, 1000)
+            duration, gc_runs, gc_time = min((run(loop, cls) for _ in range(5)), key=lambda r: r[0])
+            print("%8s %8s %14.3f %18.1f %18.2f %12.1f" % (slots, mode, duration, allocations(loop, cls), gc_runs,
+                                                           gc_time * 100))
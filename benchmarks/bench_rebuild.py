@@ -0,0 +1,39 @@
+"""
+Benchmark of `@apply_mixins` member installation: per-member `setattr` (default) vs. single-shot class rebuild
+(`rebuild=True`), for mixins with an increasing number of members.
+
+Usage (from the project root): PYTHONPATH=. python benchmarks/bench_rebuild.py
+"""
+from __future__ import print_function
+
+import timeit
+
+from mixture import apply_mixins
+
+
+def make_mixin(nb_members):
+    """Creates a mixin class with `nb_members` public methods"""
+    def _make_method(i):
+        def m(self):
+            return i
+        return m
+    return type('BigMixin%s' % nb_members, (object,), {'m%s' % i: _make_method(i) for i in range(nb_members)})
+
+
+def bench(nb_members, rebuild, number=200):
+    mixin = make_mixin(nb_members)
+    decorate = apply_mixins(mixin, rebuild=rebuild)
+
+    def _compose():
+        decorate(type('Foo', (object,), {}))
+
+    _compose()  # warm the plan cache so that only installation is measured
+    return min(timeit.repeat(_compose, number=number, repeat=5)) / number
+
+
+if __name__ == '__main__':
+    print("%10s %16s %16s %8s" % ('members', 'setattr (us)', 'rebuild (us)', 'gain'))
+    for nb_members in (10, 100, 1000):
+        t_setattr = bench(nb_members, rebuild=False)
+        t_rebuild = bench(nb_members, rebuild=True)
+        print("%10s %16.2f %16.2f %7.2fx" % (nb_members, t_setattr * 1e6, t_rebuild * 1e6, t_setattr / t_rebuild))
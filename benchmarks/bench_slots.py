@@ -0,0 +1,45 @@
+"""
+Memory benchmark of `@apply_mixins(..., slots=True)`: bytes per instance of a class composed with a mixin declaring
+`pyfields` fields, with and without slots.
+
+Usage (from the project root): PYTHONPATH=. python benchmarks/bench_slots.py
+"""
+from __future__ import print_function
+
+import gc
+import tracemalloc
+
+from pyfields import field
+
+from mixture import apply_mixins
+
+
+def make_mixin(nb_fields):
+    """Creates a mixin class with `nb_fields` pyfields fields"""
+    members = {'f%s' % i: field(default=i, name='f%s' % i) for i in range(nb_fields)}
+    return type('FieldsMixin%s' % nb_fields, (object,), members)
+
+
+def bytes_per_instance(cls, nb_fields, nb_instances=10000):
+    """Returns the memory allocated per instance, after all fields have been read once"""
+    gc.collect()
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+    objs = [cls() for _ in range(nb_instances)]
+    for o in objs:
+        for i in range(nb_fields):
+            getattr(o, 'f%s' % i)
+    end = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return (end - start) / float(nb_instances)
+
+
+if __name__ == '__main__':
+    print("%10s %16s %16s %8s" % ('fields', 'dict (B/inst)', 'slots (B/inst)', 'ratio'))
+    for nb_fields in (1, 5, 20):
+        mixin = make_mixin(nb_fields)
+        Plain = apply_mixins(mixin)(type('Plain', (object,), {}))
+        Slotted = apply_mixins(mixin, slots=True)(type('Slotted', (object,), {}))
+        b_plain = bytes_per_instance(Plain, nb_fields)
+        b_slots = bytes_per_instance(Slotted, nb_fields)
+        print("%10s %16.1f %16.1f %7.2fx" % (nb_fields, b_plain, b_slots, b_plain / b_slots))
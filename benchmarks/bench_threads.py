@@ -0,0 +1,84 @@
+"""
+Benchmark of concurrent composition with `mix`: throughput of class creations (each thread composing different
+classes) and of cached lookups (all threads requesting the same classes), for an increasing number of threads.
+
+Composition only holds locks for short dictionary operations, and a per-key lock while a class is created, so on
+free-threaded python builds the throughput should grow with the number of threads. On builds with a GIL it is expected
+to stay flat.
+
+Usage (from the project root): PYTHONPATH=. python benchmarks/bench_threads.py
+"""
+from __future__ import print_function
+
+import sys
+import time
+from itertools import permutations
+from threading import Barrier, Thread
+
+from mixture import mix, clear_mix_cache, clear_plan_cache, set_mix_cache_size
+
+
+NB_MIXINS = 8
+NB_MEMBERS = 20
+
+
+def make_mixins():
+    return [type('Mixin%s' % j, (object,), {'m%s_%s' % (j, i): (lambda self: None) for i in range(NB_MEMBERS)})
+            for j in range(NB_MIXINS)]
+
+
+def run(nb_threads, work):
+    """Runs `work(i)` in `nb_threads` threads started at the same time, and returns the elapsed time"""
+    barrier = Barrier(nb_threads + 1)
+
+    def _run(i):
+        barrier.wait()
+        work(i)
+
+    threads = [Thread(target=_run, args=(i,)) for i in range(nb_threads)]
+    for t in threads:
+        t.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for t in threads:
+        t.join()
+    return time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    is_gil_enabled = getattr(sys, '_is_gil_enabled', lambda: True)()
+    print("python %s, GIL %s" % (sys.version.split()[0], 'enabled' if is_gil_enabled else 'disabled'))
+
+    mixins = make_mixins()
+    combinations = list(permutations(mixins, 3))
+    set_mix_cache_size(None)
+
+    print("%8s %22s %22s" % ('threads', 'creations (classes/s)', 'lookups (calls/s)'))
+    for nb_threads in (1, 2, 4, 8):
+        clear_mix_cache()
+        clear_plan_cache()
+
+        # each thread creates its own share of the classes
+        def create(i):
+            class Base(object):
+                pass
+            for combination in combinations[i::nb_threads]:
+                mix(Base, *combination)
+
+        creation_time = run(nb_threads, create)
+
+        class Shared(object):
+            pass
+        shared = combinations[:50]
+        for combination in shared:
+            mix(Shared, *combination)
+
+        # all threads look up the same classes
+        def lookup(i):
+            for _ in range(200):
+                for combination in shared:
+                    mix(Shared, *combination)
+
+        lookup_time = run(nb_threads, lookup)
+        print("%8s %22.0f %22.0f" % (nb_threads, len(combinations) / creation_time,
+                                     nb_threads * 200 * len(shared) / lookup_time))
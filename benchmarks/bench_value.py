@@ -0,0 +1,92 @@
+"""
+Benchmark of the `__eq__`, `__hash__` and `__repr__` methods generated by `@apply_mixins(..., eq=True, hash=True,
+repr=True)`, compared to a generic "reflective" implementation inherited from a base class, that iterates on the
+names of the fields of the class (computed once and cached) with `getattr`.
+
+It measures single calls, deduplication of a list of objects with a `set`, and lookups of objects used as `dict` keys,
+for an increasing number of fields.
+
+Usage (from the project root): PYTHONPATH=. python benchmarks/bench_value.py
+"""
+from __future__ import print_function
+
+import timeit
+
+from pyfields import field, get_fields
+
+from mixture import apply_mixins
+
+
+class ReflectiveValue(object):
+    """Generic value methods iterating on the fields of the class (a base class, since dunder methods of mixins are
+    not copied)"""
+    __slots__ = ()
+
+    @classmethod
+    def _field_names(cls):
+        try:
+            return cls.__dict__['_names_cache']
+        except KeyError:
+            names = tuple(f.name for f in get_fields(cls))
+            setattr(cls, '_names_cache', names)
+            return names
+
+    def __eq__(self, other):
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return all(getattr(self, n) == getattr(other, n) for n in self._field_names())
+
+    def __ne__(self, other):
+        eq = self.__eq__(other)
+        return eq if eq is NotImplemented else not eq
+
+    def __hash__(self):
+        return hash(tuple(getattr(self, n) for n in self._field_names()))
+
+    def __repr__(self):
+        return '%s(%s)' % (self.__class__.__name__,
+                           ', '.join('%s=%r' % (n, getattr(self, n)) for n in self._field_names()))
+
+
+def make_mixin(nb_fields):
+    return type('FieldsMixin', (object, ), {'f%s' % i: field(default=i) for i in range(nb_fields)})
+
+
+def make_objects(cls, nb_objects, nb_fields):
+    objs = []
+    for j in range(nb_objects):
+        o = cls()
+        for i in range(nb_fields):
+            # only the last field differs, so that equality checks all fields
+            setattr(o, 'f%s' % i, j % (nb_objects // 2) if i == nb_fields - 1 else i)
+        objs.append(o)
+    return objs
+
+
+def measure(stmt, namespace, number):
+    return min(timeit.repeat(stmt, globals=namespace, number=number, repeat=5)) / number * 1e6
+
+
+if __name__ == '__main__':
+    print("%8s %12s %10s %10s %10s %14s %14s" % ('fields', 'impl', 'eq (us)', 'hash (us)', 'repr (us)',
+                                                  'set 1k (us)', 'dict 1k (us)'))
+    for nb_fields in (2, 5, 10):
+        mixin = make_mixin(nb_fields)
+
+        @apply_mixins(mixin, eq=True, hash=True, repr=True)
+        class Generated(object):
+            pass
+
+        @apply_mixins(mixin)
+        class Reflective(ReflectiveValue):
+            pass
+
+        for name, cls in (('reflective', Reflective), ('generated', Generated)):
+            objs = make_objects(cls, 1000, nb_fields)
+            a, b = make_objects(cls, 2, nb_fields)[0], make_objects(cls, 2, nb_fields)[0]
+            index = {o: o for o in objs[:500]}
+            ns = dict(a=a, b=b, objs=objs, index=index)
+            print("%8s %12s %10.2f %10.2f %10.2f %14.1f %14.1f"
+                  % (nb_fields, name, measure('a == b', ns, 100000), measure('hash(a)', ns, 100000),
+                     measure('repr(a)', ns, 20000), measure('set(objs)', ns, 200),
+                     measure('for o in objs: index[o]', ns, 200)))
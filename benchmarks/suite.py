@@ -0,0 +1,200 @@
+"""
+Benchmark suite comparing classes composed with `@apply_mixins` to classes using explicit multiple inheritance from
+the same mixins, for an increasing number of mixins and of members per mixin. Measured metrics:
+
+ - `decorate_cold`: class creation time, with empty `mixture` caches (for inheritance: class creation time)
+ - `decorate_warm`: class creation time, with the composition plan already cached
+ - `call_first` / `call_last`: latency of a method call, for a method of the first / last mixin
+ - `attr_last`: latency of a class attribute lookup on an instance, for an attribute of the last mixin
+ - `isinstance` / `issubclass`: latency of these checks against the last mixin (an ABC)
+ - `has_mixin`: latency of `mixture.has_mixin` against the last mixin
+ - `construct`: instance construction time
+ - `memory`: bytes allocated per instance
+
+All times are in seconds. Results are printed as a table and can be written to a JSON report with `--output`. A
+previous report can be compared with the current results with `--compare`: metrics slower by more than `--threshold`
+are reported as regressions and the process exits with code 1.
+
+Usage (from the project root): PYTHONPATH=. python benchmarks/suite.py [--quick] [--output report.json]
+                                                                        [--compare baseline.json]
+"""
+from __future__ import print_function
+
+import argparse
+import gc
+import json
+import platform
+import sys
+import time
+import timeit
+import tracemalloc
+from abc import ABCMeta
+
+import mixture
+from mixture import apply_mixins, clear_plan_cache, has_mixin
+
+
+STRATEGIES = ('apply_mixins', 'inheritance')
+
+
+def make_mixins(nb_mixins, nb_members):
+    """Creates `nb_mixins` ABC mixins with `nb_members` (at least 2) members each: methods and a class attribute"""
+    def _make_method(i):
+        def m(self):
+            return i
+        return m
+
+    mixins = []
+    for j in range(nb_mixins):
+        members = {'m%s_%s' % (j, i): _make_method(i) for i in range(nb_members - 1)}
+        members['a%s' % j] = j
+        mixins.append(ABCMeta('Mixin%s' % j, (object,), members))
+    return tuple(mixins)
+
+
+def compose(strategy, mixins):
+    if strategy == 'apply_mixins':
+        return apply_mixins(*mixins)(type('Composed', (object,), {}))
+    else:
+        return type('Composed', mixins, {})
+
+
+def measure(stmt, repeat=3, min_time=0.02):
+    """Returns the best time per execution of `stmt` (a callable), executed enough times to last `min_time` seconds"""
+    timer = timeit.Timer(stmt)
+    number = 1
+    while timer.timeit(number) < min_time:
+        number *= 10
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def measure_cold(strategy, mixins, repeat=5):
+    """Returns the best time to compose a class, with empty caches"""
+    best = float('inf')
+    for _ in range(repeat):
+        clear_plan_cache()
+        start = time.perf_counter()
+        compose(strategy, mixins)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bytes_per_instance(cls, nb_instances=10000):
+    gc.collect()
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+    objs = [cls() for _ in range(nb_instances)]
+    end = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del objs
+    return (end - start) / float(nb_instances)
+
+
+def run_case(strategy, nb_mixins, nb_members):
+    """Returns a dictionary of metric values for one strategy, number of mixins and number of members per mixin"""
+    mixins = make_mixins(nb_mixins, nb_members)
+    first, last = mixins[0], mixins[-1]
+    call_first_name = 'm0_0'
+    call_last_name = 'm%s_0' % (nb_mixins - 1)
+    attr_last_name = 'a%s' % (nb_mixins - 1)
+
+    res = dict()
+    res['decorate_cold'] = measure_cold(strategy, mixins)
+    compose(strategy, mixins)
+    res['decorate_warm'] = measure(lambda: compose(strategy, mixins))
+
+    cls = compose(strategy, mixins)
+    o = cls()
+    # note: we measure the attribute lookup + call, not only the call of a pre-bound method
+    res['call_first'] = measure(lambda: getattr(o, call_first_name)())
+    res['call_last'] = measure(lambda: getattr(o, call_last_name)())
+    res['attr_last'] = measure(lambda: getattr(o, attr_last_name))
+    res['isinstance'] = measure(lambda: isinstance(o, last))
+    res['issubclass'] = measure(lambda: issubclass(cls, last))
+    res['has_mixin'] = measure(lambda: has_mixin(o, last))
+    res['construct'] = measure(cls)
+    res['memory'] = bytes_per_instance(cls)
+
+    assert isinstance(o, first) and isinstance(o, last)
+    return res
+
+
+def run_suite(mixins_grid, members_grid):
+    results = []
+    for nb_mixins in mixins_grid:
+        for nb_members in members_grid:
+            for strategy in STRATEGIES:
+                values = run_case(strategy, nb_mixins, nb_members)
+                for metric, value in sorted(values.items()):
+                    results.append(dict(strategy=strategy, nb_mixins=nb_mixins, nb_members=nb_members,
+                                        metric=metric, value=value, unit='bytes' if metric == 'memory' else 's'))
+    return results
+
+
+def print_table(results):
+    by_case = dict()
+    for r in results:
+        by_case.setdefault((r['nb_mixins'], r['nb_members'], r['metric']), dict())[r['strategy']] = r['value']
+
+    print("%8s %8s %14s %16s %16s %8s" % ('mixins', 'members', 'metric', 'apply_mixins', 'inheritance', 'ratio'))
+    for (nb_mixins, nb_members, metric), values in sorted(by_case.items()):
+        a, i = values.get('apply_mixins'), values.get('inheritance')
+        fmt = "%16.1f" if metric == 'memory' else "%16.3e"
+        print(("%8s %8s %14s " + fmt + " " + fmt + " %7.2fx")
+              % (nb_mixins, nb_members, metric, a, i, (a / i) if i else float('nan')))
+
+
+def compare(results, baseline, threshold):
+    """Returns the list of (key, old, new) for all metrics that are slower than in `baseline` by more than threshold"""
+    def _key(r):
+        return r['strategy'], r['nb_mixins'], r['nb_members'], r['metric']
+
+    old_values = {_key(r): r['value'] for r in baseline['results']}
+    regressions = []
+    for r in results:
+        old = old_values.get(_key(r))
+        if old and r['value'] > old * threshold:
+            regressions.append((_key(r), old, r['value']))
+    return regressions
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--quick', action='store_true', help="run a reduced grid (1 and 10 mixins, 10 members)")
+    parser.add_argument('--output', help="path of the JSON report to write")
+    parser.add_argument('--compare', help="path of a previous JSON report to compare with")
+    parser.add_argument('--threshold', type=float, default=1.2,
+                        help="ratio above which a metric is considered as a regression (default 1.2)")
+    options = parser.parse_args(args)
+
+    if options.quick:
+        mixins_grid, members_grid = (1, 10), (10,)
+    else:
+        mixins_grid, members_grid = (1, 10, 100), (10, 100, 1000)
+
+    results = run_suite(mixins_grid, members_grid)
+    print_table(results)
+
+    report = dict(mixture_version=mixture.__version__, python_version=platform.python_version(),
+                  python_implementation=platform.python_implementation(), platform=platform.platform(),
+                  timestamp=time.strftime('%Y-%m-%dT%H:%M:%S'), results=results)
+    if options.output:
+        with open(options.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print("\nReport written to %s" % options.output)
+
+    if options.compare:
+        with open(options.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, options.threshold)
+        print("\nComparison with %s (mixture %s): %s regression(s)"
+              % (options.compare, baseline.get('mixture_version'), len(regressions)))
+        for key, old, new in regressions:
+            print("  %s: %.3e -> %.3e (%.2fx)" % ('/'.join(str(k) for k in key), old, new, new / old))
+        if len(regressions) > 0:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
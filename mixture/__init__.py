@@ -1,4 +1,18 @@
-from .core import apply_mixins, MixinContainsInitWarning
+from .core import apply_mixins, MixinContainsInitWarning, get_plan_cache_info, set_plan_cache_size, clear_plan_cache, \
+    deferred_registration, flush_registrations, has_mixin, materialize, get_consumers
+from .compose import mix, apply_mixins_to_instance, get_mix_cache_info, set_mix_cache_size, clear_mix_cache
+from .profiling import DecorationRecord, enable_profiling, disable_profiling, is_profiling_enabled, profiling, \
+    get_profile_records, clear_profile_records, get_profile_summary
+from .instrumentation import CallStats, instrument, uninstrument, enable_instrumentation, disable_instrumentation, \
+    get_call_stats, reset_call_stats
+from .hotswap import reapply_mixins, remove_mixins, get_mixin_consumers
+from .columnar import ColumnStore, batched, get_column_store
+from .mixins import CachingMixin, cached, cached_property, PoolingMixin, DerivedMixin, derived
+
+from os import environ as _environ
+if _environ.get('MIXTURE_PRECOMPOSED', ''):
+    # load the precomposed plans listed in this environment variable (see `mixture.aot`)
+    from . import aot as _aot
 
 try:
     # Distribution mode : import from _version.py generated by setuptools_scm during release
@@ -12,7 +26,17 @@ except ImportError:
 __all__ = [
     '__version__',
     # submodules
-    'core',
+    'core', 'compose', 'profiling', 'instrumentation', 'hotswap', 'columnar', 'mixins',
     # symbols
-    'apply_mixins', 'MixinContainsInitWarning'
+    'apply_mixins', 'MixinContainsInitWarning',
+    'get_plan_cache_info', 'set_plan_cache_size', 'clear_plan_cache',
+    'deferred_registration', 'flush_registrations', 'has_mixin', 'materialize', 'get_consumers',
+    'mix', 'apply_mixins_to_instance', 'get_mix_cache_info', 'set_mix_cache_size', 'clear_mix_cache',
+    'DecorationRecord', 'enable_profiling', 'disable_profiling', 'is_profiling_enabled', 'profiling',
+    'get_profile_records', 'clear_profile_records', 'get_profile_summary',
+    'CallStats', 'instrument', 'uninstrument', 'enable_instrumentation', 'disable_instrumentation',
+    'get_call_stats', 'reset_call_stats',
+    'reapply_mixins', 'remove_mixins', 'get_mixin_consumers',
+    'ColumnStore', 'batched', 'get_column_store',
+    'CachingMixin', 'cached', 'cached_property', 'PoolingMixin', 'DerivedMixin', 'derived'
 ]
@@ -0,0 +1,192 @@
+#  Authors: Sylvain Marie <sylvain.marie@se.com>
+#
+#  Copyright (c) Schneider Electric Industries, 2019. All right reserved.
+
+from collections import OrderedDict, namedtuple
+from threading import Lock
+from weakref import WeakValueDictionary
+
+try:  # python 3.5+
+    from typing import Any, Callable, Hashable, Optional
+except ImportError:
+    pass
+
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'maxsize', 'currsize'])
+"""Statistics of a cache, with the same fields than `functools.lru_cache`'s `cache_info()`"""
+
+
+class LRUCache(object):
+    """
+    A minimal bounded mapping with least-recently-used eviction and hit/miss statistics.
+
+    `maxsize=None` means unbounded. `maxsize=0` disables caching (every lookup is a miss and nothing is stored).
+
+    It is thread-safe: each operation holds a lock, only for the few dictionary operations it performs.
+    """
+    __slots__ = ('_data', '_lock', 'maxsize', 'hits', 'misses')
+
+    def __init__(self, maxsize=128):
+        # type: (Optional[int]) -> None
+        self._data = OrderedDict()
+        self._lock = Lock()
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None, is_valid=None):
+        # type: (Hashable, Any, Optional[Callable[[Any], bool]]) -> Any
+        """
+        Returns the value stored for `key`, and marks it as most recently used. Updates the statistics. If `is_valid`
+        is provided and returns `False` for the stored value, this is considered as a miss.
+        """
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            if is_valid is not None and not is_valid(value):
+                self.misses += 1
+                return default
+            self.hits += 1
+            self._move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        # type: (Hashable, Any) -> None
+        """Stores `value` for `key`, evicting the least recently used entries if the size bound is reached."""
+        if self.maxsize == 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._move_to_end(key)
+            self._shrink()
+
+    def remove_if(self, predicate):
+        # type: (Callable[[Hashable], bool]) -> int
+        """Removes all entries whose key satisfies `predicate`, and returns their number"""
+        with self._lock:
+            keys = [k for k in self._data if predicate(k)]
+            for k in keys:
+                del self._data[k]
+            return len(keys)
+
+    def resize(self, maxsize):
+        # type: (Optional[int]) -> None
+        """Changes the size bound, evicting entries if needed"""
+        with self._lock:
+            self.maxsize = maxsize
+            self._shrink()
+
+    def clear(self):
+        """Removes all entries and resets the statistics"""
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def info(self):
+        # type: (...) -> CacheInfo
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self.maxsize, len(self._data))
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def _shrink(self):
+        if self.maxsize is not None:
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def _move_to_end(self, key):
+        try:
+            self._data.move_to_end(key)
+        except AttributeError:
+            # python 2: OrderedDict has no move_to_end
+            self._data[key] = self._data.pop(key)
+
+
+class WeakInternCache(object):
+    """
+    An interning cache: values are held weakly, so that an entry lives exactly as long as its value is referenced
+    somewhere else. In addition, the `maxsize` most recently used values are kept alive by the cache itself, so that
+    values that are repeatedly requested and dropped are not recreated every time.
+
+    `maxsize=None` keeps all values alive. `maxsize=0` holds all values weakly.
+
+    Values can be created with `get_or_create`, that ensures that a single value is created for each key even when
+    several threads request it at the same time, without serializing the creation of values for different keys.
+    """
+    __slots__ = ('_refs', '_keepalive', '_creation_locks', 'hits', 'misses')
+
+    def __init__(self, maxsize=128):
+        # type: (Optional[int]) -> None
+        self._refs = WeakValueDictionary()
+        self._keepalive = LRUCache(maxsize)
+        self._creation_locks = dict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        # type: (Hashable, Any) -> Any
+        """Returns the value stored for `key` if it is still alive, and marks it as most recently used."""
+        value = self._refs.get(key)
+        if value is None:
+            self.misses += 1
+            return default
+        else:
+            self.hits += 1
+            self._keepalive.put(key, value)
+            return value
+
+    def put(self, key, value):
+        # type: (Hashable, Any) -> None
+        """Stores `value` for `key`, evicting the least recently used values from the keep-alive list if needed."""
+        self._refs[key] = value
+        self._keepalive.put(key, value)
+
+    def get_or_create(self, key, factory):
+        # type: (Hashable, Callable[[], Any]) -> Any
+        """
+        Returns the value stored for `key` if it is still alive (see `get`), or else creates it by calling `factory()`
+        and stores it. The value is only published in the cache once `factory` has returned. Threads requesting the same
+        missing key wait for the first one to create it, using a lock dedicated to that key.
+        """
+        value = self.get(key)
+        if value is None:
+            # note: dict.setdefault is atomic, so all threads get the same lock for a given key. The lock is removed
+            # by the thread creating the value once it is published, so that later lookups find the value instead.
+            lock = self._creation_locks.setdefault(key, Lock())
+            with lock:
+                value = self._refs.get(key)
+                if value is None:
+                    value = factory()
+                    self.put(key, value)
+                    self._creation_locks.pop(key, None)
+        return value
+
+    def resize(self, maxsize):
+        # type: (Optional[int]) -> None
+        """Changes the number of values kept alive"""
+        self._keepalive.resize(maxsize)
+
+    def clear(self):
+        """Removes all entries and resets the statistics"""
+        self._refs.clear()
+        self._keepalive.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def info(self):
+        # type: (...) -> CacheInfo
+        return CacheInfo(self.hits, self.misses, self._keepalive.maxsize, len(self._refs))
+
+    def __len__(self):
+        return len(self._refs)
+
+    def __contains__(self, key):
+        return key in self._refs
@@ -0,0 +1,102 @@
+#  Authors: Sylvain Marie <sylvain.marie@se.com>
+#
+#  Copyright (c) Schneider Electric Industries, 2019. All right reserved.
+"""
+Asynchronous adapters of blocking mixin methods, installed by `apply_mixins(..., async_methods=...)`. This module
+requires python 3.5+ and is only imported when this option is used.
+"""
+from concurrent.futures import Executor
+from functools import partial
+from inspect import iscoroutinefunction
+from types import FunctionType
+
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple, Union
+
+try:  # python 3.7+
+    from asyncio import get_running_loop as _get_loop
+except ImportError:
+    from asyncio import get_event_loop as _get_loop
+
+
+ASYNC_PREFIX = 'a'
+"""The prefix of the names of the asynchronous adapters"""
+
+
+def get_executor_getter(executor):
+    # type: (Union[None, Executor, Callable[[], Executor]]) -> Callable[[], Optional[Executor]]
+    """
+    Returns a function returning the executor to use: `executor` itself, the result of calling it, or `None` for the
+    default executor of the event loop.
+    """
+    if executor is None or isinstance(executor, Executor):
+        return lambda: executor
+    if callable(executor):
+        return executor
+    raise TypeError("`executor` should be an `Executor`, a callable returning one, or `None`. Found %r" % (executor, ))
+
+
+def make_async_adapter(name, get_executor):
+    # type: (str, Callable[[], Optional[Executor]]) -> Callable
+    """
+    Creates the coroutine function `a<name>`, calling method `name` of the object in an executor and awaiting its
+    result. The method is looked up on the object at each call, so overrides and instrumentation are taken into
+    account.
+
+    With a process pool executor, the object, the arguments and the result are pickled: modifications of the object
+    made by the method are not visible in the caller process.
+
+    :param name: the name of the blocking method
+    :param get_executor: a function returning the executor to use, or `None` for the default one of the event loop
+    :return:
+    """
+    async def adapter(self, *args, **kwargs):
+        return await _get_loop().run_in_executor(get_executor(), partial(getattr(self, name), *args, **kwargs))
+
+    adapter.__name__ = ASYNC_PREFIX + name
+    adapter.__doc__ = "Asynchronous version of `%s`, executed in an executor so that the event loop is not blocked." \
+                      % name
+    return adapter
+
+
+def add_async_adapters(orig_cls,   # type: type
+                       to_install,  # type: Dict[str, Any]
+                       names,      # type: Union[bool, Iterable[str]]
+                       executor    # type: Union[None, Executor, Callable[[], Executor]]
+                       ):
+    # type: (...) -> Tuple[str, ...]
+    """
+    Adds to `to_install` (the members that `apply_mixins` is about to install on `orig_cls`) the asynchronous adapters
+    of the methods `names`, or of all the copied methods if `names` is `True`. Adapters are not created when the class
+    already defines a member with the same name.
+
+    :param orig_cls: the decorated class
+    :param to_install: the members to install. Modified in place
+    :param names: the names of the methods, or `True`
+    :param executor: an `Executor`, a callable returning one, or `None` for the default executor of the event loop
+    :return: the names of the adapters added
+    """
+    def _is_blocking_method(member):
+        return isinstance(member, FunctionType) and not iscoroutinefunction(member)
+
+    if isinstance(names, str):
+        names = (names, )
+    if names is True:
+        names = sorted(n for n, m in to_install.items() if not n.startswith('_') and _is_blocking_method(m))
+    else:
+        for name in names:
+            if not _is_blocking_method(to_install.get(name, orig_cls.__dict__.get(name))):
+                raise ValueError("Can not create an asynchronous adapter for '%s': it is not a method of the class or "
+                                 "of its mixins" % name)
+
+    get_executor = get_executor_getter(executor)
+    added = []
+    for name in names:
+        adapter_name = ASYNC_PREFIX + name
+        if adapter_name in orig_cls.__dict__ or adapter_name in to_install:
+            continue
+        adapter = make_async_adapter(name, get_executor)
+        adapter.__qualname__ = "%s.%s" % (orig_cls.__qualname__, adapter_name)
+        adapter.__module__ = orig_cls.__module__
+        to_install[adapter_name] = adapter
+        added.append(adapter_name)
+    return tuple(added)
@@ -0,0 +1,230 @@
+#  Authors: Sylvain Marie <sylvain.marie@se.com>
+#
+#  Copyright (c) Schneider Electric Industries, 2019. All right reserved.
+"""
+Ahead-of-time composition: the composition plans computed by `apply_mixins` when a package is imported can be
+generated once in a python module (at build time), with direct references to the members to copy. When this module is
+loaded at runtime, `apply_mixins` uses these plans instead of analyzing the mixins again.
+
+Usage (at build time): python -m mixture.aot mypackage -o mypackage/_precomposed.py
+
+Then at runtime, either set the `MIXTURE_PRECOMPOSED` environment variable to `mypackage._precomposed`, or call
+`load_precomposed('mypackage._precomposed')` before the package is imported.
+"""
+from __future__ import print_function
+
+import argparse
+import os
+import sys
+from contextlib import contextmanager
+from importlib import import_module
+from operator import itemgetter
+from pkgutil import walk_packages
+
+from mixture.core import CompositionPlan, get_namespaces, _PRECOMPOSED, _PRECOMPOSED_PLANS, _COMPOSITION_RECORDS
+from mixture.profiling import qualified_name
+
+try:  # python 3.5+
+    from typing import Any, Iterable, List, Optional, Sequence, Tuple, Type, Union
+    from types import ModuleType
+except ImportError:
+    pass
+
+
+PRECOMPOSED_ENV_VAR = 'MIXTURE_PRECOMPOSED'
+"""Name of the environment variable containing the (comma-separated) precomposed modules to load at import time"""
+
+
+def resolve(module_name, qualname):
+    # type: (str, str) -> Any
+    """
+    Returns the object with qualified name `qualname` in module `module_name`, importing the module if needed.
+
+    :param module_name: the module name
+    :param qualname: the qualified name of the object in the module, for example `Outer.Inner`
+    :return:
+    """
+    try:
+        obj = sys.modules[module_name]
+    except KeyError:
+        obj = import_module(module_name)
+    for name in qualname.split('.'):
+        obj = getattr(obj, name)
+    return obj
+
+
+def precomposed_plan(classes,         # type: Sequence[Type]
+                     names,           # type: Sequence[Tuple[str, ...]]
+                     copied_names,    # type: Tuple[str, ...]
+                     slots=(),        # type: Tuple[str, ...]
+                     namespaces=None  # type: Tuple[Tuple[str, ...], ...]
+                     ):
+    # type: (...) -> Optional[CompositionPlan]
+    """
+    Creates a `CompositionPlan` from its precomposed description. This is called by the generated modules.
+
+    :param classes: the mixins and their ancestors, in method resolution order
+    :param names: for each class, the names of the members to copy from it
+    :param copied_names: the names of all members to copy, in order
+    :param slots: the names declared in the `__slots__` of the classes
+    :param namespaces: for each class, the names of all its members when the plan was generated (see
+        `mixture.core.get_namespaces`). If provided and the classes do not have the same members anymore, `None` is
+        returned so that the mixins are analyzed again.
+    :return:
+    """
+    if namespaces is not None and get_namespaces(classes) != tuple(namespaces):
+        return None
+
+    members = dict()
+    for c, c_names in zip(classes, names):
+        if len(c_names) == 1:
+            members[c_names[0]] = c.__dict__[c_names[0]]
+        elif len(c_names) > 1:
+            members.update(zip(c_names, itemgetter(*c_names)(c.__dict__)))
+    if len(copied_names) > 1:
+        to_copy = dict(zip(copied_names, itemgetter(*copied_names)(members)))
+    else:
+        to_copy = members
+    init_mixins = tuple(c for c in classes if '__init__' in c.__dict__)
+    return CompositionPlan(to_copy, init_mixins, slots, dict(zip(classes, names)))
+
+
+def load_precomposed(module):
+    # type: (Union[str, ModuleType]) -> int
+    """
+    Loads the composition plans of a module generated by `generate_precomposed_module`, so that `apply_mixins` uses
+    them instead of analyzing the mixins. This should be done before the decorated classes are imported. A plan is
+    only used if the decorated class and its mixins (and their ancestors) have the same names and members than when
+    it was generated: otherwise the mixins are analyzed as usual.
+
+    :param module: a generated module or its name
+    :return: the number of plans loaded
+    """
+    if not hasattr(module, 'PRECOMPOSED'):
+        module = import_module(module)
+    _PRECOMPOSED.update(module.PRECOMPOSED)
+    return len(module.PRECOMPOSED)
+
+
+def unload_precomposed():
+    """Removes all the composition plans loaded with `load_precomposed`"""
+    _PRECOMPOSED.clear()
+    _PRECOMPOSED_PLANS.clear()
+
+
+@contextmanager
+def recording_compositions():
+    """
+    A context manager recording the composition plans computed by `apply_mixins` inside the `with` block, and yielding
+    the list of records (see `mixture.core._COMPOSITION_RECORDS`).
+    """
+    previous = _COMPOSITION_RECORDS[0]
+    records = _COMPOSITION_RECORDS[0] = []
+    try:
+        yield records
+    finally:
+        _COMPOSITION_RECORDS[0] = previous
+
+
+def _is_importable(cls):
+    # type: (Type) -> bool
+    """Returns `True` if `cls` can be retrieved from its module by its qualified name"""
+    qualname = getattr(cls, '__qualname__', cls.__name__)
+    if '<locals>' in qualname:
+        return False
+    try:
+        return resolve(cls.__module__, qualname) is cls
+    except (ImportError, AttributeError):
+        return False
+
+
+def generate_precomposed_module(records):
+    # type: (Iterable[Tuple]) -> str
+    """
+    Returns the source code of a module containing the composition plans in `records` (see
+    `recording_compositions`). Identical plans (same mixins and same members to copy) are generated once and shared.
+    Classes that can not be imported by qualified name (for example classes defined in a function) are skipped.
+
+    :param records: the records of the plans to generate
+    :return:
+    """
+    lines = ['"""',
+             'Composition plans generated ahead of time by `mixture.aot`. Do not edit: generate it again when the',
+             'mixins or the decorated classes change. See `mixture.aot.load_precomposed`.',
+             '"""',
+             'from mixture.aot import resolve, precomposed_plan']
+    entries = []
+    plan_functions = dict()
+    for cls_name, mixin_classes, own_names, inherited_from_mixins, plan in records:
+        if '<locals>' in cls_name:
+            continue
+        classes = plan.classes
+        if not all(_is_importable(c) for c in classes):
+            continue
+
+        description = (tuple((c.__module__, getattr(c, '__qualname__', c.__name__)) for c in classes),
+                       plan.names, plan.copied_names, plan.slots, plan.namespaces)
+        try:
+            func_name = plan_functions[description]
+        except KeyError:
+            func_name = plan_functions[description] = '_plan_%s' % len(plan_functions)
+            lines += ['', '', 'def %s():' % func_name,
+                      '    return precomposed_plan(',
+                      '        classes=(']
+            lines += ['            resolve(%r, %r),' % c for c in description[0]]
+            lines += ['        ),',
+                      '        names=%r,' % (description[1],),
+                      '        copied_names=%r,' % (description[2],),
+                      '        slots=%r,' % (description[3],),
+                      '        namespaces=%r)' % (description[4],)]
+
+        entries.append('    %r: (%r, frozenset(%r), %r, %s),'
+                       % (cls_name, tuple(qualified_name(m) for m in mixin_classes), sorted(own_names),
+                          inherited_from_mixins, func_name))
+
+    lines += ['', '', 'PRECOMPOSED = {'] + entries + ['}', '']
+    return '\n'.join(lines)
+
+
+def compose_ahead_of_time(package_names):
+    # type: (Iterable[str]) -> str
+    """
+    Imports the packages `package_names` and all their submodules, and returns the source code of a module containing
+    the composition plans of all classes decorated with `apply_mixins` during these imports. This should be run in a
+    fresh process, since modules already imported are not executed again.
+
+    :param package_names: the names of the packages (or modules) to import
+    :return:
+    """
+    with recording_compositions() as records:
+        for package_name in package_names:
+            package = import_module(package_name)
+            if hasattr(package, '__path__'):
+                for _, module_name, _ in walk_packages(package.__path__, prefix=package_name + '.'):
+                    import_module(module_name)
+    return generate_precomposed_module(records)
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description="Generates a module containing the composition plans of all classes "
+                                                 "decorated with `apply_mixins` in the given packages.")
+    parser.add_argument('packages', nargs='+', help="the names of the packages to import")
+    parser.add_argument('-o', '--output', help="path of the module to write. By default it is printed")
+    options = parser.parse_args(args)
+
+    src = compose_ahead_of_time(options.packages)
+    if options.output:
+        with open(options.output, 'w') as f:
+            f.write(src)
+    else:
+        print(src)
+    return 0
+
+
+for _module_name in os.environ.get(PRECOMPOSED_ENV_VAR, '').split(','):
+    if _module_name.strip():
+        load_precomposed(_module_name.strip())
+
+
+if __name__ == '__main__':
+    sys.exit(main())
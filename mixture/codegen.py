@@ -0,0 +1,152 @@
+#  Authors: Sylvain Marie <sylvain.marie@se.com>
+#
+#  Copyright (c) Schneider Electric Industries, 2019. All right reserved.
+
+try:  # python 3.5+
+    from typing import Any, Callable, Dict, Optional, Sequence, Tuple, Type
+except ImportError:
+    pass
+
+
+def compile_function(func_name, src, globs, owner_cls=None):
+    # type: (str, str, Dict[str, Any], Type) -> Callable
+    """
+    Compiles the source code `src` of function `func_name` with global namespace `globs` and returns the function.
+    If `owner_cls` is provided, the function qualified name and module are set as if it was defined in that class.
+
+    :param func_name: the name of the function defined in `src`
+    :param src: the source code
+    :param globs: the global namespace of the function. Modified in place
+    :param owner_cls: the class that the function will be installed on
+    :return:
+    """
+    owner_name = getattr(owner_cls, '__qualname__', getattr(owner_cls, '__name__', None))
+    filename = "<mixture generated %s>" % (func_name if owner_name is None else "%s.%s" % (owner_name, func_name))
+    exec(compile(src, filename, 'exec'), globs)
+    f = globs[func_name]
+    if owner_cls is not None:
+        f.__module__ = owner_cls.__module__
+        try:
+            f.__qualname__ = "%s.%s" % (owner_name, func_name)
+        except AttributeError:
+            # python 2: no __qualname__
+            pass
+    return f
+
+
+def make_fields_init(fields,          # type: Sequence[Tuple[str, Any]]
+                     next_init=None,  # type: Optional[Callable]
+                     owner_cls=None   # type: Type
+                     ):
+    # type: (...) -> Callable
+    """
+    Generates and compiles an `__init__` method setting all `pyfields` fields with a default value or a default factory
+    eagerly, then calling `next_init` if provided, with the same arguments. Mandatory fields (without default) are
+    left untouched.
+
+    Fields are set with a normal attribute assignment, so native fields are directly stored in the instance `__dict__`
+    while descriptor fields go through their validators and converters.
+
+    For example with fields `a = field(default=1)` and `b = field(default_factory=...)` and no `next_init`, this
+    generates:
+
+        def __init__(self):
+            self.a = _default_a
+            self.b = _factory_b(self)
+
+    :param fields: a sequence of (name, field) tuples
+    :param next_init: an optional `__init__` method to call after the fields have been set. If `None`, the generated
+        method does not accept any argument.
+    :param owner_cls: the class that the `__init__` method will be installed on
+    :return:
+    """
+    globs = dict()
+    body = []
+    for f_name, field in fields:
+        if field.is_mandatory:
+            continue
+        if field.is_default_factory:
+            globs['_factory_' + f_name] = field.default
+            body.append("    self.%s = _factory_%s(self)" % (f_name, f_name))
+        else:
+            globs['_default_' + f_name] = field.default
+            body.append("    self.%s = _default_%s" % (f_name, f_name))
+
+    if next_init is not None:
+        globs['_next_init'] = next_init
+        signature = "self, *args, **kwargs"
+        body.append("    _next_init(self, *args, **kwargs)")
+    else:
+        signature = "self"
+        if len(body) == 0:
+            body.append("    pass")
+
+    src = "def __init__(%s):\n%s\n" % (signature, "\n".join(body))
+    return compile_function('__init__', src, globs, owner_cls)
+
+
+def make_fields_eq(names,           # type: Sequence[str]
+                   owner_cls=None,  # type: Type
+                   negate=False     # type: bool
+                   ):
+    # type: (...) -> Callable
+    """
+    Generates and compiles an `__eq__` method comparing the fields `names` of two objects of the same class, one by
+    one (as `dataclasses` does). Objects of other classes are not compared (`NotImplemented` is returned).
+
+    For example with fields `a` and `b`, this generates:
+
+        def __eq__(self, other):
+            if other.__class__ is self.__class__:
+                return self.a == other.a and self.b == other.b
+            return NotImplemented
+
+    :param names: the names of the fields, in order
+    :param owner_cls: the class that the method will be installed on
+    :param negate: if `True`, generates the opposite `__ne__` method instead (needed on python 2 only)
+    :return:
+    """
+    func_name = '__ne__' if negate else '__eq__'
+    comparison = " and ".join("self.%s == other.%s" % (n, n) for n in names) or "True"
+    src = "def %s(self, other):\n" \
+          "    if other.__class__ is self.__class__:\n" \
+          "        return %s(%s)\n" \
+          "    return NotImplemented\n" % (func_name, "not " if negate else "", comparison)
+    return compile_function(func_name, src, dict(), owner_cls)
+
+
+def make_fields_hash(names, owner_cls=None):
+    # type: (Sequence[str], Type) -> Callable
+    """
+    Generates and compiles a `__hash__` method hashing the tuple of the fields `names`. For example with fields `a`
+    and `b`, this generates:
+
+        def __hash__(self):
+            return hash((self.a, self.b))
+
+    :param names: the names of the fields, in order
+    :param owner_cls: the class that the method will be installed on
+    :return:
+    """
+    src = "def __hash__(self):\n" \
+          "    return hash((%s))\n" % "".join("self.%s, " % n for n in names)
+    return compile_function('__hash__', src, dict(), owner_cls)
+
+
+def make_fields_repr(names, owner_cls=None):
+    # type: (Sequence[str], Type) -> Callable
+    """
+    Generates and compiles a `__repr__` method displaying the class name and the fields `names`. For example with
+    fields `a` and `b`, this generates:
+
+        def __repr__(self):
+            return "%s(a=%r, b=%r)" % (self.__class__.__name__, self.a, self.b)
+
+    :param names: the names of the fields, in order
+    :param owner_cls: the class that the method will be installed on
+    :return:
+    """
+    src = "def __repr__(self):\n" \
+          "    return '%%s(%s)' %% (self.__class__.__name__, %s)\n" \
+          % (", ".join("%s=%%r" % n for n in names), "".join("self.%s, " % n for n in names))
+    return compile_function('__repr__', src, dict(), owner_cls)
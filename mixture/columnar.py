@@ -0,0 +1,250 @@
+#  Authors: Sylvain Marie <sylvain.marie@se.com>
+#
+#  Copyright (c) Schneider Electric Industries, 2019. All right reserved.
+"""
+Columnar (struct-of-arrays) storage for the fields of classes decorated with `apply_mixins(..., columnar=True)`: the
+values of each mixin field are stored in a typed array shared by all instances of the class, and each instance only
+holds its row index.
+"""
+from array import array
+from threading import RLock
+from types import MethodType
+
+try:  # python 3.5+
+    from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Type, Union
+except ImportError:
+    pass
+
+
+COLUMN_STORE_TAG = '__column_store__'
+"""Attribute set on classes decorated in columnar mode, containing their `ColumnStore`"""
+
+ROW_SLOT = '__row__'
+"""Name of the slot containing the row index of each instance of a class decorated in columnar mode"""
+
+try:  # python 3.3+: 64 bits integers
+    array('q')
+    _INT_TYPECODE = 'q'
+except ValueError:
+    _INT_TYPECODE = 'l'
+
+COLUMN_TYPECODES = {float: 'd', int: _INT_TYPECODE, bool: 'b'}
+"""The `array` typecodes used for the fields with these type hints. Fields of other types are stored in lists"""
+
+_ZEROS = {'d': 0.0, _INT_TYPECODE: 0, 'b': False}
+
+
+class ColumnStore(object):
+    """
+    The columns of a class decorated with `apply_mixins(..., columnar=True)`: one `array.array` per numeric field (or
+    one list per field of another type), and an `alive` array of flags indicating which rows are in use.
+
+    Rows are allocated when instances are created, and released when they are garbage collected: their values are then
+    reset to the defaults and the row is reused by the next instance. Functions running over whole columns (see
+    `batched`) should therefore ignore the rows with an `alive` flag of `0`.
+    """
+    __slots__ = ('names', 'defaults', 'alive', '_columns', '_column_list', '_free', '_lock')
+
+    def __init__(self, columns):
+        # type: (Sequence[Tuple[str, Optional[str], Any]]) -> None
+        """
+        :param columns: a sequence of (name, typecode, default) tuples. A typecode of `None` means a list column
+        """
+        self.names = tuple(name for name, _, _ in columns)
+        self.defaults = tuple(default for _, _, default in columns)
+        self._column_list = [array(typecode) if typecode is not None else [] for _, typecode, _ in columns]
+        self._columns = dict(zip(self.names, self._column_list))
+        self.alive = array('b')
+        self._free = []
+        # reentrant: a release may happen during an allocation, if it triggers a garbage collection
+        self._lock = RLock()
+
+    def __len__(self):
+        """The number of rows, including the released ones"""
+        return len(self.alive)
+
+    def __getitem__(self, name):
+        # type: (str) -> Union[array, List]
+        """Returns the column `name`"""
+        return self._columns[name]
+
+    @property
+    def nb_alive(self):
+        # type: (...) -> int
+        """The number of rows in use"""
+        return len(self.alive) - len(self._free)
+
+    def allocate(self):
+        # type: (...) -> int
+        """Returns the index of a new row containing the default values, reusing a released row if possible"""
+        with self._lock:
+            if len(self._free) > 0:
+                # the released values may have been modified by functions running over whole columns
+                row = self._free.pop()
+                for column, default in zip(self._column_list, self.defaults):
+                    column[row] = default
+            else:
+                row = len(self.alive)
+                for column, default in zip(self._column_list, self.defaults):
+                    column.append(default)
+                self.alive.append(0)
+            self.alive[row] = 1
+            return row
+
+    def release(self, row):
+        # type: (int) -> None
+        """Releases row `row`: its values are reset to the defaults, and it will be reused by `allocate`"""
+        with self._lock:
+            self.alive[row] = 0
+            for column, default in zip(self._column_list, self.defaults):
+                column[row] = default
+            self._free.append(row)
+
+    def numpy(self, column):
+        # type: (Union[str, array]) -> Any
+        """
+        Returns a `numpy` array sharing its memory with a column, so that vectorized operations can read and write it
+        without copying. Boolean columns (including `alive`) are seen as `bool` arrays.
+
+        Note that a column can not grow while such a view exists: the view should be released before new instances are
+        created.
+
+        :param column: the name of a numeric column, or a column, for example `store.alive`
+        :return:
+        """
+        import numpy as np
+
+        if not isinstance(column, array):
+            column = self._columns[column]
+            if not isinstance(column, array):
+                raise TypeError("Only numeric columns can be viewed as numpy arrays")
+        dtype = np.bool_ if column.typecode == 'b' else np.dtype(column.typecode)
+        if len(column) == 0:
+            return np.empty(0, dtype=dtype)
+        return np.frombuffer(column, dtype=dtype)
+
+
+def get_column_spec(field):
+    # type: (Any) -> Tuple[Optional[str], Any]
+    """
+    Returns the (typecode, default) of the column storing the values of `pyfields` field `field`. The typecode is
+    `None` for fields that are not `float`, `int` or `bool`, or that have a default value of another type.
+
+    Mandatory fields and fields with a default factory have a default of zero (or `None` for list columns): factories
+    are called when instances are created.
+
+    :param field: a `pyfields` field
+    :return:
+    """
+    try:
+        typecode = COLUMN_TYPECODES.get(field.type_hint)
+    except TypeError:
+        # unhashable type hint
+        typecode = None
+
+    if field.is_mandatory or field.is_default_factory:
+        default = _ZEROS.get(typecode)
+    else:
+        default = field.default
+        if typecode is not None and not isinstance(default, field.type_hint):
+            typecode = None
+    return typecode, default
+
+
+class ColumnField(object):
+    """
+    The descriptor installed in place of a mixin field by `apply_mixins(..., columnar=True)`: the value is stored in a
+    column of the class `ColumnStore`, at the row of the instance.
+    """
+    __slots__ = ('name', 'column')
+
+    def __init__(self, name, column):
+        # type: (str, Union[array, List]) -> None
+        self.name = name
+        self.column = column
+
+    def __get__(self, obj, obj_type=None):
+        if obj is None:
+            return self
+        return self.column[obj.__row__]
+
+    def __set__(self, obj, value):
+        self.column[obj.__row__] = value
+
+
+class BoolColumnField(ColumnField):
+    """A `ColumnField` for `bool` fields, stored as bytes"""
+    __slots__ = ()
+
+    def __get__(self, obj, obj_type=None):
+        if obj is None:
+            return self
+        return self.column[obj.__row__] != 0
+
+
+def make_column_field(name, column):
+    # type: (str, Union[array, List]) -> ColumnField
+    """Returns the descriptor giving access to the values of column `column`"""
+    if isinstance(column, array) and column.typecode == 'b':
+        return BoolColumnField(name, column)
+    return ColumnField(name, column)
+
+
+def get_column_store(cls):
+    # type: (Type) -> ColumnStore
+    """
+    Returns the `ColumnStore` of class `cls`, decorated with `apply_mixins(..., columnar=True)` (or of its parent).
+
+    :param cls: a class
+    :return:
+    """
+    store = getattr(cls, COLUMN_STORE_TAG, None)
+    if store is None:
+        raise TypeError("Class '%s' was not decorated with `apply_mixins(..., columnar=True)`" % cls.__name__)
+    return store
+
+
+class batched(object):
+    """
+    Decorator for the functions of a mixin that run over the whole `ColumnStore` of a class at once, for example a
+    vectorized variant of a method. Once the mixin is applied with `apply_mixins(..., columnar=True)` the function can
+    be called from the class or from any instance: it receives the store as first argument.
+
+    >>> from pyfields import field
+    >>> class PointMixin(object):
+    ...     x = field(type_hint=float, default=0.)
+    ...     def shift(self, dx):
+    ...         self.x += dx
+    ...     @batched
+    ...     def shift_all(store, dx):
+    ...         x = store['x']
+    ...         for i in range(len(x)):
+    ...             x[i] += dx
+    >>> from mixture import apply_mixins
+    >>> @apply_mixins(PointMixin, columnar=True)
+    ... class Point(object):
+    ...     pass
+    >>> points = [Point() for _ in range(3)]
+    >>> Point.shift_all(2.)
+    >>> points[1].x
+    2.0
+
+    Note that released rows (see `ColumnStore`) are included in the columns.
+    """
+    def __init__(self, func):
+        # type: (Callable) -> None
+        self.func = func
+        self.__doc__ = func.__doc__
+
+    def __get__(self, obj, obj_type=None):
+        if obj_type is None:
+            obj_type = type(obj)
+        store = getattr(obj_type, COLUMN_STORE_TAG, None)
+        if store is None:
+            # on the mixin itself, or on a class that is not columnar: see __call__
+            return self
+        return MethodType(self.func, store)
+
+    def __call__(self, *args, **kwargs):
+        raise TypeError("`@batched` function '%s' can only be called from a class decorated with "
+                        "`apply_mixins(..., columnar=True)`" % self.func.__name__)
@@ -0,0 +1,232 @@
+#  Authors: Sylvain Marie <sylvain.marie@se.com>
+#
+#  Copyright (c) Schneider Electric Industries, 2019. All right reserved.
+
+from inspect import getmro
+
+from mixture._lru import WeakInternCache
+from mixture.core import apply_mixins, get_slots, weak_key
+
+try:  # python 3.5+
+    from typing import Any, Optional, Tuple, Type, Union
+except ImportError:
+    pass
+
+
+MIX_TAG = '__mix__'
+"""Attribute set on classes created by `mix`, containing the `MixRef` describing how they were created"""
+
+
+class MixRef(object):
+    """
+    A reference to the class created by `mix(base, *mixin_classes)`, that is pickled as a call to `mix`. Since pickle
+    memoizes the objects it loads, the composed class is therefore looked up once per pickled stream.
+    """
+    __slots__ = ('base', 'mixin_classes')
+
+    def __init__(self, base, mixin_classes):
+        # type: (Type, Tuple[Type, ...]) -> None
+        self.base = base
+        self.mixin_classes = mixin_classes
+
+    def __reduce__(self):
+        return mix, (self.base,) + self.mixin_classes
+
+
+_MIX_CACHE = WeakInternCache(maxsize=0)
+"""
+The interning cache of classes created by `mix`, keyed on weak references to the base and the mixins. By default it
+does not keep any composed class alive, see `set_mix_cache_size`.
+"""
+
+
+def mix(base, *mixin_classes):
+    # type: (Type, Type) -> Type
+    """
+    Returns a subclass of `base` on which `mixin_classes` are applied with `apply_mixins`.
+
+    Composed classes are interned: as long as a composed class is alive, calling `mix` again with the same arguments
+    returns the same class object, from a dictionary lookup. Composed classes are only referenced weakly by the cache,
+    so they are freed once the application drops them. Optionally, the most recently used ones can be kept alive (see
+    `set_mix_cache_size`), so that classes that are repeatedly composed and dropped are not created again. This bounds
+    the number of classes created when compositions are performed dynamically, for example once per request.
+
+    `mix` can be called concurrently from several threads: a composed class is only returned once fully built, and is
+    only built once.
+
+    >>> class BarkerMixin(object):
+    ...     def bark(self):
+    ...         return "barking loudly"
+    >>> class Animal(object):
+    ...     pass
+    >>> BarkingAnimal = mix(Animal, BarkerMixin)
+    >>> BarkingAnimal.__name__
+    'Animal[BarkerMixin]'
+    >>> BarkingAnimal().bark()
+    'barking loudly'
+    >>> mix(Animal, BarkerMixin) is BarkingAnimal
+    True
+
+    Composed classes have the same instance layout than `base`: they do not add a `__dict__` or `__weakref__` slot if
+    `base` instances do not have one. So existing instances of `base` can be turned into instances of the composed
+    class, see `apply_mixins_to_instance`.
+
+    Instances of composed classes can be pickled, as long as the base and the mixins can be pickled by reference, see
+    `reduce_mixed`. This is needed to send them to `multiprocessing` or `concurrent.futures` process pools.
+
+    :param base: the base class. It is not modified
+    :param mixin_classes: the mixin classes to apply, in the same order than for `apply_mixins`
+    :return: the composed class
+    """
+    if len(mixin_classes) == 0:
+        return base
+
+    # note: the class is only published in the cache once fully built. Concurrent calls with the same arguments wait
+    # for it, while calls with different arguments are not blocked
+    # note: the key only references the classes weakly, so that the entry does not keep them alive until it is removed
+    return _MIX_CACHE.get_or_create(weak_key((base,) + mixin_classes), lambda: _create_mixed(base, mixin_classes))
+
+
+def _create_mixed(base, mixin_classes):
+    # type: (Type, Tuple[Type, ...]) -> Type
+    """Creates a subclass of `base` with the same metaclass, and applies the mixins on it"""
+    name = "%s[%s]" % (base.__name__, ', '.join(m.__name__ for m in mixin_classes))
+    namespace = {'__module__': base.__module__, '__slots__': (), MIX_TAG: MixRef(base, mixin_classes)}
+    if _has_default_reduce(base):
+        namespace['__reduce_ex__'] = reduce_mixed
+    cls = type(base)(name, (base,), namespace)
+    return apply_mixins(*mixin_classes)(cls)
+
+
+def apply_mixins_to_instance(obj, *mixin_classes):
+    # type: (Any, Type) -> Any
+    """
+    Adds the capabilities of `mixin_classes` to object `obj`, by changing its class to `mix(type(obj), *mixins)`. The
+    composed class is interned, so all objects of the same type extended with the same mixins share the same class,
+    and method lookups are as fast as for any other class. Other objects of the same type are not modified.
+
+    If `obj` was already extended, the mixins are added to the ones already applied (the new ones take precedence),
+    instead of composing a composed class.
+
+    >>> class TracingMixin(object):
+    ...     def trace(self):
+    ...         return "tracing %s" % self.name
+    >>> class Service(object):
+    ...     def __init__(self, name):
+    ...         self.name = name
+    >>> s1, s2 = Service('a'), Service('b')
+    >>> apply_mixins_to_instance(s1, TracingMixin).trace()
+    'tracing a'
+    >>> type(apply_mixins_to_instance(s2, TracingMixin)) is type(s1)
+    True
+
+    :param obj: the object to extend. Its class should not define `__slots__` that its parents do not define.
+    :param mixin_classes: the mixin classes to apply, in the same order than for `apply_mixins`
+    :return: `obj`
+    """
+    if len(mixin_classes) == 0:
+        return obj
+
+    base = obj.__class__
+    ref = base.__dict__.get(MIX_TAG)
+    if ref is not None:
+        # already extended: compose the base with all mixins
+        base = ref.base
+        mixin_classes = mixin_classes + tuple(m for m in ref.mixin_classes if m not in mixin_classes)
+
+    obj.__class__ = mix(base, *mixin_classes)
+    return obj
+
+
+def get_mix_cache_info():
+    """
+    Returns the statistics of the interning cache used by `mix`, as a named tuple with fields `hits`, `misses`,
+    `maxsize` (the number of composed classes kept alive by the cache) and `currsize` (the number of composed classes
+    currently alive).
+    """
+    return _MIX_CACHE.info()
+
+
+def set_mix_cache_size(maxsize):
+    # type: (Optional[int]) -> None
+    """
+    Sets the number of most recently used composed classes that the `mix` cache keeps alive. Other composed classes
+    are only referenced weakly and are freed when not used anymore. `None` keeps all composed classes alive, and `0`
+    (the default) keeps none of them alive.
+
+    :param maxsize: the new size bound
+    :return:
+    """
+    _MIX_CACHE.resize(maxsize)
+
+
+def clear_mix_cache():
+    """Forgets all classes composed by `mix`, and resets the statistics. Next calls will create new classes."""
+    _MIX_CACHE.clear()
+
+
+def _has_default_reduce(cls):
+    # type: (Type) -> bool
+    """Returns `True` if `cls` does not customize how its instances are pickled with `__reduce__`/`__reduce_ex__`"""
+    return getattr(cls, '__reduce_ex__', None) is object.__reduce_ex__ \
+        and getattr(cls, '__reduce__', None) is object.__reduce__
+
+
+def reduce_mixed(obj, protocol=2):
+    # type: (Any, int) -> Tuple
+    """
+    The `__reduce_ex__` method of the classes created by `mix`. These classes can not be found by pickle from their
+    name, so their instances are pickled as a call to `new_instance` with the `MixRef` of their class, followed by the
+    state of the instance. The base and the mixins are pickled by reference, and the `MixRef` is shared by all
+    instances of the class, so that pickle only stores it (and looks up the class when loading) once per stream.
+
+    Instances of subclasses of composed classes are pickled as usual.
+
+    :param obj: an instance of a class created by `mix`
+    :param protocol: the pickle protocol
+    :return:
+    """
+    ref = obj.__class__.__dict__.get(MIX_TAG)
+    if ref is None:
+        return object.__reduce_ex__(obj, protocol)
+    return new_instance, (ref,), get_state(obj)
+
+
+def new_instance(cls):
+    # type: (Union[Type, MixRef]) -> Any
+    """
+    Creates an empty instance of `cls`, without calling `__init__`. This is used by pickle to reconstruct instances of
+    composed classes, see `reduce_mixed`: `cls` is obtained by loading a `MixRef`, so the composed class is created
+    once per process, and found in the `mix` cache afterwards.
+
+    `copy.copy` does not load the arguments, so in that case `cls` is the `MixRef` itself and the class is looked up
+    in the `mix` cache.
+
+    :param cls: a class, or a `MixRef`
+    :return:
+    """
+    if isinstance(cls, MixRef):
+        cls = mix(cls.base, *cls.mixin_classes)
+    return cls.__new__(cls)
+
+
+def get_state(obj):
+    # type: (Any) -> Any
+    """
+    Returns the state of `obj` to pickle: the result of its `__getstate__` method if it has one, or its `__dict__`
+    together with the values of its slots, as the default pickle protocol does.
+
+    :param obj: an object
+    :return:
+    """
+    getstate = getattr(obj, '__getstate__', None)
+    if getstate is not None:
+        return getstate()
+
+    state = getattr(obj, '__dict__', None)
+    slots = dict()
+    for c in getmro(obj.__class__):
+        for name in get_slots(c):
+            if name not in ('__dict__', '__weakref__') and hasattr(obj, name):
+                slots[name] = getattr(obj, name)
+    return (state, slots) if len(slots) > 0 else state
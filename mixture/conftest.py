@@ -0,0 +1,14 @@
+#  Authors: Sylvain Marie <sylvain.marie@se.com>
+#
+#  Copyright (c) Schneider Electric Industries, 2019. All right reserved.
+import sys
+
+collect_ignore = []
+
+# modules and tests using the `async` syntax
+if sys.version_info < (3, 5):
+    collect_ignore += ['aio.py', 'tests/aio']
+
+# tests using `threading.Barrier` and `sys.setswitchinterval`
+if sys.version_info < (3, 2):
+    collect_ignore += ['tests/compose/test_compose_threads.py']
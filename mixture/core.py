@@ -2,29 +2,711 @@
 #
 #  Copyright (c) Schneider Electric Industries, 2019. All right reserved.
 
+import sys
+from contextlib import contextmanager
+from inspect import getmro
+from threading import RLock, local
+from types import FunctionType
 from warnings import warn
+from weakref import WeakKeyDictionary, ref
+
+from mixture._lru import LRUCache
+from mixture.codegen import make_fields_init, make_fields_eq, make_fields_hash, make_fields_repr
+from mixture.columnar import COLUMN_STORE_TAG, ROW_SLOT, ColumnStore, get_column_spec, make_column_field
+from mixture.profiling import get_records_if_enabled, timer, DecorationRecord, qualified_name
 
 try:  # python 3.5+
-    from typing import Optional, Set, List, Callable, Dict, Type, Any, TypeVar, Union, Iterable, Tuple, Mapping
+    from typing import Optional, Set, List, Callable, Dict, Type, Any, TypeVar, Union, Iterable, Tuple, Mapping, \
+        FrozenSet, Sequence
     from valid8 import ValidationFuncs, ValidationError
     use_type_hints = True
 except ImportError:
     use_type_hints = False
 
 
+try:  # python 2: old-style classes
+    from types import ClassType
+    _CLASS_TYPES = (type, ClassType)
+except ImportError:
+    _CLASS_TYPES = (type,)
+
+try:  # python 3.4+
+    from abc import ABC
+    _NOT_MIXINS = (object, ABC)
+except ImportError:
+    _NOT_MIXINS = (object,)
+
+
 FROM_MIXINS_TAG = '__from_mixins__'
 """Attribute set to classes to remember which members where copied from mixins"""
 
+MIXINS_TAG = '__mixins__'
+"""Attribute set to classes to remember which mixins (and their ancestors) were applied, as a frozenset"""
+
+LAZY_MEMBERS_TAG = '__lazy_mixin_members__'
+"""Attribute set to classes decorated in lazy mode, containing the dictionary of members not yet installed"""
+
+COPIED_MEMBERS_TAG = '__copied_mixin_members__'
+"""
+Attribute set to classes to remember the members copied from mixins as they were at that time, even if the mixins are
+modified in place afterwards (see `mixture.hotswap`). It is stored on the class rather than in a cache, so that it does
+not keep the mixins alive.
+"""
+
 
 class MixinContainsInitWarning(UserWarning):
     pass
 
 
+class CompositionPlan(object):
+    """
+    The precomputed result of the analysis performed by `apply_mixins` for a given tuple of mixin classes and a given
+    destination class: the ordered members to copy, and the mixins that should trigger a `MixinContainsInitWarning`.
+
+    Plans are immutable once created and are shared between all classes with the same composition key, see
+    `get_plan_cache_info`.
+
+    Plans only reference the mixin classes weakly, so that cached plans do not keep dynamically created mixins (and
+    therefore the classes composed from them) alive. This is also true for the members to copy, since they may
+    reference their class (for example `pyfields` fields, or functions using `super()`): they are looked up in the
+    mixins each time `to_copy` is read.
+
+    Since mixins can be modified in place, plans remember the names of the members of the classes they were computed
+    from, see `is_up_to_date`.
+    """
+    __slots__ = ('_refs', '_runs', '_others', 'copied_names', '_init_mixins', 'fields', 'slots', 'names',
+                 'namespaces')
+
+    def __init__(self,
+                 to_copy,       # type: Dict[str, Any]
+                 init_mixins,   # type: Tuple[Type, ...]
+                 slots,         # type: Tuple[str, ...]
+                 contributions  # type: Dict[Type, Tuple[str, ...]]
+                 ):
+        # type: (...) -> None
+        # the mixins and their ancestors (see `get_contributions`), and the names of the members to look up in their
+        # `__dict__`: one run of consecutive names for each class they come from, so that they are looked up in order
+        self._refs = tuple(ref(c) for c in contributions)
+        sources = dict((n, i) for i, names in enumerate(contributions.values()) for n in names)
+        runs = []
+        for m_name in to_copy:
+            i = sources.get(m_name)
+            if len(runs) > 0 and runs[-1][0] == i:
+                runs[-1][1].append(m_name)
+            else:
+                runs.append((i, [m_name]))
+        self._runs = tuple((i, tuple(names)) for i, names in runs)
+        # the members that were not attributed to a class, if any
+        self._others = dict((m_name, m) for m_name, m in to_copy.items() if m_name not in sources)
+        # the names of the members copied by this plan, that will be stored in `__from_mixins__`
+        self.copied_names = tuple(to_copy.keys())
+        self._init_mixins = tuple(ref(c) for c in init_mixins)
+        # the names of the copied members that are fields (data attributes), see `is_field`
+        self.fields = tuple(n for n, m in to_copy.items() if is_field(m))
+        # the names declared in the `__slots__` of the mixins
+        self.slots = slots
+        # the names of the copied members, for each class in `classes` (see `get_contributions`)
+        self.names = tuple(contributions.values())
+        # the names of all the members of the classes, see `get_namespaces`
+        self.namespaces = get_namespaces(contributions)
+
+    def is_up_to_date(self):
+        # type: (...) -> bool
+        """
+        Returns `False` if members were added to or removed from the classes this plan was computed from, since then.
+        """
+        return namespaces_unchanged(self._refs, self.namespaces)
+
+    @property
+    def classes(self):
+        # type: (...) -> Tuple[Type, ...]
+        """
+        The mixins and their ancestors in method resolution order, that will be stored in `__mixins__`. Since this
+        dereferences the classes, it should be read once per decoration and passed to `get_members`.
+        """
+        return tuple([r() for r in self._refs])
+
+    def get_members(self, classes):
+        # type: (Tuple[Type, ...]) -> Dict[str, Any]
+        """
+        Returns the members to copy, by name, looked up in the mixins.
+
+        :param classes: the classes of this plan, see `classes`
+        :return:
+        """
+        # note: a plain loop is faster than `operator.itemgetter` for the typical number of members
+        members = dict()
+        for i, names in self._runs:
+            d = self._others if i is None else classes[i].__dict__
+            for m_name in names:
+                members[m_name] = d[m_name]
+        return members
+
+    @property
+    def to_copy(self):
+        # type: (...) -> Dict[str, Any]
+        """The members to copy, by name, looked up in the mixins"""
+        return self.get_members(self.classes)
+
+    @property
+    def init_mixins(self):
+        # type: (...) -> Tuple[Type, ...]
+        """The mixins containing an `__init__`, that should trigger a warning"""
+        return tuple([r() for r in self._init_mixins]) if len(self._init_mixins) > 0 else ()
+
+    @property
+    def mixins(self):
+        # type: (...) -> FrozenSet[Type]
+        """The mixins and their ancestors"""
+        return frozenset(self.classes)
+
+    @property
+    def contributions(self):
+        # type: (...) -> Dict[Type, Tuple[str, ...]]
+        """The names of the copied members, by source mixin in method resolution order"""
+        return dict(zip(self.classes, self.names))
+
+
+class MixinsLinearization(object):
+    """
+    The flattened view of a tuple of mixin classes, that does not depend on the class they are applied to: the mixins
+    and all their ancestors in method resolution order, and the resulting merged namespace.
+
+    Linearizations are immutable once created and cached, see `get_mixins_linearization`. Like plans, they only
+    reference the classes weakly, and remember the names of the members of the classes, see `is_up_to_date`.
+    """
+    __slots__ = ('_refs', '_init_mixins', 'slots', 'namespaces')
+
+    def __init__(self, classes):
+        # type: (Tuple[Type, ...]) -> None
+        # the mixins and their ancestors, in method resolution order
+        self._refs = tuple(ref(c) for c in classes)
+        # the classes containing an __init__, that should trigger a warning
+        self._init_mixins = tuple(ref(c) for c in classes if '__init__' in c.__dict__)
+        # the names declared in the `__slots__` of the classes
+        slots = []
+        for c in reversed(classes):
+            slots.extend(s for s in get_slots(c) if s not in ('__dict__', '__weakref__') and s not in slots)
+        self.slots = tuple(slots)
+        # the names of all the members of the classes, see `get_namespaces`
+        self.namespaces = get_namespaces(classes)
+
+    def is_up_to_date(self):
+        # type: (...) -> bool
+        """Returns `False` if members were added to or removed from the classes since this linearization was created"""
+        return namespaces_unchanged(self._refs, self.namespaces)
+
+    @property
+    def classes(self):
+        # type: (...) -> Tuple[Type, ...]
+        """The mixins and their ancestors, in method resolution order"""
+        return tuple(r() for r in self._refs)
+
+    @property
+    def init_mixins(self):
+        # type: (...) -> Tuple[Type, ...]
+        """The classes containing an `__init__`"""
+        return tuple(r() for r in self._init_mixins)
+
+    @property
+    def members(self):
+        # type: (...) -> Dict[str, Any]
+        """The merged namespace: members of the first classes in the linearization override the others"""
+        members = dict()
+        for c in reversed(self.classes):
+            members.update(c.__dict__)
+        return members
+
+
+def get_namespaces(classes):
+    # type: (Iterable[Type]) -> Tuple[Tuple[str, ...], ...]
+    """
+    Returns the names of the members defined by each of `classes`, in definition order. This is used to detect that
+    mixins were modified in place since their linearization or composition plan was cached: comparing these tuples is
+    much cheaper than analyzing the mixins again.
+
+    :param classes: the classes
+    :return:
+    """
+    return tuple(tuple(c.__dict__) for c in classes)
+
+
+def namespaces_unchanged(refs, namespaces):
+    # type: (Iterable[ref], Tuple[Tuple[str, ...], ...]) -> bool
+    """
+    Returns `True` if the classes referenced by `refs` still define the members named in `namespaces`, as returned by
+    `get_namespaces` (this is a plain loop since it is called for each decoration).
+
+    :param refs: weak references to the classes
+    :param namespaces: the names of their members, see `get_namespaces`
+    :return:
+    """
+    for r, names in zip(refs, namespaces):
+        if tuple(r().__dict__) != names:
+            return False
+    return True
+
+
+_LINEARIZATION_CACHE = LRUCache(maxsize=256)
+"""The LRU cache of mixin linearizations, keyed on weak references to the mixin classes"""
+
+_PLAN_CACHE = LRUCache(maxsize=1024)
+"""
+The LRU cache of composition plans, keyed on weak references to the mixin classes and to the destination bases, and on
+the destination own member names and `__from_mixins__`
+"""
+
+_COLLECTED_MIXINS = []  # type: List[ref]
+"""The weak references of the mixin classes garbage collected since the caches were last purged"""
+
+
+def _on_mixin_collected(mixin_ref):
+    # note: this can be called by the garbage collector at any time, including while a cache lock is held. So the
+    # entries are only removed by the next cache operation, see `purge_collected_mixins`
+    _COLLECTED_MIXINS.append(mixin_ref)
+
+
+def weak_key(mixin_classes, track=False):
+    # type: (Iterable[Type], bool) -> Tuple[ref, ...]
+    """
+    Returns the cache key of `mixin_classes`: a tuple of weak references, that is equal to the key of the same classes
+    as long as they are alive.
+
+    :param mixin_classes: the mixin classes
+    :param track: if `True`, the cache entries stored with this key are removed when one of the classes is collected
+    :return:
+    """
+    if track:
+        return tuple(ref(m, _on_mixin_collected) for m in mixin_classes)
+    else:
+        return tuple(map(ref, mixin_classes))
+
+
+def purge_collected_mixins():
+    """
+    Removes from the caches used by `apply_mixins` the linearizations and composition plans of mixin classes that
+    were garbage collected. This is done automatically before each lookup.
+    """
+    collected = set()
+    while True:
+        # note: other threads may purge concurrently, so the list is emptied without checking its length first
+        try:
+            collected.add(id(_COLLECTED_MIXINS.pop()))
+        except IndexError:
+            break
+    if len(collected) == 0:
+        return
+
+    def _involves(refs):
+        return any(id(r) in collected for r in refs)
+
+    _LINEARIZATION_CACHE.remove_if(_involves)
+    _PLAN_CACHE.remove_if(lambda key: _involves(key[0]))
+
+
+def get_plan_cache_info():
+    """
+    Returns the statistics of the composition plans cache used by `apply_mixins`, as a named tuple with fields
+    `hits`, `misses`, `maxsize` and `currsize` (same as `functools.lru_cache`).
+    """
+    if len(_COLLECTED_MIXINS) > 0:
+        purge_collected_mixins()
+    return _PLAN_CACHE.info()
+
+
+def set_plan_cache_size(maxsize):
+    # type: (Optional[int]) -> None
+    """
+    Sets the maximum number of composition plans kept in the cache used by `apply_mixins`. Least recently used plans
+    are evicted first. `None` means unbounded, and `0` disables the cache.
+
+    :param maxsize: the new size bound
+    :return:
+    """
+    _PLAN_CACHE.resize(maxsize)
+
+
+def clear_plan_cache():
+    """
+    Removes all composition plans and mixin linearizations from the caches used by `apply_mixins`, and resets the
+    statistics.
+    """
+    _PLAN_CACHE.clear()
+    _LINEARIZATION_CACHE.clear()
+
+
+def invalidate_mixins(mixin_classes):
+    # type: (Iterable[Type]) -> None
+    """
+    Removes from the caches used by `apply_mixins` all the linearizations and composition plans involving one of
+    `mixin_classes`. Members added to or removed from mixins are detected automatically (see
+    `CompositionPlan.is_up_to_date`), but this should be done when members of mixin classes are replaced in place, so
+    that the next decorations analyze them again (for example a method replaced by a field).
+
+    :param mixin_classes: the mixin classes that were modified
+    :return:
+    """
+    mixin_classes = frozenset(mixin_classes)
+
+    def _involves(refs):
+        return any(c in mixin_classes for r in refs for c in getmro(r() or object))
+
+    _LINEARIZATION_CACHE.remove_if(_involves)
+    _PLAN_CACHE.remove_if(lambda key: _involves(key[0]))
+
+
+def get_mixins_linearization(mixin_classes):
+    # type: (Tuple[Type, ...]) -> MixinsLinearization
+    """
+    Returns the `MixinsLinearization` of `mixin_classes`, that is, the mixins and all their ancestors (except `object`
+    and `ABC`) ordered as in the method resolution order of a class that would inherit from all of them. Ancestors
+    shared by several mixins (diamond hierarchies) therefore appear once.
+
+    If no consistent order exists, the method resolution orders of all mixins are concatenated and only the first
+    occurrence of each class is kept.
+
+    Linearizations are cached, so that large mixin hierarchies are walked only once. They are created again if
+    members were added to or removed from the classes since then.
+
+    :param mixin_classes: the mixin classes, in the order received by `apply_mixins`
+    :return:
+    """
+    if len(_COLLECTED_MIXINS) > 0:
+        purge_collected_mixins()
+    lin = _LINEARIZATION_CACHE.get(weak_key(mixin_classes), is_valid=MixinsLinearization.is_up_to_date)
+    if lin is None:
+        mros = [getmro(m) for m in mixin_classes]
+        try:
+            classes = c3_merge(mros + [mixin_classes])
+        except TypeError:
+            # inconsistent hierarchy: keep the first occurrence of each class
+            classes = []
+            for mro in mros:
+                classes.extend(c for c in mro if c not in classes)
+
+        lin = MixinsLinearization(tuple(c for c in classes if c not in _NOT_MIXINS))
+        _LINEARIZATION_CACHE.put(weak_key(mixin_classes, track=True), lin)
+
+    return lin
+
+
+def skip_inherited(lin, dest_cls):
+    # type: (MixinsLinearization, Type) -> MixinsLinearization
+    """
+    Returns `lin` without the classes that `dest_cls` already inherits from. Their members should not be copied on
+    `dest_cls`: they are already available, possibly overridden by its parents.
+
+    :param lin: a mixins linearization, see `get_mixins_linearization`
+    :param dest_cls: the class the mixins are applied to
+    :return: `lin` itself if `dest_cls` does not inherit from any of its classes, or a new linearization
+    """
+    dest_mro = getmro(dest_cls)
+    classes = lin.classes
+    if any(c in dest_mro for c in classes):
+        return MixinsLinearization(tuple(c for c in classes if c not in dest_mro))
+    return lin
+
+
+def c3_merge(sequences):
+    # type: (Iterable[Sequence[Type]]) -> List[Type]
+    """
+    The C3 merge algorithm used by python to compute the method resolution order of a class from the ones of its
+    parents. Raises a `TypeError` if there is no consistent order.
+
+    >>> class A(object): pass
+    >>> class B(A): pass
+    >>> class C(A): pass
+    >>> [c.__name__ for c in c3_merge([B.__mro__, C.__mro__, (B, C)])]
+    ['B', 'C', 'A', 'object']
+
+    :param sequences: the sequences to merge
+    :return:
+    """
+    seqs = [list(seq) for seq in sequences if len(seq) > 0]
+    result = []
+    while len(seqs) > 0:
+        # find the first head that does not appear in the tail of any sequence
+        for seq in seqs:
+            head = seq[0]
+            if not any(head in other[1:] for other in seqs):
+                break
+        else:
+            raise TypeError("Cannot create a consistent method resolution order")
+
+        result.append(head)
+        for seq in seqs:
+            if seq[0] is head:
+                del seq[0]
+        seqs = [seq for seq in seqs if len(seq) > 0]
+
+    return result
+
+
+def get_composition_plan(mixin_classes, dest_cls):
+    # type: (Tuple[Type, ...], Type) -> CompositionPlan
+    """
+    Returns the `CompositionPlan` describing what `apply_mixins(*mixin_classes)` has to copy on `dest_cls`.
+
+    The members to copy are the ones of the mixins and of their ancestors, see `get_mixins_linearization`, selected by
+    `select_members_to_copy`. The classes that `dest_cls` already inherits from are skipped: their members are already
+    available, possibly overridden by the parents of `dest_cls`, as they would be with inheritance.
+
+    Plans are cached, keyed on the mixin classes, the bases of `dest_cls`, the names of the members defined in
+    `dest_cls` itself, and the current `__from_mixins__` of `dest_cls`: these are the only inputs that the selection
+    depends on, together with the members of the mixins. A cached plan is therefore only used if no member was added to
+    or removed from the mixins and their ancestors since it was computed, see `CompositionPlan.is_up_to_date`. The cache
+    only references the mixin classes and the bases weakly: the entries of a class are removed once it is garbage
+    collected.
+
+    :param mixin_classes: the mixin classes, in the order received by `apply_mixins`
+    :param dest_cls: the class to decorate
+    :return:
+    """
+    if len(_COLLECTED_MIXINS) > 0:
+        purge_collected_mixins()
+    bases, own_names = dest_cls.__bases__, frozenset(dest_cls.__dict__)
+    from_mixins = getattr(dest_cls, FROM_MIXINS_TAG, ())
+    # note: the mixins and the bases are referenced in a single tuple, which is cheaper to create and compare
+    plan = _PLAN_CACHE.get((weak_key(mixin_classes + bases), len(mixin_classes), own_names, from_mixins),
+                           is_valid=CompositionPlan.is_up_to_date)
+    if plan is None:
+        lin = skip_inherited(get_mixins_linearization(mixin_classes), dest_cls)
+        to_copy = select_members_to_copy(lin.members, dest_cls)
+        plan = CompositionPlan(to_copy, lin.init_mixins, lin.slots, get_contributions(lin.classes, to_copy))
+        _PLAN_CACHE.put((weak_key(mixin_classes + bases, track=True), len(mixin_classes), own_names, from_mixins),
+                        plan)
+
+    return plan
+
+
+_PRECOMPOSED = dict()  # type: Dict[str, Tuple[Tuple[str, ...], FrozenSet[str], Tuple[str, ...], Callable]]
+"""
+The composition plans generated ahead of time and loaded with `mixture.aot.load_precomposed`, keyed on the qualified
+name of the decorated class. Each entry contains the qualified names of the mixins, the names of the members of the
+class before decoration, its inherited `__from_mixins__`, and the function creating the `CompositionPlan`.
+"""
+
+_PRECOMPOSED_PLANS = dict()  # type: Dict[Callable, CompositionPlan]
+"""The plans created from `_PRECOMPOSED`, keyed on the function creating them (shared by identical compositions)"""
+
+_COMPOSITION_RECORDS = [None]  # type: List[Optional[List[Tuple]]]
+"""
+When not `None`, the list where `apply_mixins` records the plans it computes, see `mixture.aot`. Each record contains
+the qualified name of the decorated class, the mixin classes, the names of the members of the class before decoration,
+its inherited `__from_mixins__`, and the `CompositionPlan`.
+"""
+
+
+def get_precomposed_plan(mixin_classes, dest_cls):
+    # type: (Tuple[Type, ...], Type) -> Optional[CompositionPlan]
+    """
+    Returns the `CompositionPlan` precomposed ahead of time for `apply_mixins(*mixin_classes)` on `dest_cls`, or
+    `None` if there is none or if the mixins or the class have changed since it was generated: the names of the mixins,
+    the names of the members of the class, and the names of the members of the mixins and their ancestors are checked.
+
+    :param mixin_classes: the mixin classes, in the order received by `apply_mixins`
+    :param dest_cls: the class to decorate
+    :return:
+    """
+    entry = _PRECOMPOSED.get(qualified_name(dest_cls))
+    if entry is None:
+        return None
+    mixin_names, own_names, inherited_from_mixins, make_plan = entry
+    if own_names != frozenset(dest_cls.__dict__) \
+            or inherited_from_mixins != getattr(dest_cls, FROM_MIXINS_TAG, ()) \
+            or mixin_names != tuple(qualified_name(m) for m in mixin_classes):
+        return None
+    try:
+        plan = _PRECOMPOSED_PLANS[make_plan]
+    except KeyError:
+        # note: this is `None` if the mixins were modified since the plan was generated
+        plan = _PRECOMPOSED_PLANS[make_plan] = make_plan()
+    # the mixins may also be modified after the plan was created
+    return plan if plan is not None and plan.is_up_to_date() else None
+
+
+def get_contributions(classes, members):
+    # type: (Sequence[Type], Mapping[str, Any]) -> Dict[Type, Tuple[str, ...]]
+    """
+    Returns a dictionary containing, for each class in `classes`, the names of the `members` that it defines. Each
+    member is attributed to the first class defining it, so `classes` should be in method resolution order. All
+    classes are present in the result, possibly with an empty tuple.
+
+    :param classes: the mixins and their ancestors, in method resolution order
+    :param members: the members copied from them
+    :return:
+    """
+    contributions = {c: [] for c in classes}
+    for m_name, member in members.items():
+        for c in classes:
+            if c.__dict__.get(m_name, contributions) is member:
+                contributions[c].append(m_name)
+                break
+    return {c: tuple(names) for c, names in contributions.items()}
+
+
+_CONSUMERS = WeakKeyDictionary()  # type: Dict[Type, Dict[Type, Tuple[str, ...]]]
+"""
+The reverse index maintained by `apply_mixins`: for each mixin (or mixin ancestor), the classes it was applied to, with
+the names of the members it contributed. Both levels are weak, so this does not keep classes alive.
+"""
+
+_CONSUMERS_LOCK = RLock()
+"""Lock protecting `_CONSUMERS`, since weak dictionaries can not be iterated while they are modified"""
+
+
+def index_consumer(cls, contributions):
+    # type: (Type, Iterable[Tuple[Type, Tuple[str, ...]]]) -> None
+    """
+    Records in the reverse index that the mixins in `contributions` were applied to `cls`, with the names of the
+    members each of them contributed. Previous records for `cls` and these mixins are replaced.
+
+    :param cls: a class decorated with `apply_mixins`
+    :param contributions: (mixin, names) pairs with the names of the members contributed by each mixin, for example
+        the items of the dictionary returned by `get_contributions`
+    :return:
+    """
+    with _CONSUMERS_LOCK:
+        for mixin_class, names in contributions:
+            try:
+                consumers = _CONSUMERS[mixin_class]
+            except KeyError:
+                consumers = _CONSUMERS[mixin_class] = WeakKeyDictionary()
+            consumers[cls] = names
+
+
+def unindex_consumer(cls, mixin_classes):
+    # type: (Type, Iterable[Type]) -> None
+    """Removes from the reverse index the records stating that `mixin_classes` were applied to `cls`"""
+    with _CONSUMERS_LOCK:
+        for mixin_class in mixin_classes:
+            consumers = _CONSUMERS.get(mixin_class)
+            if consumers is not None:
+                consumers.pop(cls, None)
+
+
+def get_consumers(mixin_class):
+    # type: (Type) -> Dict[Type, Tuple[str, ...]]
+    """
+    Returns a dictionary containing the live classes on which `mixin_class` was applied with `apply_mixins` (directly
+    or as the ancestor of an applied mixin), with the names of the members that it contributed to each of them. This
+    is a lookup in a reverse index, so its cost only depends on the number of such classes.
+
+    >>> class BarkerMixin(object):
+    ...     def bark(self):
+    ...         pass
+    >>> @apply_mixins(BarkerMixin)
+    ... class Dog(object):
+    ...     pass
+    >>> get_consumers(BarkerMixin) == {Dog: ('bark',)}
+    True
+
+    :param mixin_class: a mixin class
+    :return:
+    """
+    with _CONSUMERS_LOCK:
+        return dict(_CONSUMERS.get(mixin_class, dict()).items())
+
+
+def get_indexed_mixins():
+    # type: (...) -> List[Type]
+    """Returns the list of live mixins (and mixin ancestors) that were applied to at least one live class"""
+    with _CONSUMERS_LOCK:
+        return [m for m, consumers in list(_CONSUMERS.items()) if len(consumers) > 0]
+
+
 # class MixinNotRegisterableWarning(UserWarning):
 #     pass
 
 
-def apply_mixins(*mixin_classes):
+class _DeferralState(local):
+    """
+    The state of `deferred_registration`, that is specific to each thread: the nesting level of the blocks
+    (registrations are deferred while it is positive), and the (mixin class, class) registrations waiting for
+    `flush_registrations`.
+    """
+    def __init__(self):
+        self.depth = 0
+        self.pending = []
+
+
+_DEFERRAL = _DeferralState()
+
+
+@contextmanager
+def deferred_registration():
+    """
+    A context manager deferring the ABC virtual subclass registrations performed by `apply_mixins`, until the end of
+    the outermost `with` block.
+
+    Each call to `ABCMeta.register` invalidates the negative `isinstance`/`issubclass` caches of all ABCs in the
+    process. When many classes are decorated (typically at import time), deferring the registrations groups them in a
+    single batch, so that these caches are rebuilt once after the batch instead of after every registration.
+
+    Note that inside the block, `isinstance` and `issubclass` do not see the pending registrations until
+    `flush_registrations` is called or the outermost block exits. Deferral only applies to the decorations performed
+    by the current thread.
+
+    >>> from abc import ABCMeta
+    >>> MyMixin = ABCMeta('MyMixin', (object,), {})
+    >>> with deferred_registration():
+    ...     @apply_mixins(MyMixin)
+    ...     class Foo(object):
+    ...         pass
+    ...     issubclass(Foo, MyMixin)
+    False
+    >>> issubclass(Foo, MyMixin)
+    True
+    """
+    _DEFERRAL.depth += 1
+    try:
+        yield
+    finally:
+        _DEFERRAL.depth -= 1
+        if _DEFERRAL.depth == 0:
+            flush_registrations()
+
+
+def flush_registrations():
+    """
+    Performs all ABC virtual subclass registrations deferred by `deferred_registration` in the current thread, in one
+    batch. This can be called inside a `deferred_registration` block to make the classes decorated so far visible to
+    `isinstance`.
+    """
+    # swap the list first so that registrations triggered during the flush are not lost
+    pending = _DEFERRAL.pending
+    _DEFERRAL.pending = []
+    for mixin_class, cls in pending:
+        _register_virtual_subclass(mixin_class, cls)
+
+
+def register_mixin(mixin_class, cls):
+    # type: (Type, Type) -> None
+    """
+    Registers `cls` as a virtual subclass of `mixin_class` if it is an ABC, or does nothing. Inside a
+    `deferred_registration` block, the registration is deferred.
+    """
+    if _DEFERRAL.depth > 0:
+        _DEFERRAL.pending.append((mixin_class, cls))
+    else:
+        _register_virtual_subclass(mixin_class, cls)
+
+
+def _register_virtual_subclass(mixin_class, cls):
+    """Registers `cls` as a virtual subclass of `mixin_class` if it is an ABC, or does nothing."""
+    try:
+        mixin_class.register(cls)
+    except AttributeError:
+        # warn(
+        #     "Mixin class '%s' does not seem to be an ABC so it can not be registered as the virtual parent of"
+        #     " class '%s'. As a result issubclass and isinstance will result `False`. You probably wish your "
+        #     "mixin class to inherit from `ABC` or use meta `ABCMeta` to fix this",
+        #     MixinNotRegisterableWarning)
+        # ignore silently
+        pass
+
+
+def apply_mixins(*mixin_classes, **kwargs):
     """
     Decorator to apply a list of mix-in classes in order, to the decorated class.
     The left-most class will be applied last, so as to get the same intuitive behaviour than explicit inheritance in
@@ -32,75 +714,682 @@ def apply_mixins(*mixin_classes):
 
     Classes are
 
+    The analysis of what has to be copied is cached (see `get_composition_plan`), so that applying the same mixins
+    several times to similar classes is cheap.
+
+    By default members are copied one by one on the decorated class with `setattr`. Each call invalidates the type
+    attribute cache of the class and of its subclasses. With `rebuild=True` the final namespace is built in a single
+    pass and a new class is created from it with `type(...)`, as is done for old-style classes. This is faster for
+    mixins with many members, but the decorated class is replaced with a new class object. As `dataclasses` does with
+    `slots=True`, the implicit `__class__` cell of the methods of the original class (used by zero-argument `super()`)
+    is updated to refer to the new class. This is not possible before python 3.7: a `TypeError` is raised in that case.
+
+    With `slots=True` a new class is created (as with `rebuild=True`), with `__slots__` containing the data attributes
+    declared by the mixins: the names in their own `__slots__`, and their `pyfields` fields. Native `pyfields` fields
+    (including the ones declared by the decorated class itself) are replaced with descriptor fields storing their value
+    in a `_<name>` slot. Instances of the resulting class have no `__dict__` nor `__weakref__`, unless the decorated
+    class lists them in its own `__slots__` or a parent class provides them. This saves memory for classes with many
+    instances.
+
+    `pyfields` fields are lazy: their default value is set on first read, through the field descriptor. With `init=True`
+    an `__init__` method is generated and compiled for the class, that sets all the fields of the mixins and of the
+    class itself having a default value or a default factory in one shot. It then calls the `__init__` of the decorated
+    class (or of its parents) if any, with the same arguments.
+
+    With `lazy=True` the methods of the mixins are not copied on the class: a `__getattr__` resolver is installed
+    instead, that copies a method on the class the first time it is accessed on an instance, and adds its name to
+    `__from_mixins__`. Other members (fields, properties, class attributes...) are copied as usual, as well as the
+    methods overriding a member of a parent class, since python would not call `__getattr__` for them. This saves time
+    and memory for very large mixins of which only a few methods are used. Until they are installed, lazy methods can
+    not be accessed from the class itself, nor through `super()`: python does not call `__getattr__` in these cases. So
+    a subclass method calling `super().foo()` raises an `AttributeError` if `foo` was not accessed on an instance
+    before. Use `materialize` to install them all, or only the ones that subclasses rely on.
+
+    With `instrument=True` the class is registered for call instrumentation: whenever instrumentation is enabled
+    with `mixture.instrumentation.enable_instrumentation`, the methods copied from the mixins are replaced with
+    wrappers collecting call counts and latencies. When it is disabled (the default) the original functions are
+    installed, without any indirection.
+
+    With `columnar=True` a new class is created (as with `slots=True`) whose instances only hold the index of a row in a
+    `ColumnStore` shared by the class (see `mixture.columnar`): the values of the mixin fields and slots, and of the
+    fields of the decorated class itself, are stored in one typed `array` per field (for `float`, `int` and `bool`
+    fields) or one list per field. Rows are allocated with the default values when instances are created, and reused
+    once they are garbage collected. Mixin functions decorated with `@batched` receive the whole store, to process all
+    instances at once. `init` has no effect in this mode, since the defaults are always set on creation. Field values
+    are not validated, and mandatory fields read before they are set return the zero of their column (or `None`) instead
+    of raising an error.
+
+    With `async_methods` (python 3.5+) an `a<name>` coroutine function is also installed for the given mixin methods
+    (or for all of them if `True`), that runs the blocking method in `executor` and awaits its result, so that it can
+    be used from `asyncio` code without blocking the event loop (see `mixture.aio`). The names of these adapters are
+    added to `__from_mixins__`.
+
+    With `eq=True`, `hash=True` and `repr=True` the `__eq__`, `__hash__` and `__repr__` methods are generated and
+    compiled for the class (as `dataclasses` does), from the `pyfields` fields of the mixins (in the order of the
+    linearization, as for `init`) followed by the ones declared by the class itself: objects are equal if they have the
+    same class and equal fields, the hash is the one of the tuple of fields, and the representation shows the class name
+    and the fields. The code is unrolled for the fields of the class, which is much faster than a generic implementation
+    iterating on the fields. Methods defined by the class itself are not replaced. As with `dataclasses`, when only
+    `eq=True` is set, `__hash__` is set to `None` since the objects are mutable.
+
     :param mixin_classes:
+    :param rebuild: a boolean (default `False`) indicating if a new class should be created with the final namespace
+        in one step, instead of copying members one by one on the decorated class.
+    :param slots: a boolean (default `False`) indicating if a new class with `__slots__` should be created.
+    :param init: a boolean (default `False`) indicating if an `__init__` method eagerly setting all mixin fields
+        defaults should be generated.
+    :param lazy: a boolean (default `False`) indicating if methods should be installed on first access.
+    :param instrument: a boolean (default `False`) indicating if the class should be registered for call
+        instrumentation.
+    :param columnar: a boolean (default `False`) indicating if the mixin fields should be stored in columns.
+    :param async_methods: an optional list of names of mixin methods for which an asynchronous adapter should be
+        installed, or `True` for all mixin methods.
+    :param executor: the executor used by the asynchronous adapters: a `concurrent.futures.Executor`, a callable
+        returning one (called for each call), or `None` (default) for the default executor of the event loop.
+    :param eq: a boolean (default `False`) indicating if an `__eq__` method comparing the mixin fields should be
+        generated.
+    :param hash: a boolean (default `False`) indicating if a `__hash__` method hashing the mixin fields should be
+        generated.
+    :param repr: a boolean (default `False`) indicating if a `__repr__` method displaying the mixin fields should be
+        generated.
     :return:
     """
+    rebuild = kwargs.pop('rebuild', False)
+    slots = kwargs.pop('slots', False)
+    init = kwargs.pop('init', False)
+    lazy = kwargs.pop('lazy', False)
+    instrument = kwargs.pop('instrument', False)
+    columnar = kwargs.pop('columnar', False)
+    async_methods = kwargs.pop('async_methods', None)
+    executor = kwargs.pop('executor', None)
+    eq = kwargs.pop('eq', False)
+    hash_ = kwargs.pop('hash', False)
+    repr_ = kwargs.pop('repr', False)
+    if len(kwargs) > 0:
+        raise TypeError("apply_mixins() got unexpected keyword argument(s): %s" % ', '.join(kwargs))
+    if slots and columnar:
+        raise ValueError("`slots` and `columnar` can not be used together: columnar instances only have a row slot")
+
     def _effectively_decorate(orig_cls):
+        # profiling records list, or None if profiling is disabled (see `mixture.profiling`)
+        records = get_records_if_enabled()
+        if records is not None:
+            plan_hits, t_start = _PLAN_CACHE.hits, timer()
 
-        # First gather everything that has to be done
-        to_copy = dict()
-        for mixin_class in reversed(mixin_classes):
-            # display a warning if the mixin class contains an __init__
-            if '__init__' in mixin_class.__dict__:
-                warn("Mixin class '%' contains an explicit `__init__` method. This is highly NOT recommended.",
-                     MixinContainsInitWarning)
+        # First gather everything that has to be done: the plan was either precomposed ahead of time (see
+        # `mixture.aot`), or is computed now (this is cached, see `get_composition_plan`)
+        plan = get_precomposed_plan(mixin_classes, orig_cls) if len(_PRECOMPOSED) > 0 else None
+        if plan is None:
+            plan = get_composition_plan(mixin_classes, orig_cls)
+            if _COMPOSITION_RECORDS[0] is not None:
+                _COMPOSITION_RECORDS[0].append((qualified_name(orig_cls), mixin_classes, frozenset(orig_cls.__dict__),
+                                                getattr(orig_cls, FROM_MIXINS_TAG, ()), plan))
+
+        # the members to copy are looked up in the mixins: if one of them was removed since the plan was checked (for
+        # example concurrently), analyze the mixins again
+        classes = plan.classes
+        try:
+            to_copy = plan.get_members(classes)
+        except KeyError:
+            invalidate_mixins(mixin_classes)
+            plan = get_composition_plan(mixin_classes, orig_cls)
+            classes = plan.classes
+            to_copy = plan.get_members(classes)
+
+        if records is not None:
+            t_plan = timer()
+
+        # display a warning if a mixin class contains an __init__
+        for mixin_class in plan.init_mixins:
+            warn("Mixin class '%s' contains an explicit `__init__` method. This is highly NOT recommended."
+                 % mixin_class.__name__, MixinContainsInitWarning)
+
+        # All members to install: the copied ones, and the members copied as they are now
+        to_install = to_copy.copy()
+        copied = orig_cls.__dict__.get(COPIED_MEMBERS_TAG)
+        if copied is not None:
+            copied = dict(copied)
+            copied.update(to_copy)
+        to_install[COPIED_MEMBERS_TAG] = to_copy if copied is None else copied
+        # The two special fields are kept apart, since they are installed last
+        # --the __from_mixins__ field with the list of names copied
+        # TODO maybe it would be better that the field is an ordered tuple by mixin order ot appearance.
+        #    but that is quite tricky since some names can be overridden by several mixins
+        from_mixins = plan.copied_names
+        # --the __mixins__ field with all mixins applied, including the ones applied on the parents
+        inherited_mixins = getattr(orig_cls, MIXINS_TAG, None)
+        mixins = frozenset(classes) if inherited_mixins is None else frozenset(classes).union(inherited_mixins)
+
+        # the asynchronous adapters of the blocking methods, if required
+        if async_methods:
+            try:
+                from mixture.aio import add_async_adapters
+            except SyntaxError:
+                raise ValueError("`async_methods` requires python 3.5+")
+            from_mixins += add_async_adapters(orig_cls, to_install, async_methods, executor)
+
+        # in slots mode, data attributes are turned into slots
+        if slots:
+            make_slotted(orig_cls, to_install, plan)
+
+        # in columnar mode, data attributes are stored in the columns of a store shared by all instances
+        if columnar:
+            make_columnar(orig_cls, to_install, plan)
+
+        if (init and not columnar) or eq or hash_ or repr_:
+            # the fields of the mixins, followed by the ones declared by the class itself
+            fields = plan.fields + tuple(f_name for f_name in get_own_fields(orig_cls) if f_name not in plan.fields)
+
+        # generate the eager __init__ if required, after the fields have possibly been modified for slots
+        if init and not columnar:
+            to_install['__init__'] = make_fields_init([(f_name, to_install[f_name] if f_name in to_install
+                                                        else orig_cls.__dict__[f_name]) for f_name in fields],
+                                                      next_init=get_next_init(orig_cls), owner_cls=orig_cls)
+
+        # generate the value methods if required, unless the class defines them
+        if eq or hash_ or repr_:
+            add_value_methods(orig_cls, to_install, fields, eq, hash_, repr_)
 
-            # list all methods that should be copied
-            res = list_all_members_to_copy(mixin_class, orig_cls)
-            to_copy.update(res)
+        # in lazy mode, methods are moved to the pending members, resolved by __getattr__
+        if lazy:
+            # note: `__getattr__` is not called for the names found on a parent class, so they are installed now
+            pending = dict()
+            for m_name in plan.copied_names:
+                if isinstance(to_install[m_name], FunctionType) and find_in_mro(orig_cls, m_name) is None:
+                    pending[m_name] = to_install.pop(m_name)
+            from_mixins = tuple(n for n in from_mixins if n not in pending)
+            to_install[LAZY_MEMBERS_TAG] = pending
+            to_install['__getattr__'] = make_lazy_getattr(find_in_mro(orig_cls, '__getattr__'))
 
         # Now perform copy or create a new type
-        if issubclass(orig_cls, object):
+        if issubclass(orig_cls, object) and not (rebuild or slots or columnar):
             # --- new-style class, no need to create a new type
 
-            # copy all members
-            for m_name, member in to_copy.items():
+            # copy all members. The special fields are set last, so that a class that is being modified while it is
+            # used by other threads is only seen as having the mixins (see `has_mixin`) once all members are there
+            for m_name, member in to_install.items():
                 setattr(orig_cls, m_name, member)
-
-            # fill the __from_mixins__ field with the list of names copied
-            # TODO maybe it would be better that the field is an ordered tuple by mixin order ot appearance.
-            #    but that is quite tricky since some names can be overridden by several mixins
-            setattr(orig_cls, FROM_MIXINS_TAG, tuple(to_copy.keys()))
+            setattr(orig_cls, FROM_MIXINS_TAG, from_mixins)
+            setattr(orig_cls, MIXINS_TAG, mixins)
 
             out_cls = orig_cls
 
         else:
-            # --- old-style class, need to create a new class
+            # --- old-style class or explicit rebuild, need to create a new class
+            to_install[FROM_MIXINS_TAG] = from_mixins
+            to_install[MIXINS_TAG] = mixins
+            out_cls = rebuild_class(orig_cls, to_install)
 
-            # with the same class type, class name and class parents
-            orig_cls_type = type(orig_cls)
-            orig_cls_name = orig_cls.__name__
-            orig_cls_bases = orig_cls.__bases__
+        if instrument:
+            # note: imported here since the instrumentation module depends on this one
+            from mixture.instrumentation import register_instrumentable
+            register_instrumentable(out_cls)
 
-            # but with members that also include the new ones
-            # --original
-            orig_vars = copy_cls_vars(orig_cls)
-            # --new ones
-            for m_name, member in to_copy.items():
-                orig_vars[m_name] = member
-            # --FROM_MIXINS_TAG
-            orig_vars[FROM_MIXINS_TAG] = tuple(to_copy.keys())
+        # record the class in the reverse index
+        index_consumer(out_cls, zip(classes, plan.names))
 
-            out_cls = orig_cls_type(orig_cls_name, orig_cls_bases, orig_vars)
+        if records is not None:
+            t_copy = timer()
 
         # register the output class as a subclass of all mixins that support it (python ABC mechanism)
+        # this can be deferred, see `deferred_registration`
         for mixin_class in reversed(mixin_classes):
-            try:
-                mixin_class.register(out_cls)
-            except AttributeError:
-                # warn(
-                #     "Mixin class '%s' does not seem to be an ABC so it can not be registered as the virtual parent of"
-                #     " class '%s'. As a result issubclass and isinstance will result `False`. You probably wish your "
-                #     "mixin class to inherit from `ABC` or use meta `ABCMeta` to fix this",
-                #     MixinNotRegisterableWarning)
-                # ignore silently
-                pass
+            register_mixin(mixin_class, out_cls)
+
+        if records is not None:
+            records.append(DecorationRecord(cls_name=qualified_name(out_cls),
+                                            mixins=tuple(qualified_name(m) for m in mixin_classes),
+                                            nb_members=len(plan.copied_names), plan_cached=_PLAN_CACHE.hits > plan_hits,
+                                            plan_time=t_plan - t_start, copy_time=t_copy - t_plan,
+                                            register_time=timer() - t_copy))
 
         return out_cls
 
     return _effectively_decorate
 
 
+def add_value_methods(orig_cls,   # type: Type
+                      to_install,  # type: Dict[str, Any]
+                      fields,      # type: Tuple[str, ...]
+                      eq,          # type: bool
+                      hash_,       # type: bool
+                      repr_        # type: bool
+                      ):
+    # type: (...) -> None
+    """
+    Adds to `to_install` (the members that `apply_mixins` is about to install on `orig_cls`) the generated `__eq__`,
+    `__hash__` and `__repr__` methods over `fields`, as requested. Methods defined by `orig_cls` itself are kept.
+
+    :param orig_cls: the decorated class
+    :param to_install: the members to install. Modified in place
+    :param fields: the names of the mixin fields, in order
+    :param eq: if `True`, generates `__eq__` (and `__ne__` on python 2)
+    :param hash_: if `True`, generates `__hash__`. Otherwise if `eq` is `True`, `__hash__` is set to `None`
+    :param repr_: if `True`, generates `__repr__`
+    :return:
+    """
+    own = orig_cls.__dict__
+    # note: on python 3 a class defining `__eq__` has `__hash__ = None` in its namespace, that is not an explicit hash
+    explicit_hash = '__hash__' in own and not (own['__hash__'] is None and '__eq__' in own)
+    if eq and '__eq__' not in own:
+        to_install['__eq__'] = make_fields_eq(fields, owner_cls=orig_cls)
+        if sys.version_info < (3, ) and '__ne__' not in own:
+            # python 2: `!=` does not use `__eq__`
+            to_install['__ne__'] = make_fields_eq(fields, owner_cls=orig_cls, negate=True)
+        if not hash_ and not explicit_hash:
+            # mutable objects comparing by value should not be hashable
+            to_install['__hash__'] = None
+    if hash_ and not explicit_hash:
+        to_install['__hash__'] = make_fields_hash(fields, owner_cls=orig_cls)
+    if repr_ and '__repr__' not in own:
+        to_install['__repr__'] = make_fields_repr(fields, owner_cls=orig_cls)
+
+
+def rebuild_class(orig_cls, new_members):
+    # type: (Type, Mapping[str, Any]) -> Type
+    """
+    Creates a new class with the same class type, class name and class parents than `orig_cls`, and with a namespace
+    containing the members of `orig_cls` updated with `new_members`.
+
+    The namespace is built in one pass, so the new type is created with its final members in a single step. The only
+    exception are new members defining `__set_name__` (for example `pyfields` fields): they are set after the class
+    creation, so that they are not modified as if they were declared in the new class. This is consistent with what
+    happens when the members are copied one by one with `setattr`.
+
+    The `__class__` cells of the methods of `orig_cls` (including the ones replaced by `new_members`) and of the new
+    members are updated to refer to the new class, see `rebind_class_cells`.
+
+    :param orig_cls: the class to rebuild
+    :param new_members: the members to add or replace
+    :return: the new class
+    """
+    # with the same class type, class name and class parents
+    orig_cls_type = type(orig_cls)
+    orig_cls_name = orig_cls.__name__
+    orig_cls_bases = orig_cls.__bases__
+
+    # but with members that also include the new ones
+    # --original
+    orig_vars = copy_cls_vars(orig_cls)
+    try:
+        # python 3: the qualified name is not part of the class __dict__
+        orig_vars['__qualname__'] = orig_cls.__qualname__
+    except AttributeError:
+        pass
+    # --new ones
+    set_later = dict()
+    for m_name, member in new_members.items():
+        if hasattr(type(member), '__set_name__'):
+            orig_vars.pop(m_name, None)
+            set_later[m_name] = member
+        else:
+            orig_vars[m_name] = member
+
+    new_cls = orig_cls_type(orig_cls_name, orig_cls_bases, orig_vars)
+    for m_name, member in set_later.items():
+        setattr(new_cls, m_name, member)
+
+    # note: the members of `orig_cls` that were replaced may still be used, for example by a generated `__init__`
+    rebind_class_cells(list(orig_cls.__dict__.values()) + list(new_members.values()), orig_cls, new_cls)
+    return new_cls
+
+
+def rebind_class_cells(members, orig_cls, new_cls):
+    # type: (Iterable[Any], Type, Type) -> None
+    """
+    Updates the `__class__` closure cells of the functions in `members` (including the ones wrapped in class methods,
+    static methods, properties, and decorators setting `__wrapped__`) that refer to `orig_cls`, so that they refer to
+    `new_cls`. These cells are created by the compiler for the methods using zero-argument `super()` or `__class__`.
+
+    Cells can only be modified on python 3.7+. Before that, a `TypeError` is raised if such a cell is found.
+
+    :param members: the members of the new class
+    :param orig_cls: the class that was rebuilt
+    :param new_cls: the new class
+    :return:
+    """
+    for member in members:
+        if isinstance(member, (classmethod, staticmethod)):
+            funcs = [member.__func__]
+        elif isinstance(member, property):
+            funcs = [member.fget, member.fset, member.fdel]
+        else:
+            funcs = [member]
+
+        for f in funcs:
+            while f is not None:
+                closure = getattr(f, '__closure__', None)
+                if closure is not None and '__class__' in f.__code__.co_freevars:
+                    cell = closure[f.__code__.co_freevars.index('__class__')]
+                    try:
+                        is_orig = cell.cell_contents is orig_cls
+                    except ValueError:
+                        # empty cell
+                        is_orig = False
+                    if is_orig:
+                        try:
+                            cell.cell_contents = new_cls
+                        except (AttributeError, TypeError):
+                            raise TypeError("Method '%s' of class '%s' uses zero-argument `super()` or `__class__`, "
+                                            "that can not refer to the new class created by `apply_mixins` before "
+                                            "python 3.7. Use `super(%s, self)` instead, or do not use `rebuild`, "
+                                            "`slots` nor `columnar`." % (f.__name__, orig_cls.__name__,
+                                                                          orig_cls.__name__))
+                f = getattr(f, '__wrapped__', None)
+
+
+def make_slotted(orig_cls, to_install, plan):
+    # type: (Type, Dict[str, Any], CompositionPlan) -> None
+    """
+    Updates `to_install`, the members that `apply_mixins` is about to install on a rebuilt version of `orig_cls`, so
+    that the data attributes declared by the mixins of `plan` become slots:
+
+     - `__slots__` is set to the slots declared by `orig_cls` itself, followed by the slots declared by the mixins,
+       followed by a `_<name>` slot for each `pyfields` field of the mixins and of `orig_cls` itself,
+     - the slot descriptors of the mixins are not copied,
+     - the native `pyfields` fields are replaced with descriptor fields, that store their value in the `_<name>` slot.
+
+    :param orig_cls: the decorated class
+    :param to_install: the members to install. Modified in place
+    :param plan: the composition plan
+    :return:
+    """
+    new_slots = list(get_slots(orig_cls) if '__slots__' in orig_cls.__dict__ else ())
+    own_fields = get_own_fields(orig_cls)
+    if len(own_fields) + len(plan.fields) > 0:
+        # note: there are fields, so pyfields is already imported
+        from pyfields.core import NativeField, DescriptorField
+
+    for s_name in plan.slots:
+        if s_name not in new_slots:
+            new_slots.append(s_name)
+        # the mixin slot descriptor can not be used on another class
+        to_install.pop(s_name, None)
+
+    # note: the fields of the class itself would otherwise need the `__dict__` that the new class does not have
+    for f_name in own_fields + plan.fields:
+        field = to_install[f_name] if f_name in to_install else orig_cls.__dict__[f_name]
+        if isinstance(field, NativeField):
+            # native fields store their value in the instance __dict__. Descriptor fields use a '_<name>' attribute
+            to_install[f_name] = DescriptorField.create_from_field(field)
+        private_name = '_' + f_name
+        if private_name not in new_slots:
+            new_slots.append(private_name)
+
+    to_install['__slots__'] = tuple(new_slots)
+
+
+def make_columnar(orig_cls, to_install, plan):
+    # type: (Type, Dict[str, Any], CompositionPlan) -> None
+    """
+    Updates `to_install`, the members that `apply_mixins` is about to install on a rebuilt version of `orig_cls`, so
+    that the data attributes declared by the mixins of `plan` are stored in a `ColumnStore`:
+
+     - `__slots__` is set to the slots declared by `orig_cls` itself, followed by the `__row__` slot,
+     - the slots and `pyfields` fields of the mixins, and the `pyfields` fields of `orig_cls` itself, are replaced with
+       `ColumnField` descriptors,
+     - a `__new__` method allocates a row for each new instance (and calls the default factories of the fields), and a
+       `__del__` method releases it,
+     - `__getstate__` and `__setstate__` methods copy the values of the columns by name, so that copied and unpickled
+       instances get their own row.
+
+    :param orig_cls: the decorated class
+    :param to_install: the members to install. Modified in place
+    :param plan: the composition plan
+    :return:
+    """
+    if getattr(orig_cls, COLUMN_STORE_TAG, None) is not None:
+        raise TypeError("Class '%s' already inherits from a class decorated with `columnar=True`" % orig_cls.__name__)
+
+    columns = [(s_name, None, None) for s_name in plan.slots]
+    factories = []
+    # note: the fields of the class itself would otherwise need the `__dict__` that the new class does not have
+    for f_name in get_own_fields(orig_cls) + plan.fields:
+        field = to_install[f_name] if f_name in to_install else orig_cls.__dict__[f_name]
+        typecode, default = get_column_spec(field)
+        columns.append((f_name, typecode, default))
+        if field.is_default_factory:
+            factories.append((f_name, field.default))
+
+    store = ColumnStore(columns)
+    for c_name in store.names:
+        to_install[c_name] = make_column_field(c_name, store[c_name])
+    to_install[COLUMN_STORE_TAG] = store
+    to_install['__slots__'] = tuple(get_slots(orig_cls) if '__slots__' in orig_cls.__dict__ else ()) + (ROW_SLOT,)
+
+    next_new = orig_cls.__new__
+    object_new = object.__new__
+    next_del = find_in_mro(orig_cls, '__del__')
+    allocate = store.allocate
+    release = store.release
+
+    def __new__(cls, *args, **kwargs):
+        obj = object_new(cls) if next_new is object_new else next_new(cls, *args, **kwargs)
+        obj.__row__ = allocate()
+        for f_name, factory in factories:
+            setattr(obj, f_name, factory(obj))
+        return obj
+
+    def __del__(self):
+        if next_del is not None:
+            next_del(self)
+        try:
+            row = self.__row__
+        except AttributeError:
+            # __new__ failed
+            return
+        release(row)
+
+    def __getstate__(self):
+        # the values of the columns and of the other slots, by name. The row index is specific to this instance
+        values = dict((c_name, getattr(self, c_name)) for c_name in store.names)
+        for c in getmro(type(self)):
+            for s_name in get_slots(c):
+                if s_name not in (ROW_SLOT, '__dict__', '__weakref__') and hasattr(self, s_name):
+                    values[s_name] = getattr(self, s_name)
+        return getattr(self, '__dict__', None) or None, values
+
+    def __setstate__(self, state):
+        try:
+            self.__row__
+        except AttributeError:
+            # created without calling __new__, for example by pickle protocols 0 and 1
+            self.__row__ = allocate()
+        dict_state, values = state
+        if dict_state:
+            self.__dict__.update(dict_state)
+        for name, value in values.items():
+            setattr(self, name, value)
+
+    to_install['__new__'] = staticmethod(__new__)
+    to_install['__del__'] = __del__
+    if '__getstate__' not in orig_cls.__dict__ and '__setstate__' not in orig_cls.__dict__:
+        to_install['__getstate__'] = __getstate__
+        to_install['__setstate__'] = __setstate__
+
+
+def get_next_init(cls):
+    # type: (Type) -> Optional[Callable]
+    """
+    Returns the `__init__` function that instances of `cls` currently use: the one defined in `cls` itself, or else
+    the first one found in its parents. Returns `None` if this is `object.__init__`.
+
+    :param cls: a class
+    :return:
+    """
+    return find_in_mro(cls, '__init__')
+
+
+def find_in_mro(cls, name):
+    # type: (Type, str) -> Optional[Any]
+    """
+    Returns the raw member `name` (as found in the class `__dict__`) that `cls` currently uses: the one defined in
+    `cls` itself, or else the first one found in its parents. Returns `None` if there is none, or if it is defined
+    by `object`.
+
+    :param cls: a class
+    :param name: the member name
+    :return:
+    """
+    for c in getmro(cls):
+        if c is object:
+            return None
+        try:
+            return c.__dict__[name]
+        except KeyError:
+            pass
+    return None
+
+
+def make_lazy_getattr(next_getattr=None):
+    # type: (Optional[Callable]) -> Callable
+    """
+    Creates the `__getattr__` method installed by `apply_mixins` in lazy mode. When an attribute is not found on an
+    instance, it looks for it in the pending members of the class and its parents (see `materialize_member`). If it
+    is not pending, `next_getattr` is called if provided, otherwise an `AttributeError` is raised.
+
+    :param next_getattr: the `__getattr__` method that the class was using before decoration, if any
+    :return:
+    """
+    def __getattr__(self, name):
+        for c in getmro(type(self)):
+            pending = c.__dict__.get(LAZY_MEMBERS_TAG)
+            if pending is not None:
+                if name in pending:
+                    materialize_member(c, name)
+                    return getattr(self, name)
+                member = c.__dict__.get(name)
+                if isinstance(member, FunctionType) and name in c.__dict__[FROM_MIXINS_TAG]:
+                    # materialized by another thread since the attribute lookup failed
+                    return member.__get__(self, type(self))
+
+        if next_getattr is not None:
+            return next_getattr(self, name)
+        raise AttributeError("'%s' object has no attribute '%s'" % (type(self).__name__, name))
+
+    return __getattr__
+
+
+_LAZY_LOCK = RLock()
+"""Lock serializing the installation of pending members, so that `__from_mixins__` updates are not lost"""
+
+
+def materialize_member(cls, name):
+    # type: (Type, str) -> None
+    """
+    Installs the pending member `name` of class `cls`, decorated with `apply_mixins(..., lazy=True)`, and adds it to
+    its `__from_mixins__`. If `cls` is currently instrumented (see `mixture.instrumentation`), the member is
+    instrumented too. Nothing happens if the member has already been installed.
+
+    :param cls: a class decorated in lazy mode
+    :param name: the name of the member to install
+    :return:
+    """
+    with _LAZY_LOCK:
+        pending = cls.__dict__[LAZY_MEMBERS_TAG]
+        try:
+            member = pending[name]
+        except KeyError:
+            # already materialized (possibly concurrently)
+            return
+        # note: the member is removed from the pending ones last, so that it is always found in one of the two places
+        setattr(cls, name, member)
+        setattr(cls, FROM_MIXINS_TAG, cls.__dict__[FROM_MIXINS_TAG] + (name,))
+        # note: imported here since the instrumentation module depends on this one
+        from mixture.instrumentation import instrument_materialized
+        instrument_materialized(cls, name)
+        del pending[name]
+
+
+def materialize(cls, *names):
+    # type: (Type, str) -> Type
+    """
+    Installs all the members of `cls` and its parents that were left pending by `apply_mixins(..., lazy=True)`, or
+    only the ones named `names` if provided. This is typically done before forking worker processes, so that all of
+    them share the installed members, or for the members that subclasses access through `super()`, since python does
+    not call `__getattr__` in that case.
+
+    :param cls: a class, typically decorated in lazy mode
+    :param names: the names of the members to install. By default all pending members are installed.
+    :return: `cls`, so that this can be used as a class decorator
+    """
+    for c in getmro(cls):
+        pending = c.__dict__.get(LAZY_MEMBERS_TAG)
+        if pending:
+            for name in (list(pending) if len(names) == 0 else [n for n in names if n in pending]):
+                materialize_member(c, name)
+    return cls
+
+
+def is_field(member):
+    # type: (Any) -> bool
+    """
+    Returns `True` if `member` is a data attribute definition, that is, a `pyfields` field. Returns `False` when
+    `pyfields` was not imported: then no member can be a field. This way `pyfields` is an optional dependency, that is
+    not imported by this module (importing it is comparatively slow).
+
+    :param member: a class member
+    :return:
+    """
+    pyfields = sys.modules.get('pyfields')
+    if pyfields is None:
+        return False
+    field_type = getattr(pyfields, 'Field', None)
+    return field_type is not None and isinstance(member, field_type)
+
+
+def get_own_fields(cls):
+    # type: (Type) -> Tuple[str, ...]
+    """
+    Returns the names of the `pyfields` fields declared by class `cls` itself (not its parents), in definition order.
+
+    :param cls: a class
+    :return:
+    """
+    return tuple(n for n, m in cls.__dict__.items() if is_field(m))
+
+
+def get_slots(cls):
+    # type: (Type) -> Tuple[str, ...]
+    """
+    Returns the names declared in the `__slots__` of class `cls` itself (not its parents), as a tuple.
+
+    :param cls: a class
+    :return:
+    """
+    slots = cls.__dict__.get('__slots__', ())
+    if isinstance(slots, str):
+        slots = (slots,)
+    return tuple(slots)
+
+
+def has_mixin(obj_or_cls, mixin_class):
+    # type: (Any, Type) -> bool
+    """
+    Returns `True` if `mixin_class` was applied with `apply_mixins` on the class of `obj_or_cls` (or on one of its
+    parents), or if it is an actual parent class of it.
+
+    Contrary to `issubclass`, this works for mixins that are not ABCs, and does not rely on the ABC registries: the
+    mixins applied are stored in a frozenset in the `__mixins__` field of the class, so the check is a set lookup.
+    Parents of the mixins applied are taken into account too.
+
+    >>> class BarkerMixin(object):
+    ...     def bark(self):
+    ...         print("barking loudly")
+    >>> @apply_mixins(BarkerMixin)
+    ... class Dog(object):
+    ...     pass
+    >>> has_mixin(Dog(), BarkerMixin), issubclass(Dog, BarkerMixin)
+    (True, False)
+
+    :param obj_or_cls: an object or a class
+    :param mixin_class: the mixin class
+    :return:
+    """
+    cls = obj_or_cls if isinstance(obj_or_cls, _CLASS_TYPES) else obj_or_cls.__class__
+    return mixin_class in getattr(cls, MIXINS_TAG, ()) or mixin_class in getattr(cls, '__mro__', ())
+
+
 def list_all_members_to_copy(source_cls, dest_cls):
     # type: (...) -> Dict[str, Callable]
     """
@@ -111,14 +1400,30 @@ def list_all_members_to_copy(source_cls, dest_cls):
      - private members whose names start with '_'
      - members already existing in `dest_cls` itself (not its hierarchy)
 
+    Note that only the members defined in `source_cls` itself are considered. See `get_mixins_linearization` for the
+    members inherited from its parents.
+
     :param source_cls:
     :param dest_cls:
     :return:
     """
+    return select_members_to_copy(source_cls.__dict__, dest_cls)
+
+
+def select_members_to_copy(members, dest_cls):
+    # type: (Mapping[str, Any], Type) -> Dict[str, Any]
+    """
+    Returns a dictionary containing the members from `members` that should be copied to destination class `dest_cls`,
+    following the rules described in `list_all_members_to_copy`.
+
+    :param members: a mapping of candidate members
+    :param dest_cls:
+    :return:
+    """
     members_to_copy = dict()
     force_copy = getattr(dest_cls, FROM_MIXINS_TAG, ())
 
-    for m_name, member in source_cls.__dict__.items():
+    for m_name, member in members.items():
         # exclude private members
         # exclude explicitly overridden members
         # note: do not use hasattr as we only want to see explicitly overridden
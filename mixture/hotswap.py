@@ -0,0 +1,285 @@
+#  Authors: Sylvain Marie <sylvain.marie@se.com>
+#
+#  Copyright (c) Schneider Electric Industries, 2019. All right reserved.
+
+from inspect import getmro
+from threading import RLock
+from types import FunctionType
+
+from mixture.core import FROM_MIXINS_TAG, MIXINS_TAG, LAZY_MEMBERS_TAG, COPIED_MEMBERS_TAG, get_mixins_linearization, \
+    invalidate_mixins, register_mixin, get_consumers, get_indexed_mixins, get_contributions, index_consumer, \
+    unindex_consumer, skip_inherited, find_in_mro, _CLASS_TYPES
+from mixture.instrumentation import is_instrumented, instrument, uninstrument
+from mixture.profiling import qualified_name
+
+try:  # python 3.5+
+    from typing import Any, Dict, Iterable, List, Optional, Tuple, Type, Union
+except ImportError:
+    pass
+
+
+_UPDATE_LOCK = RLock()
+"""Lock serializing the updates performed by `reapply_mixins` and `remove_mixins`"""
+
+
+def get_applied_mixins(cls):
+    # type: (Type) -> frozenset
+    """
+    Returns the mixins (and their ancestors) applied with `apply_mixins` on class `cls` itself, excluding the ones
+    that were applied on its parents.
+
+    :param cls: a class
+    :return:
+    """
+    mixins = cls.__dict__.get(MIXINS_TAG, frozenset())
+    inherited = set()
+    for base in cls.__bases__:
+        inherited.update(getattr(base, MIXINS_TAG, ()))
+    return frozenset(m for m in mixins if m not in inherited)
+
+
+def find_applied_mixin(cls, mixin_class):
+    # type: (Type, Type) -> Optional[Type]
+    """
+    Returns the mixin applied on `cls` that `mixin_class` corresponds to: `mixin_class` itself if it was applied, or
+    else an applied mixin with the same qualified name (typically, the previous version of a reloaded module).
+    Returns `None` if there is no such mixin.
+
+    :param cls: a class
+    :param mixin_class: a mixin class, possibly a new version of an applied one
+    :return:
+    """
+    applied = get_applied_mixins(cls)
+    if mixin_class in applied:
+        return mixin_class
+    name = qualified_name(mixin_class)
+    for m in applied:
+        if qualified_name(m) == name:
+            return m
+    return None
+
+
+def get_mixin_consumers(*mixin_classes):
+    # type: (...) -> List[Type]
+    """
+    Returns the list of live classes on which one of `mixin_classes` (or a mixin with the same qualified name, see
+    `find_applied_mixin`) was applied with `apply_mixins`. Subclasses inheriting the mixin members from such a class
+    are not included.
+
+    This uses the reverse index maintained by `apply_mixins` (see `mixture.core.get_consumers`), so its cost only
+    depends on the number of applied mixins and consumer classes, not on the number of live objects.
+
+    :param mixin_classes: the mixin classes
+    :return:
+    """
+    names = set(qualified_name(m) for m in mixin_classes)
+    consumers = []
+    for m in get_indexed_mixins():
+        if m in mixin_classes or qualified_name(m) in names:
+            consumers.extend(c for c in get_consumers(m) if c not in consumers)
+    return consumers
+
+
+def reapply_mixins(classes, *mixin_classes):
+    # type: (Union[Type, Iterable[Type], None], Type) -> List[Type]
+    """
+    Updates classes decorated with `apply_mixins`, so that they use the current members of `mixin_classes`. This is
+    meant to roll out new mixin implementations in a running process, for example after a module reload (the new
+    mixin classes replace the applied ones with the same qualified name) or after a mixin was modified in place.
+
+    For each class, the members recorded in `__from_mixins__` that were copied from the previous version of the
+    mixins are replaced with the new ones, or deleted if the new version does not define them anymore. Members
+    added by the new version are copied if the class does not define them. Members that were overridden on the class
+    since its decoration are left untouched. Only the members that actually change are written, so that the type
+    attribute cache is invalidated as few times as possible. `__from_mixins__` and `__mixins__` are updated, and the
+    class is registered as a virtual subclass of the new mixins if they are ABCs.
+
+    Classes decorated in lazy mode keep their not yet installed methods pending, and instrumented classes are
+    instrumented again after the update.
+
+    >>> class BarkerMixin(object):
+    ...     def bark(self):
+    ...         return "woof"
+    >>> from mixture import apply_mixins
+    >>> @apply_mixins(BarkerMixin)
+    ... class Dog(object):
+    ...     pass
+    >>> BarkerMixin.bark = lambda self: "WOOF"
+    >>> updated = reapply_mixins(Dog, BarkerMixin)
+    >>> Dog().bark()
+    'WOOF'
+
+    :param classes: a class, an iterable of classes, or `None` to update all classes on which the mixins were
+        applied (see `get_mixin_consumers`)
+    :param mixin_classes: the new versions of the mixin classes
+    :return: the list of classes updated
+    """
+    return _update_all(classes, mixin_classes, remove=False)
+
+
+def remove_mixins(classes, *mixin_classes):
+    # type: (Union[Type, Iterable[Type], None], Type) -> List[Type]
+    """
+    Removes mixins applied with `apply_mixins` from classes: the members recorded in `__from_mixins__` that were
+    copied from these mixins are deleted, except the ones that were overridden on the class since its decoration.
+    `__from_mixins__` and `__mixins__` are updated, so that `has_mixin` returns `False` afterwards.
+
+    Note that members that other mixins would have provided if the removed ones had not been applied are not
+    restored: use `reapply_mixins` with these other mixins for this.
+
+    Also note that a virtual subclass registration with `ABCMeta.register` can not be undone, so `isinstance` and
+    `issubclass` keep returning `True` for removed ABC mixins.
+
+    :param classes: a class, an iterable of classes, or `None` to update all classes on which the mixins were
+        applied (see `get_mixin_consumers`)
+    :param mixin_classes: the mixin classes to remove
+    :return: the list of classes updated
+    """
+    return _update_all(classes, mixin_classes, remove=True)
+
+
+def _update_all(classes, mixin_classes, remove):
+    # type: (Union[Type, Iterable[Type], None], Tuple[Type, ...], bool) -> List[Type]
+    """Common implementation of `reapply_mixins` and `remove_mixins`"""
+    if classes is None:
+        classes = get_mixin_consumers(*mixin_classes)
+    elif isinstance(classes, _CLASS_TYPES):
+        classes = [classes]
+    else:
+        classes = list(classes)
+
+    # the previous version of the mixins, for each class
+    old_mixins = [tuple(m for m in (find_applied_mixin(cls, n) for n in mixin_classes) if m is not None)
+                  for cls in classes]
+
+    # the members that were actually copied from the previous versions, even if the mixins have been modified in place
+    # since then
+    old_members = [get_copied_members(cls, old) for cls, old in zip(classes, old_mixins)]
+    if not remove:
+        invalidate_mixins(mixin_classes)
+
+    new_mixins = () if remove else mixin_classes
+    with _UPDATE_LOCK:
+        for cls, old, members in zip(classes, old_mixins, old_members):
+            update_class(cls, old, members, new_mixins)
+
+    return classes
+
+
+def get_copied_members(cls, mixin_classes):
+    # type: (Type, Tuple[Type, ...]) -> Dict[str, Any]
+    """
+    Returns the members that were copied on `cls` from `mixin_classes` (or their ancestors), as they were at that
+    time: the mixins may have been modified in place since then.
+
+    :param cls: a class decorated with `apply_mixins`
+    :param mixin_classes: mixins applied on `cls`
+    :return: a dictionary of members by name
+    """
+    copied = cls.__dict__.get(COPIED_MEMBERS_TAG, dict())
+    members = dict()
+    if len(mixin_classes) > 0:
+        for m in get_mixins_linearization(mixin_classes).classes:
+            members.update((n, copied[n]) for n in get_consumers(m).get(cls, ()) if n in copied)
+    return members
+
+
+def update_class(cls,          # type: Type
+                 old_mixins,   # type: Tuple[Type, ...]
+                 old_members,  # type: dict
+                 new_mixins    # type: Tuple[Type, ...]
+                 ):
+    # type: (...) -> None
+    """
+    Replaces the members of `cls` copied from `old_mixins` with the ones of `new_mixins`. See `reapply_mixins`.
+
+    :param cls: a class decorated with `apply_mixins`
+    :param old_mixins: the mixins to replace, that were applied on `cls`
+    :param old_members: the members of `old_mixins` as they were copied, see `get_copied_members`
+    :param new_mixins: the mixins to apply instead. May be empty
+    :return:
+    """
+    was_instrumented = is_instrumented(cls)
+    if was_instrumented:
+        uninstrument(cls)
+
+    cls_dict = cls.__dict__
+    from_mixins = cls_dict.get(FROM_MIXINS_TAG, ())
+    pending = cls_dict.get(LAZY_MEMBERS_TAG)
+
+    # the applied mixins: the removed ones and their ancestors are removed, unless still needed
+    mixins = cls_dict.get(MIXINS_TAG, frozenset())
+    removed = set(get_mixins_linearization(old_mixins).classes) if len(old_mixins) > 0 else set()
+    kept = set(m for m in mixins if m not in removed)
+    for m in list(kept):
+        kept.update(c for c in getmro(m) if c in mixins)
+    for base in cls.__bases__:
+        kept.update(getattr(base, MIXINS_TAG, ()))
+    kept_dicts = [c.__dict__ for c in kept]
+
+    # the members that were copied from the old mixins and not modified since, and not provided by the kept ones
+    old_dicts = [c.__dict__ for c in removed]
+
+    def _is_old(name, member):
+        return (old_members.get(name) is member or any(d.get(name) is member for d in old_dicts)) \
+               and not any(d.get(name) is member for d in kept_dicts)
+
+    stale = set(n for n in from_mixins if _is_old(n, cls_dict.get(n)))
+    stale_pending = set(n for n, m in pending.items() if _is_old(n, m)) if pending else set()
+
+    # the members of the new mixins: they replace the stale ones, or are added if the name is free
+    to_set = dict()
+    # note: the classes that `cls` inherits from are skipped, as `apply_mixins` does
+    new_lin = skip_inherited(get_mixins_linearization(new_mixins), cls) if len(new_mixins) > 0 else None
+    if new_lin is not None:
+        for name, member in new_lin.members.items():
+            if name in stale or name in stale_pending \
+                    or (not name.startswith('_') and name not in cls_dict and not (pending and name in pending)):
+                to_set[name] = member
+
+    # apply the differences
+    new_from = [n for n in from_mixins if n not in stale or n in to_set]
+    for name in stale:
+        if name not in to_set:
+            delattr(cls, name)
+    for name in stale_pending:
+        del pending[name]
+    for name, member in to_set.items():
+        if pending is not None and name not in cls_dict and isinstance(member, FunctionType) \
+                and find_in_mro(cls, name) is None:
+            # lazy mode: new methods are installed on first access too, unless they override a parent member
+            pending[name] = member
+        else:
+            if cls_dict.get(name) is not member:
+                setattr(cls, name, member)
+            if name not in new_from:
+                new_from.append(name)
+
+    new_from = tuple(new_from)
+    if new_from != from_mixins:
+        setattr(cls, FROM_MIXINS_TAG, new_from)
+
+    copied = dict((n, m) for n, m in cls_dict.get(COPIED_MEMBERS_TAG, dict()).items()
+                  if n not in stale and n not in stale_pending)
+    copied.update(to_set)
+    setattr(cls, COPIED_MEMBERS_TAG, copied)
+
+    if new_lin is not None:
+        kept.update(new_lin.classes)
+    kept = frozenset(kept)
+    if kept != mixins:
+        setattr(cls, MIXINS_TAG, kept)
+
+    for mixin_class in reversed(new_mixins):
+        register_mixin(mixin_class, cls)
+
+    # update the reverse index
+    unindex_consumer(cls, removed.difference(kept))
+    applied = get_applied_mixins(cls)
+    members = dict((n, cls_dict[n]) for n in new_from)
+    if pending:
+        members.update(pending)
+    index_consumer(cls, get_contributions(tuple(applied), members).items())
+
+    if was_instrumented:
+        instrument(cls)
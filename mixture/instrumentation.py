@@ -0,0 +1,230 @@
+#  Authors: Sylvain Marie <sylvain.marie@se.com>
+#
+#  Copyright (c) Schneider Electric Industries, 2019. All right reserved.
+
+from bisect import bisect_left
+from functools import wraps
+from types import FunctionType
+from weakref import WeakKeyDictionary, ref
+
+from mixture.core import FROM_MIXINS_TAG, MIXINS_TAG
+from mixture.profiling import timer
+
+try:  # python 3.5+
+    from typing import Dict, List, Optional, Tuple, Type
+except ImportError:
+    pass
+
+
+LATENCY_BUCKETS = (1e-6, 1e-5, 1e-4, 1e-3, 1e-2, 1e-1, 1.)
+"""Upper bounds (in seconds) of the latency histogram buckets. A last bucket counts the calls above the last bound"""
+
+
+class CallStats(object):
+    """
+    Call counter and latency histogram of a member copied from a mixin, shared by all classes on which it is
+    instrumented. The mixin is only referenced weakly: statistics are dropped when it is garbage collected.
+    """
+    __slots__ = ('_mixin', 'name', 'calls', 'total_time', 'histogram')
+
+    def __init__(self, mixin, name):
+        # type: (Type, str) -> None
+        self._mixin = ref(mixin)
+        self.name = name
+        self.calls = 0
+        self.total_time = 0.
+        self.histogram = [0] * (len(LATENCY_BUCKETS) + 1)
+
+    def record(self, duration):
+        # type: (float) -> None
+        self.calls += 1
+        self.total_time += duration
+        self.histogram[bisect_left(LATENCY_BUCKETS, duration)] += 1
+
+    @property
+    def mixin(self):
+        # type: (...) -> Optional[Type]
+        return self._mixin()
+
+    @property
+    def mean_time(self):
+        # type: (...) -> float
+        return self.total_time / self.calls if self.calls > 0 else 0.
+
+    def reset(self):
+        self.calls = 0
+        self.total_time = 0.
+        self.histogram = [0] * (len(LATENCY_BUCKETS) + 1)
+
+    def __repr__(self):
+        return "CallStats(%s.%s: %s calls, mean %.3es)" % (getattr(self.mixin, '__name__', '<collected>'), self.name,
+                                                           self.calls, self.mean_time)
+
+
+_STATS = WeakKeyDictionary()  # type: Dict[Type, Dict[str, CallStats]]
+"""The call statistics, by mixin and by member name"""
+
+_INSTRUMENTED = WeakKeyDictionary()  # type: Dict[Type, Dict[str, FunctionType]]
+"""The classes currently instrumented, with the original functions that were replaced by wrappers"""
+
+_INSTRUMENTABLE = WeakKeyDictionary()  # type: Dict[Type, bool]
+"""The classes decorated with `apply_mixins(..., instrument=True)`, that follow `enable_instrumentation`"""
+
+_ENABLED = [False]
+"""Whether instrumentation is enabled on the classes decorated with `apply_mixins(..., instrument=True)`"""
+
+
+def find_source_mixin(cls, name):
+    # type: (Type, str) -> Optional[Type]
+    """
+    Returns the mixin (or mixin ancestor) from which member `name` was copied on `cls`, or `None` if it can not be
+    found.
+
+    :param cls: a class decorated with `apply_mixins`
+    :param name: the name of a member listed in its `__from_mixins__`
+    :return:
+    """
+    member = cls.__dict__.get(name)
+    for mixin in getattr(cls, MIXINS_TAG, ()):
+        if mixin.__dict__.get(name) is member:
+            return mixin
+    return None
+
+
+def _make_wrapper(func, stats):
+    """Returns a wrapper of `func` recording the duration of each call in `stats`"""
+    @wraps(func)
+    def instrumented(*args, **kwargs):
+        start = timer()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            stats.record(timer() - start)
+
+    # python 2: `wraps` does not set __wrapped__
+    instrumented.__wrapped__ = func
+    return instrumented
+
+
+def instrument(cls, names=None):
+    # type: (Type, Optional[List[str]]) -> Type
+    """
+    Replaces the methods that were copied from mixins on `cls` (as listed in `__from_mixins__`) with wrappers
+    recording call counts and latencies in a `CallStats` object, attributed to the source mixin and the member name.
+    See `get_call_stats`. Use `uninstrument` to restore the original functions: when not instrumented, there is no
+    indirection at all.
+
+    :param cls: a class decorated with `apply_mixins`
+    :param names: an optional list of member names to instrument. By default all methods in `__from_mixins__` are
+        instrumented
+    :return: `cls`
+    """
+    originals = _INSTRUMENTED.setdefault(cls, dict())
+    for name in (cls.__dict__.get(FROM_MIXINS_TAG, ()) if names is None else names):
+        if name in originals:
+            # already instrumented
+            continue
+        func = cls.__dict__.get(name)
+        if not isinstance(func, FunctionType):
+            continue
+        mixin = find_source_mixin(cls, name)
+        if mixin is None:
+            continue
+        try:
+            mixin_stats = _STATS[mixin]
+        except KeyError:
+            mixin_stats = _STATS[mixin] = dict()
+        try:
+            stats = mixin_stats[name]
+        except KeyError:
+            stats = mixin_stats[name] = CallStats(mixin, name)
+        originals[name] = func
+        setattr(cls, name, _make_wrapper(func, stats))
+    return cls
+
+
+def instrument_materialized(cls, name):
+    # type: (Type, str) -> None
+    """
+    Instruments member `name` of `cls` if `cls` is currently instrumented. This is called by `materialize_member` when
+    a method left pending by `apply_mixins(..., lazy=True)` is installed, since it was not there when `cls` was
+    instrumented.
+
+    :param cls: a class decorated in lazy mode
+    :param name: the name of the member that was installed
+    :return:
+    """
+    if cls in _INSTRUMENTED:
+        instrument(cls, [name])
+
+
+def uninstrument(cls):
+    # type: (Type) -> Type
+    """
+    Restores the original methods replaced by `instrument` on `cls`. Members that were modified since they were
+    instrumented are left untouched. Collected statistics are kept.
+
+    :param cls: a class
+    :return: `cls`
+    """
+    originals = _INSTRUMENTED.pop(cls, dict())
+    for name, func in originals.items():
+        current = cls.__dict__.get(name)
+        if getattr(current, '__wrapped__', None) is func:
+            setattr(cls, name, func)
+    return cls
+
+
+def is_instrumented(cls):
+    # type: (Type) -> bool
+    return len(_INSTRUMENTED.get(cls, ())) > 0
+
+
+def register_instrumentable(cls):
+    # type: (Type) -> None
+    """
+    Registers `cls` so that it is instrumented whenever `enable_instrumentation` is called, and immediately
+    instruments it if instrumentation is currently enabled. This is what `apply_mixins(..., instrument=True)` does.
+    """
+    _INSTRUMENTABLE[cls] = True
+    if _ENABLED[0]:
+        instrument(cls)
+
+
+def enable_instrumentation():
+    """Instruments all classes decorated with `apply_mixins(..., instrument=True)`, current and future ones."""
+    _ENABLED[0] = True
+    for cls in list(_INSTRUMENTABLE.keys()):
+        instrument(cls)
+
+
+def disable_instrumentation():
+    """
+    Restores the original methods of all classes decorated with `apply_mixins(..., instrument=True)`, so that calls
+    have no overhead at all. Collected statistics are kept.
+    """
+    _ENABLED[0] = False
+    for cls in list(_INSTRUMENTABLE.keys()):
+        uninstrument(cls)
+
+
+def get_call_stats(mixin=None):
+    # type: (Optional[Type]) -> List[CallStats]
+    """
+    Returns the list of `CallStats` collected so far, sorted by decreasing total time.
+
+    :param mixin: an optional mixin class to only return the statistics of its members
+    :return:
+    """
+    if mixin is None:
+        stats = [s for mixin_stats in list(_STATS.values()) for s in mixin_stats.values()]
+    else:
+        stats = list(_STATS.get(mixin, dict()).values())
+    return sorted(stats, key=lambda s: s.total_time, reverse=True)
+
+
+def reset_call_stats():
+    """Resets all call statistics to zero"""
+    for mixin_stats in list(_STATS.values()):
+        for s in mixin_stats.values():
+            s.reset()
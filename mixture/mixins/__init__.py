@@ -0,0 +1,12 @@
+from .caching import CachingMixin, cached, cached_property
+from .pooling import PoolingMixin
+from .derived import DerivedMixin, derived
+
+__all__ = [
+    # submodules
+    'caching', 'pooling', 'derived',
+    # symbols
+    'CachingMixin', 'cached', 'cached_property',
+    'PoolingMixin',
+    'DerivedMixin', 'derived'
+]
@@ -0,0 +1,321 @@
+#  Authors: Sylvain Marie <sylvain.marie@se.com>
+#
+#  Copyright (c) Schneider Electric Industries, 2019. All right reserved.
+
+from inspect import getmro
+from threading import Lock
+from types import MethodType
+from weakref import WeakKeyDictionary, ref
+
+from mixture._lru import LRUCache, CacheInfo
+
+try:  # python 3.3+
+    from time import monotonic as _clock
+except ImportError:
+    from time import time as _clock
+
+try:  # python 3.5+
+    from typing import Any, Callable, Dict, Hashable, Optional, Type
+except ImportError:
+    pass
+
+
+_MISSING = object()
+_KWARGS_MARK = object()
+
+
+class MemoCache(LRUCache):
+    """
+    An `LRUCache` whose entries optionally expire `ttl` seconds after they were stored. Expired entries are removed
+    when they are looked up, and count as misses.
+
+    A cache can belong to an object (see `is_owned_by`), so that a copy of the object's `__dict__` does not share it.
+    """
+    __slots__ = ('ttl', '_owner_id', '_owner_ref')
+
+    def __init__(self, maxsize=128, ttl=None, owner=None):
+        # type: (Optional[int], Optional[float], Any) -> None
+        super(MemoCache, self).__init__(maxsize=maxsize)
+        self.ttl = ttl
+        self._owner_id = id(owner) if owner is not None else None
+        try:
+            self._owner_ref = ref(owner) if owner is not None else None
+        except TypeError:
+            # objects that do not support weak references are only identified by their id
+            self._owner_ref = None
+
+    def is_owned_by(self, obj):
+        # type: (Any) -> bool
+        """Returns `True` if this cache was created for object `obj`"""
+        owner_ref = self._owner_ref
+        return (owner_ref() is obj) if owner_ref is not None else (self._owner_id == id(obj))
+
+    def get(self, key, default=None):
+        # type: (Hashable, Any) -> Any
+        if self.ttl is None:
+            return super(MemoCache, self).get(key, default)
+        with self._lock:
+            try:
+                value, deadline = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            if deadline < _clock():
+                del self._data[key]
+                self.misses += 1
+                return default
+            self.hits += 1
+            self._move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        # type: (Hashable, Any) -> None
+        if self.ttl is not None:
+            value = (value, _clock() + self.ttl)
+        super(MemoCache, self).put(key, value)
+
+    def invalidate(self):
+        """Removes all entries, keeping the statistics"""
+        with self._lock:
+            self._data.clear()
+
+    def __reduce__(self):
+        # pickled and deep-copied empty and without owner: the cached results belong to the original object
+        return MemoCache, (self.maxsize, self.ttl)
+
+
+class CachedMember(object):
+    """
+    Base class of the descriptors created by `@cached` and `@cached_property`. The results are stored in a `MemoCache`
+    per instance (in the instance `__dict__`) or per class, depending on `scope`. Since a shallow copy of an instance
+    (`copy.copy`) copies its `__dict__`, instance caches remember the instance they were created for: a copy does not
+    use the cache of the original, and creates its own.
+
+    Since the descriptor is a normal class member, it is copied by `apply_mixins` and listed in `__from_mixins__`. Its
+    caches are attached to the instances or to the classes using it, so a descriptor shared by several classes does
+    not share results between them.
+    """
+    def __init__(self,
+                 func,          # type: Callable
+                 maxsize=128,   # type: Optional[int]
+                 ttl=None,      # type: Optional[float]
+                 scope='instance'  # type: str
+                 ):
+        if scope not in ('instance', 'class'):
+            raise ValueError("`scope` should be 'instance' or 'class', found %r" % (scope, ))
+        self.func = func
+        self.name = func.__name__
+        self.__doc__ = func.__doc__
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.scope = scope
+        # name of the cache in the instances __dict__, and caches per class
+        self._attr_name = '__cache_%s__' % self.name
+        self._class_caches = WeakKeyDictionary()  # type: Dict[Type, MemoCache]
+        self._lock = Lock()
+
+    def get_cache(self, obj, create=True):
+        # type: (Any, bool) -> Optional[MemoCache]
+        """
+        Returns the cache used for instance `obj`: its own cache, or the one of its class if `scope='class'`.
+
+        :param obj: an instance, or a class if `scope='class'`
+        :param create: if `False`, `None` is returned if the cache does not exist yet
+        :return:
+        """
+        if self.scope == 'class':
+            cls = obj if isinstance(obj, type) else type(obj)
+            cache = self._class_caches.get(cls)
+            if cache is None and create:
+                with self._lock:
+                    cache = self._class_caches.get(cls)
+                    if cache is None:
+                        cache = self._class_caches[cls] = MemoCache(self.maxsize, self.ttl)
+            return cache
+
+        try:
+            obj_dict = obj.__dict__
+        except AttributeError:
+            raise TypeError("Cached member '%s' needs instances with a `__dict__`, or `scope='class'`" % self.name)
+        cache = obj_dict.get(self._attr_name)
+        if cache is not None:
+            if cache.is_owned_by(obj):
+                return cache
+            # copied from another object with its __dict__: the cached results are not the ones of this object
+            if not create:
+                return None
+            cache = obj_dict[self._attr_name] = MemoCache(self.maxsize, self.ttl, owner=obj)
+        elif create:
+            # note: setdefault is atomic, so concurrent creations end up using the same cache
+            cache = obj_dict.setdefault(self._attr_name, MemoCache(self.maxsize, self.ttl, owner=obj))
+        return cache
+
+    def invalidate(self, obj):
+        # type: (Any) -> None
+        """Removes the cached results of instance `obj` (or of its class if `scope='class'`)"""
+        cache = self.get_cache(obj, create=False)
+        if cache is not None:
+            cache.invalidate()
+
+    def cache_info(self, obj):
+        # type: (Any) -> CacheInfo
+        """Returns the statistics of the cache of instance `obj` (or of its class if `scope='class'`)"""
+        cache = self.get_cache(obj, create=False)
+        if cache is None:
+            return CacheInfo(0, 0, self.maxsize, 0)
+        return cache.info()
+
+
+class CachedMethod(CachedMember):
+    """The descriptor created by `@cached`. See `cached`"""
+
+    def __get__(self, obj, obj_type=None):
+        if obj is None:
+            return self
+        return MethodType(self, obj)
+
+    def __call__(self, obj, *args, **kwargs):
+        key = args if len(kwargs) == 0 else args + (_KWARGS_MARK, ) + tuple(sorted(kwargs.items()))
+        cache = self.get_cache(obj)
+        result = cache.get(key, _MISSING)
+        if result is _MISSING:
+            # note: the lock is not held during the computation, so concurrent misses may compute it several times
+            result = self.func(obj, *args, **kwargs)
+            cache.put(key, result)
+        return result
+
+
+class CachedProperty(CachedMember):
+    """The descriptor created by `@cached_property`. See `cached_property`"""
+
+    def __get__(self, obj, obj_type=None):
+        if obj is None:
+            return self
+        cache = self.get_cache(obj)
+        result = cache.get((), _MISSING)
+        if result is _MISSING:
+            result = self.func(obj)
+            cache.put((), result)
+        return result
+
+    def __set__(self, obj, value):
+        raise AttributeError("Cached property '%s' can not be set" % self.name)
+
+    def __delete__(self, obj):
+        self.invalidate(obj)
+
+
+def cached(func=None,          # type: Callable
+           maxsize=128,        # type: Optional[int]
+           ttl=None,           # type: Optional[float]
+           scope='instance'    # type: str
+           ):
+    """
+    Decorator caching the results of a method, keyed on its arguments (that should be hashable). It can be used with
+    or without arguments: `@cached` or `@cached(maxsize=..., ttl=..., scope=...)`.
+
+    :param func: the method to decorate
+    :param maxsize: the maximum number of results to keep in each cache, least recently used ones being evicted first
+        (default `128`). `None` means unbounded
+    :param ttl: an optional number of seconds after which cached results expire
+    :param scope: 'instance' (default) to cache the results of each instance separately, or 'class' to share them
+        between all instances of a class, for methods whose result only depend on their arguments
+    :return:
+    """
+    if func is None:
+        return lambda f: CachedMethod(f, maxsize=maxsize, ttl=ttl, scope=scope)
+    return CachedMethod(func, maxsize=maxsize, ttl=ttl, scope=scope)
+
+
+def cached_property(func=None,        # type: Callable
+                    ttl=None,         # type: Optional[float]
+                    scope='instance'  # type: str
+                    ):
+    """
+    Decorator creating a read-only property whose value is computed once, and then cached until it expires (if `ttl`
+    is provided) or is invalidated, for example with `del obj.<name>`. It can be used with or without arguments.
+
+    :param func: the getter function
+    :param ttl: an optional number of seconds after which the cached value expires
+    :param scope: 'instance' (default) to cache the value of each instance separately, or 'class' to share it between
+        all instances of a class
+    :return:
+    """
+    if func is None:
+        return lambda f: CachedProperty(f, maxsize=1, ttl=ttl, scope=scope)
+    return CachedProperty(func, maxsize=1, ttl=ttl, scope=scope)
+
+
+def get_cached_members(cls):
+    # type: (Type) -> Dict[str, CachedMember]
+    """
+    Returns the `@cached` and `@cached_property` members of class `cls`, defined on it, copied on it by
+    `apply_mixins`, or inherited.
+
+    :param cls: a class
+    :return: a dictionary of members by name
+    """
+    members = dict()
+    for c in reversed(getmro(cls)):
+        for name, member in c.__dict__.items():
+            if isinstance(member, CachedMember):
+                members[name] = member
+            else:
+                members.pop(name, None)
+    return members
+
+
+class CachingMixin(object):
+    """
+    A mixin providing the invalidation and the statistics of the caches of the `@cached` methods and
+    `@cached_property` properties of a class. They can be defined in the class or in any other mixin.
+
+    >>> from mixture import apply_mixins
+    >>> class AreaMixin(object):
+    ...     @cached_property
+    ...     def area(self):
+    ...         return self.width * self.height
+    >>> @apply_mixins(AreaMixin, CachingMixin)
+    ... class Rectangle(object):
+    ...     def __init__(self, width, height):
+    ...         self.width, self.height = width, height
+    >>> r = Rectangle(2, 3)
+    >>> r.area, r.area
+    (6, 6)
+    >>> r.get_cache_info('area')
+    CacheInfo(hits=1, misses=1, maxsize=1, currsize=1)
+    >>> r.width = 4
+    >>> r.invalidate_caches('area')
+    >>> r.area
+    12
+    """
+    def invalidate_caches(self, *names):
+        """
+        Removes the cached results of this object, for the cached members `names` or for all of them if no name is
+        provided. For members with `scope='class'` the results of all instances of the class are removed.
+
+        :param names: the names of the cached members to invalidate
+        :return:
+        """
+        members = get_cached_members(type(self))
+        for name in (names or members):
+            try:
+                member = members[name]
+            except KeyError:
+                raise ValueError("'%s' is not a cached member of class '%s'" % (name, type(self).__name__))
+            member.invalidate(self)
+
+    def get_cache_info(self, name):
+        # type: (str) -> CacheInfo
+        """
+        Returns the statistics of the cache of cached member `name` for this object, as a named tuple
+        `(hits, misses, maxsize, currsize)`.
+
+        :param name: the name of a cached member
+        :return:
+        """
+        try:
+            member = get_cached_members(type(self))[name]
+        except KeyError:
+            raise ValueError("'%s' is not a cached member of class '%s'" % (name, type(self).__name__))
+        return member.cache_info(self)
@@ -0,0 +1,313 @@
+#  Authors: Sylvain Marie <sylvain.marie@se.com>
+#
+#  Copyright (c) Schneider Electric Industries, 2019. All right reserved.
+
+from inspect import getmro
+from threading import RLock
+from weakref import WeakKeyDictionary, ref
+
+from mixture.core import find_in_mro
+
+try:  # python 3.5+
+    from typing import Any, Callable, Dict, Optional, Tuple, Type
+except ImportError:
+    pass
+
+
+VALUES_TAG = '__derived_values__'
+"""Key of the `DerivedValues` dictionary of cached derived values, in the instances `__dict__`"""
+
+DEPENDENTS_TAG = '__derived_dependents__'
+"""Attribute set on classes once their inputs are tracked, containing the derived attributes to invalidate when each
+input is set (including the transitive dependents)"""
+
+
+class DerivedValues(dict):
+    """
+    The dictionary of cached derived values of an object, stored in its `__dict__`. It remembers the object it was
+    created for (see `is_owned_by`), so that a shallow copy of the object, that copies its `__dict__`, does not share
+    it. It is pickled and deep-copied empty and without owner.
+    """
+    __slots__ = ('_owner_id', '_owner_ref')
+
+    def __init__(self, owner=None):
+        # type: (Any) -> None
+        super(DerivedValues, self).__init__()
+        self._owner_id = id(owner) if owner is not None else None
+        try:
+            self._owner_ref = ref(owner) if owner is not None else None
+        except TypeError:
+            # objects that do not support weak references are only identified by their id
+            self._owner_ref = None
+
+    def is_owned_by(self, obj):
+        # type: (Any) -> bool
+        """Returns `True` if these values were cached for object `obj`"""
+        owner_ref = self._owner_ref
+        return (owner_ref() is obj) if owner_ref is not None else (self._owner_id == id(obj))
+
+    def __reduce__(self):
+        # the cached values belong to the original object
+        return DerivedValues, ()
+
+
+def get_values(obj, create=False):
+    # type: (Any, bool) -> Optional[DerivedValues]
+    """
+    Returns the `DerivedValues` of `obj`, creating them if `create` is `True`. Values found in the `__dict__` of `obj`
+    but cached for another object (copied with `copy.copy`) are ignored, and replaced if `create` is `True`.
+
+    :param obj: an object with a `__dict__`
+    :param create: if `True`, the values are created if needed. Otherwise `None` is returned in that case
+    :return:
+    """
+    obj_dict = obj.__dict__
+    values = obj_dict.get(VALUES_TAG)
+    if values is not None:
+        if values.is_owned_by(obj):
+            return values
+        if not create:
+            return None
+        values = obj_dict[VALUES_TAG] = DerivedValues(owner=obj)
+    elif create:
+        # note: setdefault is atomic, so concurrent creations end up using the same dictionary
+        values = obj_dict.setdefault(VALUES_TAG, DerivedValues(owner=obj))
+    return values
+
+
+class DerivedAttribute(object):
+    """
+    The descriptor created by `@derived`: a read-only attribute computed from other attributes of the object, cached
+    in the object until one of them is set. See `derived`.
+
+    The number of computations is counted per class (see `DerivedMixin.get_recomputation_counts`).
+    """
+    def __init__(self, func, depends_on):
+        # type: (Callable, Tuple[str, ...]) -> None
+        self.func = func
+        self.name = func.__name__
+        self.__doc__ = func.__doc__
+        self.depends_on = depends_on
+        self.counts = WeakKeyDictionary()  # type: Dict[Type, int]
+
+    def __get__(self, obj, obj_type=None):
+        if obj is None:
+            return self
+        try:
+            values = obj.__dict__[VALUES_TAG]
+            if values.is_owned_by(obj):
+                return values[self.name]
+        except KeyError:
+            pass
+        except AttributeError:
+            raise TypeError("Derived attribute '%s' needs instances with a `__dict__`" % self.name)
+
+        # the inputs have to be tracked before the first value is cached
+        cls = type(obj)
+        if DEPENDENTS_TAG not in cls.__dict__:
+            track_inputs(cls)
+
+        value = self.func(obj)
+        get_values(obj, create=True)[self.name] = value
+        self.counts[cls] = self.counts.get(cls, 0) + 1
+        return value
+
+    def __set__(self, obj, value):
+        raise AttributeError("Derived attribute '%s' can not be set" % self.name)
+
+    def __delete__(self, obj):
+        invalidate(obj, (self.name, ))
+
+
+class TrackedInput(object):
+    """
+    The data descriptor installed on a class in place of an input of its derived attributes (a field, or a plain
+    instance attribute). Reads are delegated to the original member if any. Writes are delegated to it too, or
+    performed in the instance `__dict__`, and then invalidate the derived attributes depending on the input.
+    """
+    __slots__ = ('name', 'member', 'dependents', '_get', '_set')
+
+    def __init__(self, name, member, dependents):
+        # type: (str, Any, Tuple[str, ...]) -> None
+        self.name = name
+        self.member = member
+        self.dependents = dependents
+        self._get = getattr(type(member), '__get__', None)
+        self._set = getattr(type(member), '__set__', None)
+
+    def __get__(self, obj, obj_type=None):
+        if obj is None:
+            return self if self.member is None else self.member
+        if self._get is not None and (self._set is not None or self.name not in obj.__dict__):
+            return self._get(self.member, obj, obj_type)
+        try:
+            return obj.__dict__[self.name]
+        except KeyError:
+            if self.member is not None:
+                # a class attribute without __get__
+                return self.member
+            raise AttributeError("'%s' object has no attribute '%s'" % (type(obj).__name__, self.name))
+
+    def __set__(self, obj, value):
+        if self._set is not None:
+            self._set(self.member, obj, value)
+        else:
+            obj.__dict__[self.name] = value
+        invalidate(obj, self.dependents)
+
+    def __delete__(self, obj):
+        delete = getattr(type(self.member), '__delete__', None)
+        if delete is not None:
+            delete(self.member, obj)
+        else:
+            try:
+                del obj.__dict__[self.name]
+            except KeyError:
+                raise AttributeError(self.name)
+        invalidate(obj, self.dependents)
+
+
+def invalidate(obj, names):
+    # type: (Any, Tuple[str, ...]) -> None
+    """Removes the cached values of derived attributes `names` of `obj`"""
+    values = get_values(obj)
+    if values:
+        for name in names:
+            values.pop(name, None)
+
+
+def get_derived_members(cls):
+    # type: (Type) -> Dict[str, DerivedAttribute]
+    """
+    Returns the `@derived` attributes of class `cls`, defined on it, copied on it by `apply_mixins`, or inherited.
+
+    :param cls: a class
+    :return: a dictionary of members by name
+    """
+    members = dict()
+    for c in reversed(getmro(cls)):
+        for name, member in c.__dict__.items():
+            if isinstance(member, DerivedAttribute):
+                members[name] = member
+            else:
+                members.pop(name, None)
+    return members
+
+
+_TRACKING_LOCK = RLock()
+"""Lock serializing the installation of `TrackedInput` descriptors"""
+
+
+def track_inputs(cls):
+    # type: (Type) -> Dict[str, Tuple[str, ...]]
+    """
+    Installs a `TrackedInput` descriptor on class `cls` for each input of its derived attributes, so that setting it
+    invalidates its dependents: the derived attributes depending on it, directly or through other derived attributes.
+    This is done automatically before the first derived value of an instance of `cls` is computed.
+
+    :param cls: a class with `@derived` attributes
+    :return: the derived attributes to invalidate for each input
+    """
+    with _TRACKING_LOCK:
+        try:
+            return cls.__dict__[DEPENDENTS_TAG]
+        except KeyError:
+            pass
+
+        derived_members = get_derived_members(cls)
+        direct = dict()
+        for name, member in derived_members.items():
+            for input_name in member.depends_on:
+                direct.setdefault(input_name, set()).add(name)
+
+        def _dependents(input_name):
+            found, todo = set(), [input_name]
+            while todo:
+                for d in direct.get(todo.pop(), ()):
+                    if d not in found:
+                        found.add(d)
+                        todo.append(d)
+            return tuple(sorted(found))
+
+        dependents = dict((input_name, _dependents(input_name)) for input_name in direct)
+        for input_name, names in dependents.items():
+            if input_name in derived_members:
+                # derived from another derived attribute: invalidated together with it
+                continue
+            member = find_in_mro(cls, input_name)
+            if isinstance(member, TrackedInput):
+                # already tracked on a parent class
+                member = member.member
+            setattr(cls, input_name, TrackedInput(input_name, member, names))
+
+        setattr(cls, DEPENDENTS_TAG, dependents)
+        return dependents
+
+
+def derived(*depends_on):
+    """
+    Decorator creating a read-only attribute computed from other attributes of the object (its inputs): `pyfields`
+    fields, other attributes or other derived attributes. The value is cached in the object until one of the inputs
+    is set (or deleted), which only invalidates the derived attributes depending on it.
+
+    :param depends_on: the names of the inputs
+    :return:
+    """
+    def _decorate(func):
+        return DerivedAttribute(func, depends_on)
+    return _decorate
+
+
+class DerivedMixin(object):
+    """
+    A mixin providing the invalidation and the computation counts of the `@derived` attributes of a class, defined in
+    the class or in any other mixin.
+
+    >>> from pyfields import field
+    >>> from mixture import apply_mixins
+    >>> class RectangleMixin(object):
+    ...     width = field(default=1)
+    ...     height = field(default=1)
+    ...     color = field(default='red')
+    ...     @derived('width', 'height')
+    ...     def area(self):
+    ...         return self.width * self.height
+    >>> @apply_mixins(RectangleMixin, DerivedMixin)
+    ... class Rectangle(object):
+    ...     pass
+    >>> r = Rectangle()
+    >>> r.width = 2
+    >>> r.area, r.area
+    (2, 2)
+    >>> r.color = 'blue'
+    >>> r.area
+    2
+    >>> r.height = 3
+    >>> r.area
+    6
+    >>> Rectangle.get_recomputation_counts()
+    {'area': 2}
+    """
+    def invalidate_derived(self, *names):
+        """
+        Removes the cached values of the derived attributes `names` of this object, or of all of them if no name is
+        provided, for example after an input was modified in place.
+
+        :param names: the names of derived attributes
+        :return:
+        """
+        if len(names) == 0:
+            self.__dict__.pop(VALUES_TAG, None)
+        else:
+            invalidate(self, names)
+
+    @classmethod
+    def get_recomputation_counts(cls):
+        # type: (...) -> Dict[str, int]
+        """
+        Returns the number of times each derived attribute was computed for the instances of this class (not its
+        subclasses).
+
+        :return: a dictionary of counts by name
+        """
+        return dict((name, member.counts.get(cls, 0)) for name, member in get_derived_members(cls).items())
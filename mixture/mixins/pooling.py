@@ -0,0 +1,209 @@
+#  Authors: Sylvain Marie <sylvain.marie@se.com>
+#
+#  Copyright (c) Schneider Electric Industries, 2019. All right reserved.
+
+from collections import namedtuple
+from inspect import getmro
+from threading import Lock
+
+from mixture.codegen import make_fields_init
+from mixture.core import is_field
+
+try:  # python 3.5+
+    from typing import Any, Type
+except ImportError:
+    pass
+
+
+POOL_TAG = '__object_pool__'
+"""Attribute set on classes using `PoolingMixin`, containing their `ObjectPool`"""
+
+POOL_SIZE_TAG = '__pool_size__'
+"""Optional class attribute defining the maximum number of free instances kept by the pool of a class"""
+
+DEFAULT_POOL_SIZE = 1024
+"""The maximum number of free instances kept by the pool of a class that does not define `__pool_size__`"""
+
+PoolInfo = namedtuple('PoolInfo', ['created', 'reused', 'discarded', 'maxsize', 'currsize'])
+"""Statistics of an object pool: instances created and reused by `acquire`, and discarded by `release` when the pool
+is full"""
+
+
+class ObjectPool(object):
+    """
+    The bounded free list of instances of a class using `PoolingMixin`.
+
+    Released instances are reset before they are stored: all their `pyfields` fields (declared by the class or by its
+    mixins) are set back to their default value with a generated function (see `make_fields_init`), mandatory fields
+    are deleted, and the `on_release` hook of the instance is called.
+    """
+    __slots__ = ('cls', 'maxsize', 'created', 'reused', 'discarded', '_free', '_ids', '_redefault', '_mandatory',
+                 '_hook')
+
+    def __init__(self, cls, maxsize):
+        # type: (Type, int) -> None
+        self.cls = cls
+        self.maxsize = maxsize
+        self.created = 0
+        self.reused = 0
+        self.discarded = 0
+        # note: the free list only relies on the atomicity of `list.pop` and `list.append`, so that no lock is needed.
+        # Concurrent releases may exceed `maxsize` by the number of threads
+        self._free = []
+        # the ids of the free instances, to detect double releases
+        self._ids = set()
+
+        fields = get_fields(cls)
+        self._redefault = make_fields_init(fields, owner_cls=cls)
+        self._mandatory = tuple(f_name for f_name, f in fields if f.is_mandatory)
+        # the reset hook, if the class overrides the default one
+        hook = getattr(cls, 'on_release', None)
+        self._hook = hook if getattr(hook, '__func__', hook) is not _NO_HOOK else None
+
+    def acquire(self, args, kwargs):
+        # type: (tuple, dict) -> Any
+        """Returns a free instance initialized with `args` and `kwargs`, or a new one if there is no free instance"""
+        try:
+            obj = self._free.pop()
+        except IndexError:
+            self.created += 1
+            return self.cls(*args, **kwargs)
+        self._ids.discard(id(obj))
+        self.reused += 1
+        obj.__init__(*args, **kwargs)
+        return obj
+
+    def release(self, obj):
+        # type: (Any) -> None
+        """Resets `obj` and stores it in the free list, or drops it if the pool is full"""
+        if id(obj) in self._ids:
+            raise ValueError("%r has already been released" % obj)
+        if len(self._free) >= self.maxsize:
+            self.discarded += 1
+            return
+
+        self._redefault(obj)
+        if self._mandatory:
+            for f_name in self._mandatory:
+                try:
+                    delattr(obj, f_name)
+                except AttributeError:
+                    pass
+        if self._hook is not None:
+            self._hook(obj)
+
+        # note: the ids are updated first, so that a free instance is always in `_ids`
+        self._ids.add(id(obj))
+        self._free.append(obj)
+
+    def clear(self):
+        """Drops all free instances"""
+        del self._free[:]
+        self._ids.clear()
+
+    def info(self):
+        # type: (...) -> PoolInfo
+        return PoolInfo(self.created, self.reused, self.discarded, self.maxsize, len(self._free))
+
+
+def get_fields(cls):
+    # type: (Type) -> list
+    """
+    Returns the (name, field) tuples of the `pyfields` fields of class `cls`, defined on it, copied on it by
+    `apply_mixins`, or inherited.
+
+    :param cls: a class
+    :return:
+    """
+    fields = dict()
+    for c in reversed(getmro(cls)):
+        for name, member in c.__dict__.items():
+            if is_field(member):
+                fields[name] = member
+            else:
+                fields.pop(name, None)
+    return sorted(fields.items())
+
+
+_POOL_CREATION_LOCK = Lock()
+"""Lock serializing the creation of pools"""
+
+
+def get_pool(cls):
+    # type: (Type) -> ObjectPool
+    """
+    Returns the pool of class `cls`, creating it if needed. Each class has its own pool, subclasses do not share the
+    pool of their parent.
+
+    :param cls: a class using `PoolingMixin`
+    :return:
+    """
+    pool = cls.__dict__.get(POOL_TAG)
+    if pool is None:
+        with _POOL_CREATION_LOCK:
+            pool = cls.__dict__.get(POOL_TAG)
+            if pool is None:
+                pool = ObjectPool(cls, getattr(cls, POOL_SIZE_TAG, DEFAULT_POOL_SIZE))
+                setattr(cls, POOL_TAG, pool)
+    return pool
+
+
+class PoolingMixin(object):
+    """
+    A mixin providing a bounded pool of reusable instances, for classes of which many short-lived instances are
+    created. Instances obtained with `acquire` should be given back with `release` once they are not used anymore.
+
+    >>> from pyfields import field
+    >>> from mixture import apply_mixins
+    >>> class CounterMixin(object):
+    ...     count = field(default=0)
+    >>> @apply_mixins(CounterMixin, PoolingMixin)
+    ... class Request(object):
+    ...     def __init__(self, path):
+    ...         self.path = path
+    >>> r = Request.acquire('/a')
+    >>> r.count += 1
+    >>> r.release()
+    >>> r2 = Request.acquire('/b')
+    >>> r2 is r, r2.path, r2.count
+    (True, '/b', 0)
+    """
+    @classmethod
+    def acquire(cls, *args, **kwargs):
+        """
+        Returns an instance of the class initialized with `args` and `kwargs`: a released instance if the pool of the
+        class contains one (its `__init__` method is called again), or else a new instance.
+
+        :param args: the positional arguments of `__init__`
+        :param kwargs: the keyword arguments of `__init__`
+        :return:
+        """
+        return get_pool(cls).acquire(args, kwargs)
+
+    def release(self):
+        """
+        Gives this object back to the pool of its class. The object is reset (its fields are set back to their default
+        value and `on_release` is called) and stored in the pool, unless the pool already contains `__pool_size__`
+        instances. It should not be used anymore after this call.
+        """
+        get_pool(type(self)).release(self)
+
+    def on_release(self):
+        """
+        Hook called when this object is released in the pool, after its fields have been reset. It does nothing by
+        default: override it to reset the other attributes, or release the resources held by the object.
+        """
+        pass
+
+    @classmethod
+    def get_pool_info(cls):
+        # type: (...) -> PoolInfo
+        """
+        Returns the statistics of the pool of the class, as a named tuple `(created, reused, discarded, maxsize,
+        currsize)`.
+        """
+        return get_pool(cls).info()
+
+
+_NO_HOOK = PoolingMixin.__dict__['on_release']
+"""The default `on_release` hook, that does nothing"""
@@ -0,0 +1,154 @@
+#  Authors: Sylvain Marie <sylvain.marie@se.com>
+#
+#  Copyright (c) Schneider Electric Industries, 2019. All right reserved.
+
+import os
+from collections import namedtuple
+from contextlib import contextmanager
+
+try:  # python 3.3+
+    from time import perf_counter as timer
+except ImportError:
+    from time import time as timer
+
+try:  # python 3.5+
+    from typing import List, Optional
+except ImportError:
+    pass
+
+
+PROFILE_ENV_VAR = 'MIXTURE_PROFILE'
+"""Name of the environment variable enabling profiling at import time, when set to a non-empty value other than 0"""
+
+
+DecorationRecord = namedtuple('DecorationRecord', ['cls_name', 'mixins', 'nb_members', 'plan_cached',
+                                                   'plan_time', 'copy_time', 'register_time'])
+"""
+A profiling record of a single decoration by `apply_mixins`:
+
+ - `cls_name`: the qualified name of the decorated class, including its module
+ - `mixins`: the qualified names of the mixin classes
+ - `nb_members`: the number of members copied
+ - `plan_cached`: `True` if the composition plan was found in the cache
+ - `plan_time`: time (s) spent listing the members to copy
+ - `copy_time`: time (s) spent copying the members (`setattr` or class rebuild), including code generation
+ - `register_time`: time (s) spent registering the class as a virtual subclass of the ABC mixins
+"""
+
+
+_RECORDS = []
+"""The records collected so far"""
+
+_ENABLED = [False]
+"""Whether profiling is enabled. Wrapped in a list so that it can be modified"""
+
+
+def get_records_if_enabled():
+    # type: (...) -> Optional[List[DecorationRecord]]
+    """Returns the list where records should be appended if profiling is enabled, `None` otherwise"""
+    return _RECORDS if _ENABLED[0] else None
+
+
+def enable_profiling():
+    """
+    Enables the profiling of all subsequent `apply_mixins` decorations. This can also be done at import time by
+    setting the `MIXTURE_PROFILE` environment variable to `1`. When profiling is disabled (the default) it has no
+    overhead.
+    """
+    _ENABLED[0] = True
+
+
+def disable_profiling():
+    """Disables the profiling of `apply_mixins` decorations. Records collected so far are kept"""
+    _ENABLED[0] = False
+
+
+def is_profiling_enabled():
+    # type: (...) -> bool
+    return _ENABLED[0]
+
+
+@contextmanager
+def profiling():
+    """
+    A context manager enabling profiling inside the `with` block, and yielding the list of records collected inside
+    the block. It is filled when the block exits.
+
+    >>> from mixture import apply_mixins
+    >>> class FooMixin(object):
+    ...     def foo(self):
+    ...         pass
+    >>> with profiling() as records:
+    ...     @apply_mixins(FooMixin)
+    ...     class Foo(object):
+    ...         pass
+    >>> len(records), records[0].nb_members
+    (1, 1)
+    """
+    was_enabled = _ENABLED[0]
+    _ENABLED[0] = True
+    start = len(_RECORDS)
+    recorded = []
+    try:
+        yield recorded
+    finally:
+        recorded.extend(_RECORDS[start:])
+        _ENABLED[0] = was_enabled
+
+
+def get_profile_records():
+    # type: (...) -> List[DecorationRecord]
+    """Returns a copy of the list of `DecorationRecord` collected so far"""
+    return list(_RECORDS)
+
+
+def clear_profile_records():
+    """Removes all records collected so far"""
+    del _RECORDS[:]
+
+
+def get_profile_summary(records=None,  # type: List[DecorationRecord]
+                        top=None       # type: int
+                        ):
+    # type: (...) -> str
+    """
+    Returns a text table summarizing the profiling records, sorted by decreasing total time, followed by a line with
+    the totals. Times are in milliseconds.
+
+    :param records: the records to summarize. By default all records collected so far are used
+    :param top: an optional maximum number of records to display (totals are computed on all records)
+    :return:
+    """
+    if records is None:
+        records = get_profile_records()
+
+    sorted_records = sorted(records, key=lambda r: r.plan_time + r.copy_time + r.register_time, reverse=True)
+    if top is not None:
+        sorted_records = sorted_records[:top]
+
+    header = "%-50s %8s %6s %10s %10s %10s %10s" % ('class', 'members', 'cached', 'plan(ms)', 'copy(ms)',
+                                                   'abc(ms)', 'total(ms)')
+    lines = [header, '-' * len(header)]
+    row = "%-50s %8s %6s %10.3f %10.3f %10.3f %10.3f"
+    for r in sorted_records:
+        lines.append(row % (r.cls_name[-50:], r.nb_members, r.plan_cached, r.plan_time * 1000, r.copy_time * 1000,
+                            r.register_time * 1000, (r.plan_time + r.copy_time + r.register_time) * 1000))
+
+    plan_time = sum(r.plan_time for r in records)
+    copy_time = sum(r.copy_time for r in records)
+    register_time = sum(r.register_time for r in records)
+    lines.append('-' * len(header))
+    lines.append(row % ("TOTAL (%s decorations)" % len(records), sum(r.nb_members for r in records),
+                        sum(1 for r in records if r.plan_cached), plan_time * 1000, copy_time * 1000,
+                        register_time * 1000, (plan_time + copy_time + register_time) * 1000))
+    return '\n'.join(lines)
+
+
+def qualified_name(cls):
+    # type: (type) -> str
+    """Returns the qualified name of class `cls`, including its module"""
+    return "%s.%s" % (cls.__module__, getattr(cls, '__qualname__', cls.__name__))
+
+
+if os.environ.get(PROFILE_ENV_VAR, '') not in ('', '0'):
+    enable_profiling()
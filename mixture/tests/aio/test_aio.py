@@ -0,0 +1,82 @@
+#  Authors: Sylvain Marie <sylvain.marie@se.com>
+#
+#  Copyright (c) Schneider Electric Industries, 2019. All right reserved.
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from mixture import apply_mixins
+
+
+def run(coroutine):
+    """`asyncio.run` for python 3.5+"""
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        asyncio.set_event_loop(None)
+        loop.close()
+
+
+class StorageMixin(object):
+    def read(self, key, default=None):
+        time.sleep(0.05)
+        return self.data.get(key, default), threading.current_thread()
+
+    def write(self, key, value):
+        self.data[key] = value
+
+    async def close(self):
+        pass
+
+
+@pytest.mark.parametrize('lazy', [False, True], ids="lazy={}".format)
+def test_async_methods(lazy):
+    """Nominal test: the adapters run the blocking methods in the executor"""
+    executor = ThreadPoolExecutor(max_workers=10)
+
+    @apply_mixins(StorageMixin, async_methods=True, executor=executor, lazy=lazy)
+    class Storage(object):
+        def __init__(self):
+            self.data = dict()
+
+        async def awrite(self, key, value):
+            self.write(key, value)
+
+    assert {'aread'}.issubset(Storage.__from_mixins__)
+    assert not hasattr(Storage, 'aclose')
+    assert Storage.__dict__['awrite'].__qualname__.endswith('Storage.awrite')
+
+    async def main():
+        s = Storage()
+        await s.awrite('a', 1)
+        start = time.time()
+        results = await asyncio.gather(*[s.aread('a') for _ in range(10)], s.aread('b', default=2))
+        return results, time.time() - start
+
+    results, duration = run(main())
+    assert [r[0] for r in results] == [1] * 10 + [2]
+    assert all(r[1] is not threading.current_thread() for r in results)
+    # calls run concurrently (11 calls of 50ms with 10 workers)
+    assert duration < 0.3
+    executor.shutdown()
+
+
+def test_async_methods_selection():
+    """Checks the selection of the methods and the default executor"""
+
+    @apply_mixins(StorageMixin, async_methods=['read'])
+    class Storage(object):
+        data = {'a': 1}
+
+    assert 'aread' in Storage.__from_mixins__ and 'awrite' not in Storage.__from_mixins__
+    assert run(Storage().aread('a'))[0] == 1
+
+    with pytest.raises(ValueError):
+        apply_mixins(StorageMixin, async_methods=['close'])(type('Storage', (object, ), {}))
+    with pytest.raises(TypeError):
+        apply_mixins(StorageMixin, async_methods=True, executor=1)(type('Storage', (object, ), {}))
@@ -0,0 +1,123 @@
+#  Authors: Sylvain Marie <sylvain.marie@se.com>
+#
+#  Copyright (c) Schneider Electric Industries, 2019. All right reserved.
+
+import sys
+from importlib import import_module
+
+import pytest
+
+from mixture import get_plan_cache_info, clear_plan_cache, has_mixin
+from mixture.aot import compose_ahead_of_time, load_precomposed, unload_precomposed
+
+
+MIXINS_SRC = """
+from abc import ABCMeta
+
+class ParentMixin(object):
+    def foo(self):
+        return 'foo'
+
+class BarkerMixin(ParentMixin):
+    __metaclass__ = ABCMeta
+
+    def bark(self):
+        return 'barking'
+"""
+
+CLASSES_SRC = """
+from mixture import apply_mixins
+from aotpkg.mixins import BarkerMixin
+
+@apply_mixins(BarkerMixin)
+class Dog(object):
+    def foo(self):
+        return 'own foo'
+
+@apply_mixins(BarkerMixin, rebuild=True)
+class Wolf(object):
+    pass
+"""
+
+
+@pytest.fixture
+def aot_package(tmp_path):
+    """A temporary package named `aotpkg`, removed from `sys.modules` and `sys.path` after the test"""
+    pkg = tmp_path / 'aotpkg'
+    pkg.mkdir()
+    (pkg / '__init__.py').write_text(u'')
+    (pkg / 'mixins.py').write_text(MIXINS_SRC)
+    (pkg / 'classes.py').write_text(CLASSES_SRC)
+    sys.path.insert(0, str(tmp_path))
+    yield pkg
+    sys.path.remove(str(tmp_path))
+    unload_precomposed()
+    for name in list(sys.modules):
+        if name.split('.')[0] == 'aotpkg':
+            del sys.modules[name]
+
+
+def _reimport_classes():
+    """Imports the decorated classes again, with the mixins module unchanged"""
+    sys.modules.pop('aotpkg.classes', None)
+    return import_module('aotpkg.classes')
+
+
+def test_aot_composition(aot_package):
+    """Checks that precomposed plans are generated, loaded and used instead of computing them"""
+    src = compose_ahead_of_time(['aotpkg'])
+    assert "'aotpkg.classes.Dog'" in src and "'aotpkg.classes.Wolf'" in src
+    (aot_package / '_precomposed.py').write_text(src)
+
+    assert load_precomposed('aotpkg._precomposed') == 2
+    clear_plan_cache()
+    classes = _reimport_classes()
+    # no plan was computed
+    assert get_plan_cache_info().misses == 0
+
+    from aotpkg.mixins import BarkerMixin, ParentMixin
+    d, w = classes.Dog(), classes.Wolf()
+    assert d.bark() == 'barking' and d.foo() == 'own foo'
+    assert w.bark() == 'barking' and w.foo() == 'foo'
+    assert classes.Dog.__from_mixins__ == ('bark',)
+    assert sorted(classes.Wolf.__from_mixins__) == ['bark', 'foo']
+    assert has_mixin(d, ParentMixin) and has_mixin(w, BarkerMixin)
+
+    # a modified class does not use the precomposed plan
+    (aot_package / 'classes.py').write_text(CLASSES_SRC.replace('    pass', '    def howl(self):\n        pass'))
+    classes = _reimport_classes()
+    assert get_plan_cache_info().misses == 1
+    assert classes.Wolf().foo() == 'foo'
+
+
+def test_aot_modified_mixins(aot_package):
+    """Checks that precomposed plans are not used once members are added to or removed from the mixins"""
+    (aot_package / '_precomposed.py').write_text(compose_ahead_of_time(['aotpkg']))
+    load_precomposed('aotpkg._precomposed')
+
+    # a member added to the parent of a mixin, and a member of the mixin replaced with another one
+    (aot_package / 'mixins.py').write_text(MIXINS_SRC.replace("        return 'foo'", "        return 'foo'\n\n"
+                                                                                   "    def bar(self):\n"
+                                                                                   "        return 'bar'")
+                                           .replace("    def bark(self):\n        return 'barking'\n",
+                                                    "    def howl(self):\n        return 'howling'\n"))
+    sys.modules.pop('aotpkg.mixins')
+    clear_plan_cache()
+    classes = _reimport_classes()
+    assert get_plan_cache_info().misses == 2
+    assert set(classes.Dog.__from_mixins__) == {'howl', 'bar'}
+    assert not hasattr(classes.Dog, 'bark')
+    assert classes.Wolf().bar() == 'bar'
+
+    # a member added at runtime, after the precomposed plan was used
+    unload_precomposed()
+    load_precomposed('aotpkg._precomposed')
+    sys.modules.pop('aotpkg.mixins')
+    (aot_package / 'mixins.py').write_text(MIXINS_SRC)
+    classes = _reimport_classes()
+    from aotpkg.mixins import BarkerMixin
+    BarkerMixin.sit = lambda self: 'sitting'
+    clear_plan_cache()
+    classes = _reimport_classes()
+    assert get_plan_cache_info().misses == 2
+    assert classes.Dog().sit() == 'sitting'
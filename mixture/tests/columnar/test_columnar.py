@@ -0,0 +1,187 @@
+#  Authors: Sylvain Marie <sylvain.marie@se.com>
+#
+#  Copyright (c) Schneider Electric Industries, 2019. All right reserved.
+import copy
+import gc
+import pickle
+
+import pytest
+from pyfields import field
+
+from mixture import apply_mixins, batched, get_column_store, has_mixin
+
+
+class ParticleMixin(object):
+    __slots__ = ('tag', )
+
+    x = field(type_hint=float, default=0.)
+    hits = field(type_hint=int, default=0)
+    active = field(type_hint=bool, default=True)
+    history = field(default_factory=lambda obj: [])
+    mass = field(type_hint=float)
+
+    def move(self, dx):
+        self.x += dx
+        self.hits += 1
+        self.history.append(dx)
+
+    @batched
+    def move_all(store, dx):
+        x, hits = store['x'], store['hits']
+        for row, alive in enumerate(store.alive):
+            if alive:
+                x[row] += dx
+                hits[row] += 1
+
+    @batched
+    def total_x(store):
+        return sum(x for x, alive in zip(store['x'], store.alive) if alive)
+
+
+def test_columnar():
+    """Nominal test: mixin fields are stored in the columns of a store shared by all instances"""
+
+    @apply_mixins(ParticleMixin, columnar=True)
+    class Particle(object):
+        __slots__ = ('name', )
+
+        def __init__(self, name):
+            self.name = name
+
+    store = get_column_store(Particle)
+    assert Particle.__slots__ == ('name', '__row__')
+    assert set(Particle.__from_mixins__) == {'tag', 'x', 'hits', 'active', 'history', 'mass', 'move', 'move_all',
+                                            'total_x'}
+    assert [store[n].typecode for n in ('x', 'hits', 'active', 'mass')] == ['d', 'q', 'b', 'd']
+    assert isinstance(store['history'], list) and isinstance(store['tag'], list)
+
+    p1, p2 = Particle('a'), Particle('b')
+    assert not hasattr(p1, '__dict__')
+    assert (p1.name, p1.x, p1.hits, p1.active, p1.history, p1.mass, p1.tag) == ('a', 0., 0, True, [], 0., None)
+    assert p1.history is not p2.history
+    assert has_mixin(p1, ParticleMixin)
+
+    p1.move(2.)
+    p2.active = False
+    p2.tag = 'red'
+    assert (p1.x, p1.hits, p1.history, p2.x, p2.active, p2.tag) == (2., 1, [2.], 0., False, 'red')
+    assert list(store['x']) == [2., 0.] and list(store['active']) == [1, 0]
+
+    # batched functions receive the store, from the class or from an instance
+    Particle.move_all(1.)
+    assert (p1.x, p1.hits, p2.x, p2.hits) == (3., 2, 1., 1)
+    assert p1.total_x() == 4.
+    with pytest.raises(TypeError):
+        ParticleMixin.move_all(1.)
+
+    # rows are released when instances are garbage collected, and reused
+    del p2
+    gc.collect()
+    assert len(store) == 2 and store.nb_alive == 1
+    assert Particle.total_x() == 3.
+    assert store['tag'] == [None, None]
+    Particle.move_all(1.)
+    p3 = Particle('c')
+    assert len(store) == 2
+    assert (p3.x, p3.hits, p3.tag) == (0., 0, None)
+
+    # subclasses share the store
+    class SubParticle(Particle):
+        __slots__ = ()
+
+    p4 = SubParticle('d')
+    assert store.nb_alive == 3 and p4.x == 0.
+
+    with pytest.raises(ValueError):
+        apply_mixins(ParticleMixin, columnar=True, slots=True)(Particle)
+
+
+def test_columnar_own_fields():
+    """Checks that the fields declared by the decorated class itself are stored in columns too"""
+
+    @apply_mixins(ParticleMixin, columnar=True)
+    class Particle(object):
+        charge = field(type_hint=int, default=1)
+        trail = field(default_factory=lambda obj: [])
+
+    store = get_column_store(Particle)
+    assert Particle.__slots__ == ('__row__', )
+    assert store['charge'].typecode == 'q' and isinstance(store['trail'], list)
+
+    p1, p2 = Particle(), Particle()
+    assert not hasattr(p1, '__dict__')
+    assert (p1.charge, p1.trail, p1.x) == (1, [], 0.)
+    assert p1.trail is not p2.trail
+    p1.charge = -1
+    assert (p1.charge, p2.charge) == (-1, 1)
+    assert list(store['charge']) == [-1, 1]
+
+
+def test_columnar_numpy():
+    """Checks that numeric columns can be processed with numpy without copy"""
+    np = pytest.importorskip('numpy')
+
+    @apply_mixins(ParticleMixin, columnar=True)
+    class Particle(object):
+        pass
+
+    particles = [Particle() for _ in range(10)]
+    store = get_column_store(Particle)
+    x = store.numpy('x')
+    x += np.arange(10)
+    assert particles[3].x == 3.
+    assert store.numpy(store.alive).all()
+    del x
+
+
+@apply_mixins(ParticleMixin, columnar=True)
+class NamedParticle(object):
+    __slots__ = ('name', )
+
+    def __init__(self, name):
+        self.name = name
+
+
+def test_columnar_copy():
+    """Checks that shallow copies of columnar instances get their own row, with the same values"""
+    store = get_column_store(NamedParticle)
+    p = NamedParticle('a')
+    p.move(2.)
+    p.tag = 'red'
+
+    q = copy.copy(p)
+    assert q.__row__ != p.__row__
+    assert (q.name, q.x, q.hits, q.history, q.tag) == ('a', 2., 1, [2.], 'red')
+
+    q.x = 7.
+    assert p.x == 2.
+
+    # releasing the row of the copy does not modify the original
+    nb_alive = store.nb_alive
+    row = q.__row__
+    del q
+    gc.collect()
+    assert store.nb_alive == nb_alive - 1
+    assert p.x == 2.
+    r = NamedParticle('b')
+    assert r.__row__ == row != p.__row__
+
+
+def test_columnar_pickle():
+    """Checks that pickled columnar instances contain the field values, and are loaded in a new row"""
+    store = get_column_store(NamedParticle)
+    p = NamedParticle('a')
+    p.move(3.)
+    p.mass = 1.5
+
+    for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+        nb_alive = store.nb_alive
+        q = pickle.loads(pickle.dumps(p, protocol=protocol))
+        assert store.nb_alive == nb_alive + 1
+        assert q.__row__ != p.__row__
+        assert (q.name, q.x, q.hits, q.history, q.mass, q.active) == ('a', 3., 1, [3.], 1.5, True)
+        q.x = 0.
+        assert p.x == 3.
+        del q
+        gc.collect()
+        assert store.nb_alive == nb_alive
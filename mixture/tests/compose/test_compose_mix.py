@@ -0,0 +1,172 @@
+#  Authors: Sylvain Marie <sylvain.marie@se.com>
+#
+#  Copyright (c) Schneider Electric Industries, 2019. All right reserved.
+
+import copy
+import gc
+import pickle
+
+import pytest
+
+from mixture import mix, apply_mixins_to_instance, get_mix_cache_info, set_mix_cache_size, clear_mix_cache, has_mixin
+
+from ..utils import ABC
+
+
+@pytest.fixture
+def fresh_mix_cache():
+    """Provides an empty mix cache and restores its size afterwards"""
+    maxsize = get_mix_cache_info().maxsize
+    clear_mix_cache()
+    yield
+    set_mix_cache_size(maxsize)
+    clear_mix_cache()
+
+
+class BarkerMixin(ABC):
+    def bark(self):
+        return "barking loudly"
+
+
+class TweeterMixin(object):
+    def tweet(self):
+        return "tweeting loudly"
+
+
+class Duck(object):
+    def tweet(self):
+        return "quack"
+
+
+def test_mix(fresh_mix_cache):
+    """Nominal test: the base is not modified and the composed class is interned"""
+
+    MagicDuck = mix(Duck, BarkerMixin, TweeterMixin)
+    assert MagicDuck.__name__ == 'Duck[BarkerMixin, TweeterMixin]'
+    assert issubclass(MagicDuck, Duck)
+    assert issubclass(MagicDuck, BarkerMixin)
+    assert has_mixin(MagicDuck, TweeterMixin)
+    assert not hasattr(Duck, 'bark')
+
+    d = MagicDuck()
+    assert d.bark() == "barking loudly"
+    # Note: the mixin overrides the base, since the base is a parent of the composed class
+    assert d.tweet() == "tweeting loudly"
+
+    assert mix(Duck, BarkerMixin, TweeterMixin) is MagicDuck
+    assert mix(Duck, TweeterMixin, BarkerMixin) is not MagicDuck
+    assert mix(Duck) is Duck
+
+    info = get_mix_cache_info()
+    assert (info.hits, info.misses, info.currsize) == (1, 2, 2)
+
+
+def test_mix_weak(fresh_mix_cache):
+    """Checks that composed classes are freed when not used anymore, except the ones kept alive"""
+    set_mix_cache_size(1)
+
+    for mixin in (BarkerMixin, TweeterMixin):
+        mix(Duck, mixin)
+    gc.collect()
+
+    # only the most recent one is kept alive
+    assert get_mix_cache_info().currsize == 1
+    assert (Duck, (TweeterMixin,)) in _cache_keys()
+
+    set_mix_cache_size(0)
+    gc.collect()
+    assert get_mix_cache_info().currsize == 0
+
+
+class Counter(object):
+    __slots__ = ('count', '__dict__')
+
+    def __init__(self, count):
+        self.count = count
+
+
+def test_mix_pickle(fresh_mix_cache):
+    """Checks that instances of composed classes can be pickled, and that the composed class is rebuilt if needed"""
+    MagicDuck = mix(Duck, BarkerMixin, TweeterMixin)
+    d = MagicDuck()
+    d.name = 'donald'
+    ducks = [d, MagicDuck(), MagicDuck()]
+
+    for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+        d2 = pickle.loads(pickle.dumps(d, protocol))
+        assert type(d2) is MagicDuck
+        assert d2.name == 'donald'
+        assert d2.bark() == "barking loudly"
+
+    # the (base, mixins) tuple is only stored once
+    assert len(pickle.dumps(ducks)) < 2 * len(pickle.dumps(ducks[1:2]))
+
+    # slots are pickled too
+    c = mix(Counter, TweeterMixin)(2)
+    c.extra = 1
+    c2 = pickle.loads(pickle.dumps(c))
+    assert (c2.count, c2.extra, c2.tweet()) == (2, 1, "tweeting loudly")
+
+    # in a fresh process, the composed class would not exist: it is created when unpickling
+    dumped = pickle.dumps(ducks)
+    del MagicDuck, d, ducks, d2
+    clear_mix_cache()
+    gc.collect()
+    ducks = pickle.loads(dumped)
+    assert get_mix_cache_info().misses == 1
+    assert ducks[0].name == 'donald'
+    assert type(ducks[1]) is type(ducks[0]) is mix(Duck, BarkerMixin, TweeterMixin)
+
+
+@pytest.mark.parametrize('copier', [copy.copy, copy.deepcopy], ids=lambda c: c.__name__)
+def test_mix_copy(fresh_mix_cache, copier):
+    """Checks that instances of composed classes and extended objects can be copied"""
+    d = mix(Duck, BarkerMixin, TweeterMixin)()
+    d.name = ['donald']
+    d2 = copier(d)
+    assert type(d2) is type(d)
+    assert d2.name == ['donald'] and (d2.name is d.name) == (copier is copy.copy)
+    assert d2.bark() == "barking loudly"
+
+    # slots are copied too
+    c = apply_mixins_to_instance(Counter(2), TweeterMixin)
+    c.extra = 1
+    c2 = copier(c)
+    assert type(c2) is type(c)
+    assert (c2.count, c2.extra, c2.tweet()) == (2, 1, "tweeting loudly")
+
+
+class Point(object):
+    __slots__ = ('x', 'y')
+
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+
+
+def test_apply_mixins_to_instance(fresh_mix_cache):
+    """Checks that objects extended with the same mixins share the same class, and that slotted objects work too"""
+    ducks = [Duck() for _ in range(100)]
+    for d in ducks[:50]:
+        assert apply_mixins_to_instance(d, BarkerMixin) is d
+    assert len(set(type(d) for d in ducks)) == 2
+    assert type(ducks[0]) is mix(Duck, BarkerMixin)
+    assert ducks[0].bark() == "barking loudly"
+    assert not hasattr(ducks[99], 'bark')
+
+    # applying more mixins composes the base with all of them
+    apply_mixins_to_instance(ducks[0], TweeterMixin)
+    assert type(ducks[0]) is mix(Duck, TweeterMixin, BarkerMixin)
+    assert ducks[0].tweet() == "tweeting loudly" and ducks[0].bark() == "barking loudly"
+    assert pickle.loads(pickle.dumps(ducks[0])).bark() == "barking loudly"
+
+    # the instance layout is preserved
+    p = apply_mixins_to_instance(Point(1, 2), BarkerMixin)
+    assert (p.x, p.y, p.bark()) == (1, 2, "barking loudly")
+    assert not hasattr(p, '__dict__')
+
+
+def _cache_keys():
+    from mixture.compose import _MIX_CACHE
+    # keys are weak references to the base and the mixins
+    return [(k[0](), tuple(r() for r in k[1:])) for k in _MIX_CACHE._refs.keys()]
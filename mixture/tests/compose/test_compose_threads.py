@@ -0,0 +1,95 @@
+#  Authors: Sylvain Marie <sylvain.marie@se.com>
+#
+#  Copyright (c) Schneider Electric Industries, 2019. All right reserved.
+
+import sys
+from itertools import permutations
+from threading import Barrier, Thread
+
+import pytest
+
+from mixture import mix, apply_mixins, has_mixin, clear_mix_cache, clear_plan_cache
+
+from ..utils import ABC
+
+
+def make_mixins(nb_mixins, nb_members):
+    return [type(ABC)('Mixin%s' % j, (ABC,), {'m%s_%s' % (j, i): (lambda self, i=i: i) for i in range(nb_members)})
+            for j in range(nb_mixins)]
+
+
+@pytest.fixture
+def fast_switching():
+    """Makes the interpreter switch threads as often as possible, to increase the chances of interleaving"""
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(interval)
+
+
+def run_threads(nb_threads, target):
+    """Runs `target(i)` in `nb_threads` threads started at the same time, and re-raises the first error"""
+    barrier = Barrier(nb_threads)
+    errors = []
+
+    def _run(i):
+        barrier.wait()
+        try:
+            target(i)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [Thread(target=_run, args=(i,)) for i in range(nb_threads)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    if len(errors) > 0:
+        raise errors[0]
+
+
+def test_mix_concurrent(fast_switching):
+    """Stress test: threads composing the same classes concurrently only see fully built, unique classes"""
+    clear_mix_cache()
+    clear_plan_cache()
+    mixins = make_mixins(4, 50)
+    combinations = list(permutations(mixins, 2))
+    results = [dict() for _ in range(8)]
+
+    class Base(object):
+        pass
+
+    def compose_all(i):
+        for combination in combinations[i % 3:] + combinations[:i % 3]:
+            cls = mix(Base, *combination)
+            o = cls()
+            # the class is fully built when it is returned
+            for m in combination:
+                assert has_mixin(o, m) and isinstance(o, m)
+            assert len(cls.__from_mixins__) == 100
+            assert o.m0_49() == 49 if mixins[0] in combination else True
+            results[i][combination] = cls
+
+    run_threads(8, compose_all)
+
+    # all threads got the same classes
+    for combination in combinations:
+        assert len(set(r[combination] for r in results)) == 1
+
+
+def test_lazy_concurrent(fast_switching):
+    """Stress test: threads calling lazy methods for the first time at the same time never get an AttributeError"""
+    mixin = make_mixins(1, 200)[0]
+
+    for _ in range(5):
+        @apply_mixins(mixin, lazy=True)
+        class Foo(object):
+            pass
+
+        def call_all(i):
+            o = Foo()
+            for j in range(200):
+                assert getattr(o, 'm0_%s' % j)() == j
+
+        run_threads(8, call_all)
+        assert sorted(Foo.__from_mixins__) == sorted('m0_%s' % j for j in range(200))
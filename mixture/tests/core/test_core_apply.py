@@ -5,8 +5,9 @@
 import sys
 
 import pytest
+from pyfields import field
 
-from mixture import apply_mixins, MixinContainsInitWarning
+from mixture import apply_mixins, MixinContainsInitWarning, has_mixin
 
 from ..utils import ABC
 
@@ -97,3 +98,243 @@ def test_apply_mixins_warning_init():
 #         @apply_mixins(DummyMixinNotAbc)
 #         class MyClass(object):
 #             pass
+
+
+def test_apply_mixins_rebuild():
+    """checks that with `rebuild=True` a new class is created with the final namespace"""
+
+    class DummyMixinA:
+        def foo(self, a):
+            return a + 1
+
+    class DummyMixinB(ABC):
+        def foo(self, a):
+            return a + 2
+
+        def bar(self):
+            return 'bar'
+
+    class MyClass(object):
+        __slots__ = ('a', )
+
+        def bar(self):
+            return 'overridden'
+
+    MyClass2 = apply_mixins(DummyMixinA, DummyMixinB, rebuild=True)(MyClass)
+
+    assert MyClass2 is not MyClass
+    assert MyClass2.__name__ == MyClass.__name__
+    if sys.version_info >= (3, 3):
+        assert MyClass2.__qualname__ == MyClass.__qualname__
+    assert MyClass2.__module__ == MyClass.__module__
+    assert not hasattr(MyClass, '__from_mixins__')
+    assert MyClass2.__from_mixins__ == ('foo',)
+    assert MyClass2.foo is DummyMixinA.foo
+
+    o = MyClass2()
+    o.a = 1
+    assert not hasattr(o, '__dict__')
+    assert o.foo(1) == 2
+    assert o.bar() == 'overridden'
+    assert isinstance(o, DummyMixinB)
+
+
+@pytest.mark.skipif(sys.version_info < (3, ), reason="zero-argument super() requires python 3")
+@pytest.mark.parametrize("option", ['rebuild', 'slots', 'columnar'])
+def test_apply_mixins_rebuild_super(option):
+    """checks that zero-argument `super()` in the methods of the decorated class works on the new class"""
+
+    class DummyMixin(object):
+        def foo(self):
+            return 'foo'
+
+    class Parent(object):
+        def __init__(self):
+            self.parent_init = True
+
+        def bar(self):
+            return 'bar'
+
+        @classmethod
+        def baz(cls):
+            return 'baz'
+
+    class MyClass(Parent):
+        __slots__ = ('parent_init', ) if option == 'slots' else ()
+
+        def __init__(self):
+            super().__init__()
+
+        def bar(self):
+            return 'my ' + super().bar()
+
+        @classmethod
+        def baz(cls):
+            return 'my ' + super().baz()
+
+        @property
+        def name(self):
+            return __class__.__name__
+
+    if sys.version_info < (3, 7):
+        with pytest.raises(TypeError, match="zero-argument `super\\(\\)`"):
+            apply_mixins(DummyMixin, **{option: True})(MyClass)
+        return
+
+    MyClass2 = apply_mixins(DummyMixin, init=True, **{option: True})(MyClass)
+    assert MyClass2 is not MyClass
+
+    o = MyClass2()
+    assert o.parent_init
+    assert (o.foo(), o.bar(), MyClass2.baz(), o.name) == ('foo', 'my bar', 'my baz', 'MyClass')
+
+
+@pytest.mark.skipif(sys.version_info < (3, 7), reason="`__class__` cells can only be updated on python 3.7+")
+@pytest.mark.parametrize("option", ['rebuild', 'slots', 'columnar'])
+def test_apply_mixins_rebuild_super_init(option):
+    """checks that zero-argument `super()` works in an `__init__` called by the generated one"""
+
+    class DummyMixin(object):
+        y = field(default=2)
+
+    class Parent(object):
+        def __init__(self, x):
+            self.x = x
+
+    class MyClass(Parent):
+        __slots__ = ('x', ) if option == 'slots' else ()
+
+        def __init__(self, x):
+            super().__init__(x)
+
+    MyClass2 = apply_mixins(DummyMixin, init=True, **{option: True})(MyClass)
+    o = MyClass2(3)
+    assert (o.x, o.y) == (3, 2)
+
+
+def test_apply_mixins_wrong_option():
+    """checks that unknown options are rejected"""
+    with pytest.raises(TypeError, match="unexpected keyword argument"):
+        apply_mixins(ABC, foo=True)
+
+
+@pytest.mark.parametrize("rebuild", [False, True], ids="rebuild={}".format)
+def test_has_mixin(rebuild):
+    """checks that `__mixins__` is filled and that `has_mixin` takes inheritance into account"""
+
+    class ParentMixin(object):
+        def foo(self):
+            return 'foo'
+
+    class DummyMixinA(ParentMixin):
+        pass
+
+    class DummyMixinB(ABC):
+        pass
+
+    class Other(object):
+        pass
+
+    @apply_mixins(DummyMixinA, DummyMixinB, rebuild=rebuild)
+    class MyClass(object):
+        pass
+
+    assert MyClass.__mixins__ == {DummyMixinA, ParentMixin, DummyMixinB}
+
+    class MySubClass(MyClass):
+        pass
+
+    @apply_mixins(Other, rebuild=rebuild)
+    class MySubClass2(MyClass):
+        pass
+
+    assert MySubClass2.__mixins__ == {DummyMixinA, ParentMixin, DummyMixinB, Other}
+
+    for c in (MyClass, MySubClass, MySubClass2):
+        for obj_or_cls in (c, c()):
+            assert has_mixin(obj_or_cls, DummyMixinA)
+            assert has_mixin(obj_or_cls, ParentMixin)
+            assert has_mixin(obj_or_cls, DummyMixinB)
+            assert has_mixin(obj_or_cls, MyClass)
+            assert has_mixin(obj_or_cls, Other) is (c is MySubClass2)
+
+    # actual inheritance
+    assert has_mixin(MySubClass, MyClass)
+    assert has_mixin(1, int)
+    assert not has_mixin(1, DummyMixinA)
+
+
+def test_apply_mixins_flatten_mro():
+    """checks that members inherited by mixins from their own parents are copied, with the inheritance semantics"""
+
+    class BaseMixin(object):
+        def foo(self):
+            return 'base foo'
+
+        def bar(self):
+            return 'base bar'
+
+        def baz(self):
+            return 'base baz'
+
+    class LeftMixin(BaseMixin):
+        def bar(self):
+            return 'left bar'
+
+    class RightMixin(BaseMixin):
+        def foo(self):
+            return 'right foo'
+
+        def bar(self):
+            return 'right bar'
+
+    @apply_mixins(LeftMixin, RightMixin)
+    class Composed(object):
+        pass
+
+    class Inherited(LeftMixin, RightMixin):
+        pass
+
+    assert set(Composed.__from_mixins__) == {'foo', 'bar', 'baz'}
+    for name in ('foo', 'bar', 'baz'):
+        # same resolution than with inheritance: the shared BaseMixin is applied once, first
+        assert getattr(Composed(), name)() == getattr(Inherited(), name)()
+    assert Composed().foo() == 'right foo'
+    assert Composed().bar() == 'left bar'
+
+    # the linearization is cached
+    from mixture.core import get_mixins_linearization
+    lin = get_mixins_linearization((LeftMixin, RightMixin))
+    assert lin.classes == (LeftMixin, RightMixin, BaseMixin)
+    assert get_mixins_linearization((LeftMixin, RightMixin)) is lin
+
+    # ancestors that the decorated class already inherits from are skipped: their members may be overridden
+    class MiddleParent(BaseMixin):
+        def foo(self):
+            return 'middle foo'
+
+    class ExtraMixin(BaseMixin):
+        def qux(self):
+            return 'extra qux'
+
+    @apply_mixins(ExtraMixin)
+    class ComposedChild(MiddleParent):
+        pass
+
+    class InheritedChild(ExtraMixin, MiddleParent):
+        pass
+
+    assert ComposedChild.__from_mixins__ == ('qux', )
+    for name in ('foo', 'bar', 'baz', 'qux'):
+        assert getattr(ComposedChild(), name)() == getattr(InheritedChild(), name)()
+    assert ComposedChild().foo() == 'middle foo'
+
+    # the bases are part of the plan cache key
+    class OtherParent(object):
+        pass
+
+    @apply_mixins(ExtraMixin)
+    class ComposedOther(OtherParent):
+        pass
+
+    assert set(ComposedOther.__from_mixins__) == {'foo', 'bar', 'baz', 'qux'}
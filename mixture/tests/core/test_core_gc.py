@@ -0,0 +1,174 @@
+#  Authors: Sylvain Marie <sylvain.marie@se.com>
+#
+#  Copyright (c) Schneider Electric Industries, 2019. All right reserved.
+
+import gc
+from abc import ABCMeta
+from weakref import ref
+
+import pytest
+from pyfields import field
+
+from mixture import apply_mixins, deferred_registration, enable_instrumentation, disable_instrumentation, \
+    get_call_stats, get_plan_cache_info, mix, get_mix_cache_info, set_mix_cache_size, reapply_mixins, \
+    CachingMixin, cached, PoolingMixin, DerivedMixin, derived
+
+
+class FieldsMixin(object):
+    x = field(default=1)
+    items = field(default_factory=lambda obj: [])
+    __slots__ = ()
+
+    def foo(self):
+        return self.x
+
+
+BarMixin = ABCMeta('BarMixin', (object,), {'bar': lambda self: 'bar'})
+
+
+def assert_collected(*refs):
+    """Checks that the objects referenced by `refs` are freed by a garbage collection"""
+    gc.collect()
+    assert [r() for r in refs] == [None] * len(refs)
+
+
+class _NoBlock(object):
+    """An empty `with` block"""
+    def __enter__(self):
+        pass
+
+    def __exit__(self, *args):
+        pass
+
+
+@pytest.mark.parametrize('options', [dict(), dict(rebuild=True), dict(slots=True), dict(init=True), dict(lazy=True),
+                                     dict(instrument=True), dict(columnar=True)],
+                         ids=lambda o: ','.join(o) or 'default')
+@pytest.mark.parametrize('deferred', [False, True], ids="deferred={}".format)
+def test_composed_classes_collected(options, deferred):
+    """Checks that classes composed at runtime are freed once they are not referenced anymore"""
+
+    def compose():
+        with deferred_registration() if deferred else _NoBlock():
+            @apply_mixins(FieldsMixin, BarMixin, **options)
+            class Foo(object):
+                pass
+        o = Foo()
+        assert (o.foo(), o.bar(), o.items) == (1, 'bar', [])
+        assert isinstance(o, BarMixin)
+        return ref(Foo),
+
+    enable_instrumentation()
+    try:
+        assert_collected(*compose())
+    finally:
+        disable_instrumentation()
+
+
+def test_dynamic_mixins_collected():
+    """Checks that mixins created at runtime are freed with the classes composed from them, and their cached plans"""
+    gc.collect()
+    plans = get_plan_cache_info().currsize
+
+    def compose():
+        class Base(object):
+            def foo(self):
+                return 'foo'
+
+        class Mixin(Base):
+            # note: fields reference the class they are defined in
+            y = field(default=2)
+
+            def twice(self):
+                return self.foo() * self.y
+
+        Other = ABCMeta('Other', (object,), {'bar': lambda self: 'bar'})
+
+        @apply_mixins(Mixin, Other, instrument=True)
+        class Foo(object):
+            pass
+
+        assert Foo().twice() == 'foofoo'
+        assert any(s.mixin is Mixin for s in get_call_stats())
+        assert get_plan_cache_info().currsize == plans + 1
+
+        # hot swap of a mixin modified in place
+        Mixin.twice = lambda self: 'twice'
+        reapply_mixins(Foo, Mixin)
+        assert Foo().twice() == 'twice'
+        return ref(Base), ref(Mixin), ref(Other), ref(Foo)
+
+    enable_instrumentation()
+    try:
+        assert_collected(*compose())
+    finally:
+        disable_instrumentation()
+    assert get_plan_cache_info().currsize == plans
+    assert not any(s.mixin is None for s in get_call_stats())
+
+
+def test_mix_collected():
+    """Checks that `mix` does not keep composed classes alive, unless requested"""
+    maxsize = get_mix_cache_info().maxsize
+    assert maxsize == 0
+    Base = type('Base', (object,), {})
+    refs = [ref(Base), ref(mix(Base, FieldsMixin, BarMixin))]
+    del Base
+    assert_collected(*refs)
+
+    try:
+        set_mix_cache_size(2)
+        refs = [ref(mix(type('Base', (object,), {}), FieldsMixin)) for _ in range(5)]
+        gc.collect()
+        assert [r() is not None for r in refs] == [False, False, False, True, True]
+        set_mix_cache_size(0)
+        assert_collected(*refs)
+    finally:
+        set_mix_cache_size(maxsize)
+
+
+class ReusableMixin(object):
+    x = field(default=1)
+
+    @cached
+    def double(self):
+        return self.x * 2
+
+    @derived('x')
+    def triple(self):
+        return self.x * 3
+
+
+def test_reusable_mixins_collected():
+    """Checks that the reusable mixins do not keep the classes they are applied to alive"""
+
+    def compose():
+        @apply_mixins(ReusableMixin, CachingMixin, PoolingMixin, DerivedMixin)
+        class Foo(object):
+            pass
+
+        o = Foo.acquire()
+        assert (o.double(), o.triple) == (2, 3)
+        o.release()
+        assert Foo.get_recomputation_counts() == {'triple': 1}
+        return ref(Foo), ref(o)
+
+    assert_collected(*compose())
+
+
+def test_purge_concurrent(monkeypatch):
+    """Checks that the collected mixins can be purged by several threads at the same time"""
+    from mixture import core
+
+    class DrainedList(list):
+        """A list emptied by another thread between the length check and the `pop`"""
+        def __len__(self):
+            return 1
+
+    monkeypatch.setattr(core, '_COLLECTED_MIXINS', DrainedList())
+
+    @apply_mixins(FieldsMixin)
+    class Foo(object):
+        pass
+
+    assert Foo().x == 1
@@ -0,0 +1,48 @@
+#  Authors: Sylvain Marie <sylvain.marie@se.com>
+#
+#  Copyright (c) Schneider Electric Industries, 2019. All right reserved.
+
+import gc
+
+from mixture import apply_mixins, get_consumers, remove_mixins, get_mixin_consumers
+
+
+class ParentMixin(object):
+    def foo(self):
+        pass
+
+
+class BarkerMixin(ParentMixin):
+    def bark(self):
+        pass
+
+    def sit(self):
+        pass
+
+
+def test_reverse_index():
+    """Checks that the reverse index records the consumers and the members contributed by each mixin"""
+
+    @apply_mixins(BarkerMixin)
+    class Dog(object):
+        def sit(self):
+            pass
+
+    @apply_mixins(BarkerMixin, rebuild=True)
+    class Wolf(object):
+        pass
+
+    assert get_consumers(BarkerMixin)[Dog] == ('bark',)
+    assert sorted(get_consumers(BarkerMixin)[Wolf]) == ['bark', 'sit']
+    assert get_consumers(ParentMixin) == {Dog: ('foo',), Wolf: ('foo',)}
+    assert set(get_mixin_consumers(BarkerMixin)) == {Dog, Wolf}
+
+    # hot-swap updates the index
+    remove_mixins(Dog, BarkerMixin)
+    assert set(get_consumers(BarkerMixin)) == {Wolf}
+    assert set(get_consumers(ParentMixin)) == {Wolf}
+
+    # the index is weak
+    del Wolf
+    gc.collect()
+    assert get_consumers(BarkerMixin) == dict()
@@ -0,0 +1,67 @@
+#  Authors: Sylvain Marie <sylvain.marie@se.com>
+#
+#  Copyright (c) Schneider Electric Industries, 2019. All right reserved.
+
+import pytest
+from pyfields import field, MandatoryFieldInitError
+
+from mixture import apply_mixins
+
+
+class TweeterMixin(object):
+    afraid = field(default=False, name='afraid')
+    tweets = field(default_factory=lambda obj: [], name='tweets')
+    size = field(check_type=True, type_hint=int, default=1, name='size')
+    color = field(name='color')
+
+    def tweet(self):
+        return "tweeting %s" % ("lightly" if self.afraid else "loudly")
+
+
+@pytest.mark.parametrize("slots", [False, True], ids="slots={}".format)
+def test_init_no_init(slots):
+    """Checks that the generated init sets all fields with a default, eagerly"""
+
+    @apply_mixins(TweeterMixin, init=True, slots=slots)
+    class Duck(object):
+        pass
+
+    d = Duck()
+    if not slots:
+        assert d.__dict__ == {'afraid': False, 'tweets': [], '_size': 1}
+    assert d.tweets is not Duck().tweets
+    assert d.tweet() == "tweeting loudly"
+    with pytest.raises(MandatoryFieldInitError):
+        d.color
+
+    # the generated init accepts no argument, like `object.__init__`
+    with pytest.raises(TypeError):
+        Duck(1)
+
+
+def test_init_own_init():
+    """Checks that the own init of the decorated class is called after the fields have been set"""
+
+    class Animal(object):
+        def __init__(self, color):
+            self.color = color
+
+    @apply_mixins(TweeterMixin, init=True)
+    class Duck(Animal):
+        def __init__(self, color, afraid=None):
+            super(Duck, self).__init__(color)
+            if afraid is not None:
+                self.afraid = afraid
+
+    d = Duck('yellow', afraid=True)
+    assert d.__dict__ == {'afraid': True, 'tweets': [], '_size': 1, 'color': 'yellow'}
+    assert Duck.__init__.__name__ == '__init__'
+    assert Duck.__init__.__module__ == Duck.__module__
+
+    # inherited init
+    @apply_mixins(TweeterMixin, init=True)
+    class Duck2(Animal):
+        pass
+
+    d = Duck2(color='white')
+    assert d.__dict__ == {'afraid': False, 'tweets': [], '_size': 1, 'color': 'white'}
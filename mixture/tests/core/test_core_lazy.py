@@ -0,0 +1,131 @@
+#  Authors: Sylvain Marie <sylvain.marie@se.com>
+#
+#  Copyright (c) Schneider Electric Industries, 2019. All right reserved.
+
+import pytest
+from pyfields import field
+
+from mixture import apply_mixins, materialize
+
+from ..utils import ABC
+
+
+class BigMixin(ABC):
+    afraid = field(default=False, name='afraid')
+
+    def foo(self):
+        return 'foo'
+
+    def bar(self):
+        return 'bar %s' % self.afraid
+
+    @property
+    def baz(self):
+        return 'baz'
+
+
+@pytest.mark.parametrize("rebuild", [False, True], ids="rebuild={}".format)
+def test_lazy(rebuild):
+    """Checks that methods are installed on first access only"""
+
+    @apply_mixins(BigMixin, lazy=True, rebuild=rebuild)
+    class Foo(object):
+        pass
+
+    # fields and properties are installed, methods are pending
+    assert set(Foo.__from_mixins__) == {'afraid', 'baz'}
+    assert 'foo' not in Foo.__dict__
+    assert not hasattr(Foo, 'foo')
+
+    f = Foo()
+    assert f.baz == 'baz'
+    assert f.foo() == 'foo'
+    assert Foo.foo is BigMixin.foo
+    assert set(Foo.__from_mixins__) == {'afraid', 'baz', 'foo'}
+
+    # subclass access installs the member on the decorated class
+    class Bar(Foo):
+        pass
+
+    assert Bar().bar() == 'bar False'
+    assert 'bar' in Foo.__dict__
+    assert set(Foo.__from_mixins__) == {'afraid', 'baz', 'foo', 'bar'}
+
+    with pytest.raises(AttributeError, match="'Foo' object has no attribute 'unknown'"):
+        f.unknown
+
+
+def test_lazy_materialize():
+    """Checks that `materialize` installs all pending members, and that an existing __getattr__ is still used"""
+
+    @apply_mixins(BigMixin, lazy=True)
+    class Foo(object):
+        def __getattr__(self, item):
+            return item.upper()
+
+    f = Foo()
+    assert f.unknown == 'UNKNOWN'
+    assert not hasattr(Foo, 'foo')
+
+    assert materialize(Foo) is Foo
+    assert Foo.foo is BigMixin.foo
+    assert Foo.bar is BigMixin.bar
+    assert set(Foo.__from_mixins__) == {'afraid', 'baz', 'foo', 'bar'}
+    assert f.unknown == 'UNKNOWN'
+
+
+def test_lazy_super():
+    """Checks the limitation of lazy mode with `super()`, and how to avoid it with `materialize`"""
+
+    @apply_mixins(BigMixin, lazy=True)
+    class Foo(object):
+        pass
+
+    class Bar(Foo):
+        def foo(self):
+            return 'bar' + super(Bar, self).foo()
+
+        def bar(self):
+            return super(Bar, self).bar()
+
+    # python does not call `__getattr__` for `super()` lookups
+    with pytest.raises(AttributeError):
+        Bar().foo()
+
+    assert materialize(Foo, 'foo', 'unknown') is Foo
+    assert Bar().foo() == 'barfoo'
+    assert 'bar' not in Foo.__dict__
+    assert set(Foo.__from_mixins__) == {'afraid', 'baz', 'foo'}
+
+    # once accessed on an instance, a member is installed
+    Foo().bar()
+    assert Bar().bar() == 'bar False'
+
+
+def test_lazy_parent_members():
+    """Checks that the methods overriding a member of a parent class are installed immediately"""
+
+    class Parent(object):
+        def foo(self):
+            return 'parent'
+
+    class ChildMixin(object):
+        def foo(self):
+            return 'mixin'
+
+        def bar(self):
+            return 'bar'
+
+    @apply_mixins(ChildMixin)
+    class Eager(Parent):
+        pass
+
+    @apply_mixins(ChildMixin, lazy=True)
+    class Lazy(Parent):
+        pass
+
+    assert Eager().foo() == Lazy().foo() == 'mixin'
+    assert Lazy.__from_mixins__ == ('foo', )
+    assert 'bar' not in Lazy.__dict__
+    assert Lazy().bar() == 'bar'
+    assert set(Lazy.__from_mixins__) == {'foo', 'bar'}
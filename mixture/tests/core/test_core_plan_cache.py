@@ -0,0 +1,162 @@
+#  Authors: Sylvain Marie <sylvain.marie@se.com>
+#
+#  Copyright (c) Schneider Electric Industries, 2019. All right reserved.
+
+import pytest
+
+from mixture import apply_mixins, MixinContainsInitWarning, get_plan_cache_info, set_plan_cache_size, \
+    clear_plan_cache
+from mixture.core import CompositionPlan
+
+
+@pytest.fixture
+def fresh_plan_cache():
+    """Provides an empty plan cache and restores its size afterwards"""
+    maxsize = get_plan_cache_info().maxsize
+    clear_plan_cache()
+    yield
+    set_plan_cache_size(maxsize)
+    clear_plan_cache()
+
+
+def test_plan_cache_hits(fresh_plan_cache):
+    """Checks that decorating similar classes with the same mixins reuses the plan"""
+
+    class FooMixin(object):
+        def foo(self):
+            return 'foo'
+
+    @apply_mixins(FooMixin)
+    class A(object):
+        pass
+
+    @apply_mixins(FooMixin)
+    class B(object):
+        pass
+
+    info = get_plan_cache_info()
+    assert (info.hits, info.misses, info.currsize) == (1, 1, 1)
+    assert A.foo is B.foo is FooMixin.foo
+    assert A.__from_mixins__ == B.__from_mixins__ == ('foo',)
+
+    # a class overriding a member has a different plan
+    @apply_mixins(FooMixin)
+    class C(object):
+        def foo(self):
+            return 'bar'
+
+    info = get_plan_cache_info()
+    assert (info.hits, info.misses, info.currsize) == (1, 2, 2)
+    assert C().foo() == 'bar'
+    assert C.__from_mixins__ == ()
+
+
+def test_plan_cache_lru_eviction(fresh_plan_cache):
+    """Checks that the size bound is respected and that the least recently used plan is evicted"""
+    set_plan_cache_size(2)
+
+    class M1(object):
+        def a(self):
+            pass
+
+    class M2(object):
+        def b(self):
+            pass
+
+    class M3(object):
+        def c(self):
+            pass
+
+    for m in (M1, M2, M1, M3):
+        apply_mixins(m)(type('C', (object,), {}))
+
+    info = get_plan_cache_info()
+    assert (info.hits, info.misses, info.currsize, info.maxsize) == (1, 3, 2, 2)
+
+    # M2 was evicted, not M1
+    apply_mixins(M1)(type('C', (object,), {}))
+    apply_mixins(M2)(type('C', (object,), {}))
+    info = get_plan_cache_info()
+    assert (info.hits, info.misses) == (2, 4)
+
+
+def test_plan_cache_init_warning(fresh_plan_cache):
+    """Checks that the `__init__` warning is still issued when the plan comes from the cache"""
+
+    class InitMixin(object):
+        def __init__(self):
+            pass
+
+    for _ in range(2):
+        with pytest.warns(MixinContainsInitWarning, match="'InitMixin' contains an explicit `__init__` method"):
+            apply_mixins(InitMixin)(type('C', (object,), {}))
+
+    assert get_plan_cache_info().hits == 1
+
+
+def test_plan_cache_modified_mixins(fresh_plan_cache):
+    """Checks that cached plans are not used anymore once members are added to or removed from the mixins"""
+
+    class BaseMixin(object):
+        def a(self):
+            return 'a'
+
+    class FooMixin(BaseMixin):
+        def b(self):
+            return 'b'
+
+    @apply_mixins(FooMixin)
+    class A(object):
+        pass
+
+    # a member added to a mixin
+    FooMixin.c = lambda self: 'c'
+
+    @apply_mixins(FooMixin)
+    class B(object):
+        pass
+
+    assert set(B.__from_mixins__) == {'a', 'b', 'c'}
+    assert B().c() == 'c'
+
+    # members removed from a mixin and from one of its ancestors
+    del FooMixin.b
+    del BaseMixin.a
+
+    @apply_mixins(FooMixin)
+    class C(object):
+        pass
+
+    assert C.__from_mixins__ == ('c', )
+    assert not hasattr(C, 'a') and not hasattr(C, 'b')
+
+    # the plan is cached again
+    @apply_mixins(FooMixin)
+    class D(object):
+        pass
+
+    assert get_plan_cache_info()[:2] == (1, 3)
+
+
+def test_plan_cache_member_removed_concurrently(fresh_plan_cache, monkeypatch):
+    """Checks that the plan is computed again if a member is removed after the plan was checked"""
+
+    class FooMixin(object):
+        def a(self):
+            return 'a'
+
+        def b(self):
+            return 'b'
+
+    apply_mixins(FooMixin)(type('A', (object,), {}))
+
+    # simulate a removal right after the check
+    del FooMixin.b
+    monkeypatch.setattr(CompositionPlan, 'is_up_to_date', lambda self: True)
+
+    @apply_mixins(FooMixin)
+    class B(object):
+        pass
+
+    assert B.__from_mixins__ == ('a', )
+    assert not hasattr(B, 'b')
@@ -0,0 +1,69 @@
+#  Authors: Sylvain Marie <sylvain.marie@se.com>
+#
+#  Copyright (c) Schneider Electric Industries, 2019. All right reserved.
+
+import pytest
+
+from mixture import apply_mixins, deferred_registration, flush_registrations
+
+from ..utils import ABC
+
+
+def test_deferred_registration():
+    """Checks that registrations are deferred until the end of the outermost block, or an explicit flush"""
+
+    class MixinA(ABC):
+        pass
+
+    class MixinB(object):
+        pass
+
+    with deferred_registration():
+        @apply_mixins(MixinA, MixinB)
+        class Foo(object):
+            pass
+
+        with deferred_registration():
+            @apply_mixins(MixinA)
+            class Bar(object):
+                pass
+
+        # still deferred: this is not the outermost block
+        assert not issubclass(Foo, MixinA)
+        assert not issubclass(Bar, MixinA)
+
+        flush_registrations()
+        assert issubclass(Foo, MixinA)
+        assert issubclass(Bar, MixinA)
+
+        @apply_mixins(MixinA)
+        class Baz(object):
+            pass
+
+        assert not issubclass(Baz, MixinA)
+
+    assert issubclass(Baz, MixinA)
+    assert not issubclass(Foo, MixinB)
+
+    # back to immediate registration
+    @apply_mixins(MixinA)
+    class Qux(object):
+        pass
+
+    assert issubclass(Qux, MixinA)
+
+
+def test_deferred_registration_error():
+    """Checks that pending registrations are flushed even if an exception occurs in the block"""
+
+    class MixinA(ABC):
+        pass
+
+    with pytest.raises(ValueError):
+        with deferred_registration():
+            @apply_mixins(MixinA)
+            class Foo(object):
+                pass
+            raise ValueError()
+
+    assert issubclass(Foo, MixinA)
@@ -0,0 +1,108 @@
+#  Authors: Sylvain Marie <sylvain.marie@se.com>
+#
+#  Copyright (c) Schneider Electric Industries, 2019. All right reserved.
+
+import subprocess
+import sys
+import weakref
+
+import pytest
+from pyfields import field
+
+from mixture import apply_mixins
+
+from ..utils import ABC
+
+
+class TweeterMixin(ABC):
+    afraid = field(default=False, name='afraid')
+    tweets = field(default_factory=lambda obj: [], name='tweets')
+
+    def tweet(self):
+        how = "lightly" if self.afraid else "loudly"
+        self.tweets.append(how)
+        return "tweeting %s" % how
+
+
+class CounterMixin(object):
+    __slots__ = ('count', '_step')
+
+    def incr(self):
+        try:
+            self.count += self._step
+        except AttributeError:
+            self.count, self._step = 1, 1
+        return self.count
+
+
+def test_slots():
+    """Nominal test: mixin fields and slots become slots of the new class"""
+
+    @apply_mixins(TweeterMixin, CounterMixin, slots=True)
+    class MagicDuck(object):
+        __slots__ = ('name', )
+
+        def __init__(self, name):
+            self.name = name
+
+    assert MagicDuck.__slots__ == ('name', 'count', '_step', '_afraid', '_tweets')
+    assert set(MagicDuck.__from_mixins__) == {'afraid', 'tweets', 'tweet', 'incr', 'count'}
+
+    d = MagicDuck('donald')
+    assert not hasattr(d, '__dict__')
+    with pytest.raises(TypeError):
+        weakref.ref(d)
+
+    assert d.tweet() == "tweeting loudly"
+    d.afraid = True
+    assert d.tweet() == "tweeting lightly"
+    assert d.tweets == ["loudly", "lightly"]
+    assert MagicDuck('daisy').tweets == []
+    assert d.incr() == 1
+    assert d.incr() == 2
+    assert isinstance(d, TweeterMixin)
+
+    # the mixin fields were not modified: non-slotted composition still works
+    @apply_mixins(TweeterMixin)
+    class Duck(object):
+        pass
+
+    d = Duck()
+    assert d.tweet() == "tweeting loudly"
+    assert d.__dict__ == {'afraid': False, 'tweets': ['loudly']}
+
+
+def test_slots_weakref():
+    """Checks that `__weakref__` is kept when the decorated class requests it"""
+
+    @apply_mixins(TweeterMixin, slots=True)
+    class MagicDuck(object):
+        __slots__ = ('__weakref__', )
+
+    d = MagicDuck()
+    assert weakref.ref(d)() is d
+    assert not hasattr(d, '__dict__')
+
+
+def test_slots_own_fields():
+    """Checks that the fields declared by the decorated class itself are stored in slots too"""
+
+    @apply_mixins(TweeterMixin, slots=True)
+    class MagicDuck(object):
+        color = field(default='white', name='color')
+        size = field(doc="a mandatory field", name='size')
+
+    assert MagicDuck.__slots__ == ('_color', '_size', '_afraid', '_tweets')
+
+    d = MagicDuck()
+    assert not hasattr(d, '__dict__')
+    assert d.color == 'white'
+    d.color, d.size = 'grey', 2
+    assert (d.color, d.size, d.tweet()) == ('grey', 2, "tweeting loudly")
+    assert MagicDuck().color == 'white'
+
+
+def test_pyfields_not_imported():
+    """Checks that importing mixture does not import the optional pyfields dependency, that is slow to import"""
+    out = subprocess.check_output([sys.executable, '-c', "import sys, mixture; print('pyfields' in sys.modules)"])
+    assert out.strip() == b'False'
@@ -0,0 +1,122 @@
+#  Authors: Sylvain Marie <sylvain.marie@se.com>
+#
+#  Copyright (c) Schneider Electric Industries, 2019. All right reserved.
+import pytest
+from pyfields import field
+
+from mixture import apply_mixins
+
+
+class PointMixin(object):
+    x = field(default=0)
+    y = field(default=0)
+    __slots__ = ()
+
+
+class NameMixin(object):
+    name = field(default='')
+    __slots__ = ()
+
+
+def make(cls, x=0, y=0, name=''):
+    """Creates an instance of `cls` with the given fields"""
+    o = cls()
+    o.x, o.y, o.name = x, y, name
+    return o
+
+
+@pytest.mark.parametrize('slots', [False, True], ids="slots={}".format)
+def test_value_methods(slots):
+    """Nominal test: the generated methods use the fields of all mixins, in the order of the linearization"""
+
+    @apply_mixins(PointMixin, NameMixin, eq=True, hash=True, repr=True, init=True, slots=slots)
+    class Point(object):
+        pass
+
+    p = make(Point, 1, 2, 'a')
+    assert p == make(Point, 1, 2, 'a')
+    assert not (p != make(Point, 1, 2, 'a'))
+    assert p != make(Point, 1, 3, 'a') and p != make(Point, 1, 2, 'b')
+    assert hash(p) == hash(make(Point, 1, 2, 'a')) == hash(('a', 1, 2))
+    assert len({p, make(Point, 1, 2, 'a'), Point()}) == 2
+    assert repr(p) == "Point(name='a', x=1, y=2)"
+    assert Point.__eq__.__qualname__.endswith('Point.__eq__')
+
+    # objects of another class are not equal, even with the same fields
+    @apply_mixins(PointMixin, NameMixin, eq=True, init=True, slots=slots)
+    class Other(object):
+        pass
+
+    assert p.__eq__(make(Other, 1, 2, 'a')) is NotImplemented
+    assert p != make(Other, 1, 2, 'a')
+
+
+def test_value_methods_no_fields():
+    """Checks the methods generated when the mixins have no fields"""
+
+    class Mixin(object):
+        def foo(self):
+            return 'foo'
+
+    @apply_mixins(Mixin, eq=True, hash=True, repr=True)
+    class Foo(object):
+        pass
+
+    assert Foo() == Foo()
+    assert hash(Foo()) == hash(Foo())
+    assert repr(Foo()) == 'Foo()'
+
+
+def test_value_methods_eq_only():
+    """With `eq` only, objects are not hashable since they are mutable"""
+
+    @apply_mixins(PointMixin, eq=True)
+    class Point(object):
+        pass
+
+    assert Point() == Point()
+    with pytest.raises(TypeError):
+        hash(Point())
+
+
+def test_value_methods_class_overrides():
+    """Methods defined by the class itself are not replaced"""
+
+    @apply_mixins(PointMixin, eq=True, hash=True, repr=True)
+    class Point(object):
+        def __eq__(self, other):
+            return 'eq'
+
+        def __repr__(self):
+            return 'repr'
+
+    assert (Point() == 1, repr(Point())) == ('eq', 'repr')
+    assert hash(Point()) == hash((0, 0))
+
+    @apply_mixins(PointMixin, eq=True)
+    class Point2(object):
+        def __hash__(self):
+            return 3
+
+    assert Point2() == Point2()
+    assert hash(Point2()) == 3
+
+
+@pytest.mark.parametrize('slots', [False, True], ids="slots={}".format)
+def test_value_methods_own_fields(slots):
+    """Checks that the fields declared by the class itself are used too, after the ones of the mixins"""
+
+    @apply_mixins(NameMixin, eq=True, hash=True, repr=True, init=True, slots=slots)
+    class Point(object):
+        x = field(default=0)
+        z = field(default_factory=lambda obj: 1)
+
+    p, q = Point(), Point()
+    if not slots:
+        assert {'x', 'z'}.issubset(p.__dict__)
+    q.x = 5
+    assert p != q and hash(p) != hash(q)
+    assert hash(q) == hash(('', 5, 1))
+    assert repr(q) == "Point(name='', x=5, z=1)"
+    q.x = 0
+    assert p == q
@@ -0,0 +1,154 @@
+#  Authors: Sylvain Marie <sylvain.marie@se.com>
+#
+#  Copyright (c) Schneider Electric Industries, 2019. All right reserved.
+
+from abc import ABCMeta
+
+from mixture import apply_mixins, has_mixin, reapply_mixins, remove_mixins, get_mixin_consumers, instrument, \
+    uninstrument
+from mixture.core import LAZY_MEMBERS_TAG
+
+
+def make_barker(version):
+    """Creates a new version of a mixin class, as if its module was reloaded"""
+    def bark(self):
+        return 'barking v%s' % version
+
+    members = {'bark': bark, '__module__': __name__, '__qualname__': 'BarkerMixin'}
+    if version > 1:
+        members['growl'] = lambda self: 'growling v%s' % version
+    else:
+        members['sniff'] = lambda self: 'sniffing v%s' % version
+    return ABCMeta('BarkerMixin', (object,), members)
+
+
+def test_reapply_reloaded_mixin():
+    """Checks that a new version of a mixin replaces the members copied from the previous one"""
+    BarkerV1 = make_barker(1)
+
+    @apply_mixins(BarkerV1)
+    class Dog(object):
+        def sniff(self):
+            # overridden on the class: not copied
+            return 'own sniff'
+
+    @apply_mixins(BarkerV1)
+    class Wolf(object):
+        pass
+
+    assert Dog.__from_mixins__ == ('bark',)
+    assert Wolf().sniff() == 'sniffing v1'
+
+    BarkerV2 = make_barker(2)
+    assert reapply_mixins(Wolf, BarkerV2) == [Wolf]
+
+    w = Wolf()
+    assert w.bark() == 'barking v2'
+    assert w.growl() == 'growling v2'
+    assert not hasattr(w, 'sniff')
+    assert sorted(Wolf.__from_mixins__) == ['bark', 'growl']
+    assert has_mixin(Wolf, BarkerV2)
+    assert not has_mixin(Wolf, BarkerV1)
+    assert isinstance(w, BarkerV2)
+
+    # Dog was not updated yet
+    assert Dog().bark() == 'barking v1'
+
+    # bulk update of all consumers: the class-defined member is left untouched
+    assert Dog in get_mixin_consumers(BarkerV2)
+    reapply_mixins(None, BarkerV2)
+    d = Dog()
+    assert d.bark() == 'barking v2'
+    assert d.sniff() == 'own sniff'
+
+
+def test_reapply_in_place():
+    """Checks that a mixin modified in place can be reapplied, and that manually overridden members are kept"""
+    class BarkerMixin(object):
+        def bark(self):
+            return 'barking'
+
+        def sit(self):
+            return 'sitting'
+
+    @apply_mixins(BarkerMixin)
+    class Dog(object):
+        pass
+
+    Dog.sit = lambda self: 'custom sitting'
+    BarkerMixin.bark = lambda self: 'BARKING'
+    BarkerMixin.sit = lambda self: 'SITTING'
+    reapply_mixins(Dog, BarkerMixin)
+    d = Dog()
+    assert d.bark() == 'BARKING'
+    assert d.sit() == 'custom sitting'
+
+    # the new members are seen by future decorations too
+    @apply_mixins(BarkerMixin)
+    class Wolf(object):
+        pass
+
+    assert Wolf().sit() == 'SITTING'
+
+
+def test_remove_mixins():
+    """Checks that removing a mixin deletes exactly the copied members and updates __mixins__"""
+    class ParentMixin(object):
+        def foo(self):
+            return 'foo'
+
+    class BarkerMixin(ParentMixin):
+        def bark(self):
+            return 'barking'
+
+    class SitterMixin(ParentMixin):
+        def sit(self):
+            return 'sitting'
+
+    @apply_mixins(BarkerMixin, SitterMixin)
+    class Dog(object):
+        def bark(self):
+            return 'own bark'
+
+    remove_mixins(Dog, BarkerMixin)
+    d = Dog()
+    assert d.bark() == 'own bark'
+    assert d.sit() == 'sitting'
+    assert d.foo() == 'foo'
+    assert not has_mixin(Dog, BarkerMixin)
+    assert has_mixin(Dog, SitterMixin) and has_mixin(Dog, ParentMixin)
+
+    remove_mixins(Dog, SitterMixin)
+    assert not hasattr(d, 'sit')
+    assert not hasattr(d, 'foo')
+    assert Dog.__from_mixins__ == ()
+    assert not has_mixin(Dog, ParentMixin)
+
+
+def test_hotswap_lazy_and_instrumented():
+    """Checks that lazy classes keep their methods pending and instrumented classes stay instrumented"""
+    class BarkerMixin(object):
+        def bark(self):
+            return 'barking'
+
+    @apply_mixins(BarkerMixin, lazy=True)
+    class Dog(object):
+        pass
+
+    BarkerMixin.bark = lambda self: 'BARKING'
+    reapply_mixins(Dog, BarkerMixin)
+    assert 'bark' in Dog.__dict__[LAZY_MEMBERS_TAG]
+    assert Dog().bark() == 'BARKING'
+
+    @apply_mixins(BarkerMixin)
+    class Wolf(object):
+        pass
+
+    instrument(Wolf)
+    BarkerMixin.bark = lambda self: 'barking again'
+    reapply_mixins(Wolf, BarkerMixin)
+    try:
+        assert Wolf.bark.__wrapped__ is BarkerMixin.bark
+        assert Wolf().bark() == 'barking again'
+    finally:
+        uninstrument(Wolf)
@@ -0,0 +1,121 @@
+#  Authors: Sylvain Marie <sylvain.marie@se.com>
+#
+#  Copyright (c) Schneider Electric Industries, 2019. All right reserved.
+
+import pytest
+
+from mixture import apply_mixins, instrument, uninstrument, enable_instrumentation, disable_instrumentation, \
+    get_call_stats, reset_call_stats
+
+
+class ParentMixin(object):
+    def foo(self):
+        return 'foo'
+
+
+class BarkerMixin(ParentMixin):
+    def bark(self):
+        return 'barking loudly'
+
+    def fail(self):
+        raise ValueError()
+
+
+def test_instrument():
+    """Checks that instrumentation wraps and unwraps the copied methods, and collects statistics"""
+
+    @apply_mixins(BarkerMixin)
+    class Dog(object):
+        pass
+
+    assert Dog.bark is BarkerMixin.bark
+    instrument(Dog)
+    assert Dog.bark is not BarkerMixin.bark
+    assert Dog.bark.__wrapped__ is BarkerMixin.bark
+
+    d = Dog()
+    for _ in range(3):
+        assert d.bark() == 'barking loudly'
+    assert d.foo() == 'foo'
+    with pytest.raises(ValueError):
+        d.fail()
+
+    stats = {(s.mixin, s.name): s for s in get_call_stats()}
+    bark_stats = stats[(BarkerMixin, 'bark')]
+    assert bark_stats.calls == 3
+    assert sum(bark_stats.histogram) == 3
+    assert bark_stats.total_time > 0
+    assert stats[(ParentMixin, 'foo')].calls == 1
+    assert stats[(BarkerMixin, 'fail')].calls == 1
+    assert [s.name for s in get_call_stats(ParentMixin)] == ['foo']
+
+    # back to the original functions
+    uninstrument(Dog)
+    assert Dog.bark is BarkerMixin.bark
+    d.bark()
+    assert bark_stats.calls == 3
+
+    reset_call_stats()
+    assert bark_stats.calls == 0
+
+
+def test_instrument_option():
+    """Checks that classes decorated with `instrument=True` follow the global switch"""
+
+    @apply_mixins(BarkerMixin, instrument=True)
+    class Dog(object):
+        pass
+
+    assert Dog.bark is BarkerMixin.bark
+    enable_instrumentation()
+    try:
+        assert Dog.bark.__wrapped__ is BarkerMixin.bark
+
+        # classes created while enabled are instrumented immediately
+        @apply_mixins(BarkerMixin, instrument=True)
+        class Dog2(object):
+            pass
+
+        assert Dog2.bark.__wrapped__ is BarkerMixin.bark
+    finally:
+        disable_instrumentation()
+
+    assert Dog.bark is BarkerMixin.bark
+    assert Dog2.bark is BarkerMixin.bark
+
+
+def test_instrument_lazy():
+    """Checks that the methods installed on first access in lazy mode are instrumented if the class is"""
+
+    class WalkerMixin(object):
+        def walk(self):
+            return 'walking'
+
+        def run(self):
+            return 'running'
+
+        def sit(self):
+            return 'sitting'
+
+    @apply_mixins(WalkerMixin, lazy=True, instrument=True)
+    class Dog(object):
+        pass
+
+    d = Dog()
+    assert d.sit() == 'sitting'
+    enable_instrumentation()
+    try:
+        for _ in range(2):
+            assert d.walk() == 'walking'
+        assert Dog.__dict__['walk'].__wrapped__ is WalkerMixin.walk
+        # methods installed before instrumentation was enabled are instrumented too
+        assert d.sit() == 'sitting'
+        assert {s.name: s.calls for s in get_call_stats(WalkerMixin)} == {'walk': 2, 'sit': 1}
+    finally:
+        disable_instrumentation()
+
+    assert Dog.__dict__['walk'] is WalkerMixin.walk
+    # methods installed while disabled are not instrumented
+    assert d.run() == 'running'
+    assert Dog.__dict__['run'] is WalkerMixin.run
+    assert {s.name: s.calls for s in get_call_stats(WalkerMixin)} == {'walk': 2, 'sit': 1}
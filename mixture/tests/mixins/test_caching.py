@@ -0,0 +1,96 @@
+#  Authors: Sylvain Marie <sylvain.marie@se.com>
+#
+#  Copyright (c) Schneider Electric Industries, 2019. All right reserved.
+import copy
+import pickle
+import time
+
+import pytest
+
+from mixture import apply_mixins, CachingMixin, cached, cached_property
+
+
+class GeometryMixin(object):
+    @cached(maxsize=2)
+    def scaled(self, factor, offset=0):
+        self.computations += 1
+        return self.size * factor + offset
+
+    @cached(scope='class')
+    def unit(self, name):
+        self.computations += 1
+        return name.upper()
+
+    @cached_property(ttl=0.05)
+    def area(self):
+        self.computations += 1
+        return self.size ** 2
+
+
+@apply_mixins(GeometryMixin, CachingMixin)
+class Square(object):
+    def __init__(self, size):
+        self.size = size
+        self.computations = 0
+
+
+def test_cached_apply_mixins():
+    """Checks that cached members work when copied by apply_mixins"""
+    assert set(Square.__from_mixins__) == {'scaled', 'unit', 'area', 'invalidate_caches', 'get_cache_info'}
+
+    s, s2 = Square(2), Square(3)
+    assert (s.scaled(2), s.scaled(2), s.scaled(2, offset=1), s2.scaled(2)) == (4, 4, 5, 6)
+    assert s.computations == 2
+    assert tuple(s.get_cache_info('scaled')) == (1, 2, 2, 2)
+
+    # LRU eviction
+    s.scaled(3)
+    s.scaled(2)
+    assert s.computations == 4
+    assert s.get_cache_info('scaled').currsize == 2
+
+    # class scope: shared by all instances
+    assert s.unit('m') == s2.unit('m') == 'M'
+    assert s.computations + s2.computations == 6
+    assert s2.get_cache_info('unit').hits == 1
+
+    # property with ttl and invalidation
+    assert (s.area, s.area) == (4, 4)
+    assert s.computations == 6
+    with pytest.raises(AttributeError):
+        s.area = 3
+    s.size = 5
+    time.sleep(0.06)
+    assert s.area == 25
+    s.size = 6
+    del s.area
+    assert s.area == 36
+
+    s.invalidate_caches()
+    assert s.get_cache_info('scaled').currsize == 0
+    assert s2.get_cache_info('scaled').currsize == 1
+    with pytest.raises(ValueError):
+        s.invalidate_caches('size')
+
+    # caches are not pickled
+    s3 = pickle.loads(pickle.dumps(s))
+    assert s3.get_cache_info('scaled').currsize == 0
+    assert s3.scaled(2) == 12
+
+
+@pytest.mark.parametrize('copier', [copy.copy, copy.deepcopy], ids=lambda c: c.__name__)
+def test_cached_copy(copier):
+    """Checks that copies of an object do not share its instance caches"""
+    s = Square(2)
+    assert (s.area, s.scaled(2)) == (4, 4)
+
+    c = copier(s)
+    c.size = 10
+    assert (c.area, c.scaled(2), s.area, s.scaled(2)) == (100, 20, 4, 4)
+    assert c.get_cache_info('scaled').misses == 1
+
+    # invalidating one of them does not invalidate the other one
+    s.size = 3
+    s.invalidate_caches()
+    assert (s.area, c.area) == (9, 100)
+    assert c.get_cache_info('area').hits == 1
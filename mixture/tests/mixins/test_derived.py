@@ -0,0 +1,98 @@
+#  Authors: Sylvain Marie <sylvain.marie@se.com>
+#
+#  Copyright (c) Schneider Electric Industries, 2019. All right reserved.
+import copy
+import pickle
+
+import pytest
+from pyfields import field
+
+from mixture import apply_mixins, DerivedMixin, derived
+
+
+class ShapeMixin(object):
+    width = field(default=1)
+    height = field(default=1)
+    depth = field(type_hint=int, check_type=True, default=1)
+
+    @derived('width', 'height')
+    def area(self):
+        return self.width * self.height
+
+    @derived('area', 'depth')
+    def volume(self):
+        return self.area * self.depth
+
+    @derived('label')
+    def title(self):
+        return self.label.title()
+
+
+@apply_mixins(ShapeMixin, DerivedMixin)
+class Box(object):
+    def __init__(self, label):
+        self.label = label
+
+
+class InheritedBox(ShapeMixin, DerivedMixin):
+    def __init__(self, label):
+        self.label = label
+
+
+@pytest.mark.parametrize('cls', [Box, InheritedBox], ids=['apply_mixins', 'inheritance'])
+def test_derived(cls):
+    """Nominal test: derived attributes are cached, and only invalidated by the inputs they depend on"""
+    if cls is Box:
+        assert {'area', 'volume', 'title', 'invalidate_derived', 'get_recomputation_counts'} \
+            .issubset(Box.__from_mixins__)
+
+    b = cls('small box')
+    b2 = cls('other box')
+    b.width = 2
+    assert (b.area, b.volume, b.title) == (2, 2, 'Small Box')
+    assert (b.area, b.volume, b.title) == (2, 2, 'Small Box')
+    assert cls.get_recomputation_counts() == {'area': 1, 'volume': 1, 'title': 1}
+
+    # only the dependents of the input are invalidated, directly or through other derived attributes
+    b.depth = 3
+    assert (b.area, b.volume) == (2, 6)
+    assert cls.get_recomputation_counts() == {'area': 1, 'volume': 2, 'title': 1}
+    b.height = 5
+    assert (b.area, b.volume, b.title) == (10, 30, 'Small Box')
+    assert cls.get_recomputation_counts() == {'area': 2, 'volume': 3, 'title': 1}
+
+    # descriptor fields still validate, plain attributes are tracked too, and other instances are not affected
+    with pytest.raises(TypeError):
+        b.depth = 'deep'
+    b.label = 'big box'
+    assert b.title == 'Big Box'
+    assert (b2.area, b2.title) == (1, 'Other Box')
+
+    # explicit invalidation
+    b.invalidate_derived()
+    assert b.volume == 30
+    assert cls.get_recomputation_counts() == {'area': 4, 'volume': 4, 'title': 3}
+    del b.area
+    assert b.area == 10
+
+    with pytest.raises(AttributeError):
+        b.area = 3
+
+
+@pytest.mark.parametrize('copier', [copy.copy, copy.deepcopy, lambda o: pickle.loads(pickle.dumps(o))],
+                         ids=['copy', 'deepcopy', 'pickle'])
+def test_derived_copy(copier):
+    """Checks that copies of an object do not share its cached derived values"""
+    b = Box('box')
+    b.width = 2
+    assert b.area == 2
+
+    c = copier(b)
+    c.width = 5
+    assert (c.area, b.area, b.width) == (5, 2, 2)
+
+    # invalidating one of them does not invalidate the other one
+    b.height = 3
+    assert (b.area, c.area) == (6, 5)
+    c.invalidate_derived()
+    assert (b.volume, c.volume) == (6, 5)
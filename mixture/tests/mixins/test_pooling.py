@@ -0,0 +1,61 @@
+#  Authors: Sylvain Marie <sylvain.marie@se.com>
+#
+#  Copyright (c) Schneider Electric Industries, 2019. All right reserved.
+import pytest
+from pyfields import field
+
+from mixture import apply_mixins, PoolingMixin
+
+
+class BufferMixin(object):
+    size = field(default=0)
+    chunks = field(default_factory=lambda obj: [])
+    owner = field()
+
+    def write(self, chunk):
+        self.chunks.append(chunk)
+        self.size += len(chunk)
+
+
+@pytest.mark.parametrize('slots', [False, True], ids="slots={}".format)
+def test_pooling(slots):
+    """Nominal test: released instances are reset and reused, up to the pool size"""
+
+    @apply_mixins(BufferMixin, PoolingMixin, slots=slots)
+    class Request(object):
+        __pool_size__ = 2
+        if slots:
+            __slots__ = ('path', 'closed')
+
+        def __init__(self, path):
+            self.path = path
+            self.closed = False
+
+        def on_release(self):
+            self.closed = True
+
+    assert set(Request.__from_mixins__) >= {'acquire', 'release', 'get_pool_info'}
+    assert 'on_release' not in Request.__from_mixins__
+
+    r1 = Request.acquire('/a')
+    r1.write('hello')
+    r1.owner = 'me'
+    chunks = r1.chunks
+    r1.release()
+    assert (r1.size, r1.chunks, r1.closed) == (0, [], True)
+    assert r1.chunks is not chunks
+    with pytest.raises(Exception):
+        r1.owner
+    with pytest.raises(ValueError):
+        r1.release()
+
+    r2 = Request.acquire('/b')
+    assert r2 is r1
+    assert (r2.path, r2.closed, r2.size) == ('/b', False, 0)
+
+    # the pool is bounded
+    others = [Request.acquire('/c') for _ in range(3)]
+    r2.release()
+    for r in others:
+        r.release()
+    assert tuple(Request.get_pool_info()) == (4, 1, 2, 2, 2)
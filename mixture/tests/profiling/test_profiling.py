@@ -0,0 +1,74 @@
+#  Authors: Sylvain Marie <sylvain.marie@se.com>
+#
+#  Copyright (c) Schneider Electric Industries, 2019. All right reserved.
+
+import os
+import subprocess
+import sys
+
+from mixture import apply_mixins, enable_profiling, disable_profiling, is_profiling_enabled, profiling, \
+    get_profile_records, clear_profile_records, get_profile_summary
+
+from ..utils import ABC
+
+
+class FooMixin(ABC):
+    def foo(self):
+        pass
+
+    def bar(self):
+        pass
+
+
+def test_profiling():
+    """Checks that records are collected only when profiling is enabled"""
+    assert not is_profiling_enabled()
+    clear_profile_records()
+
+    apply_mixins(FooMixin)(type('NotProfiled', (object,), {}))
+    assert get_profile_records() == []
+
+    enable_profiling()
+    try:
+        @apply_mixins(FooMixin)
+        class Foo(object):
+            pass
+
+        @apply_mixins(FooMixin)
+        class Foo2(object):
+            pass
+    finally:
+        disable_profiling()
+
+    records = get_profile_records()
+    assert len(records) == 2
+    r = records[0]
+    assert r.cls_name.endswith('test_profiling.<locals>.Foo')
+    assert r.mixins == ('%s.FooMixin' % __name__, )
+    assert r.nb_members == 2
+    assert r.plan_time >= 0 and r.copy_time >= 0 and r.register_time >= 0
+    assert records[1].plan_cached
+
+    summary = get_profile_summary()
+    assert 'TOTAL (2 decorations)' in summary
+    assert len(summary.splitlines()) == 6
+    assert len(get_profile_summary(top=1).splitlines()) == 5
+
+    # context manager
+    with profiling() as records:
+        apply_mixins(FooMixin)(type('Bar', (object,), {}))
+    assert [r.cls_name for r in records] == ['%s.Bar' % __name__]
+    assert not is_profiling_enabled()
+    assert len(get_profile_records()) == 3
+
+    clear_profile_records()
+    assert get_profile_records() == []
+
+
+def test_profiling_env_var():
+    """Checks that the environment variable enables profiling at import time"""
+    env = dict(os.environ)
+    env['MIXTURE_PROFILE'] = '1'
+    out = subprocess.check_output([sys.executable, '-c', 'import mixture; print(mixture.is_profiling_enabled())'],
+                                  env=env)
+    assert out.strip() == b'True'